@@ -1,20 +1,420 @@
 """Support for dabblerdk_powermeterreader."""
 
 import asyncio
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
+from functools import partial
 import logging
+import math
+import shutil
+import time
+
+import voluptuous as vol
 
 from homeassistant import config_entries, core
-from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.components import zeroconf
+from homeassistant.const import (
+    CONF_SCAN_INTERVAL,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import (
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.dispatcher import async_dispatcher_send  # , dispatcher_send
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_time_interval,
+)
+from homeassistant.helpers.storage import STORAGE_DIR
 
-from .const import DOMAIN
-from .meter import MeterReader
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_DURATION,
+    ATTR_FIELDS,
+    ATTR_PERCENTILES,
+    CONF_CONNECT_TIMEOUT,
+    CONF_FUSE_SIZE,
+    CONF_HEARTBEAT,
+    CONF_JOURNAL_INTERVAL,
+    CONF_MAX_STALENESS,
+    CONF_READ_TIMEOUT,
+    CONF_SAMPLE_INTERVAL,
+    CONF_SCAN_INTERVAL_MAX,
+    CONF_SCAN_INTERVAL_MIN,
+    CONF_STREAMING,
+    DATA_FLEET,
+    DATA_RESOLVER,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_FUSE_SIZE,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_JOURNAL_INTERVAL,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_READ_TIMEOUT,
+    DOMAIN,
+    HISTORY_SPAN,
+    MAX_PROFILE_DURATION,
+    SERVICE_BACKFILL_STATISTICS,
+    SERVICE_GET_STATISTICS,
+    SERVICE_PROFILE,
+    SERVICE_STOP_PROFILE,
+    STREAM_RETRY_MAX,
+    STREAM_RETRY_MIN,
+)
+from .meter import (
+    CACHE_TIME,
+    AdaptiveScheduler,
+    Fleet,
+    MdnsResolver,
+    MeterAggregate,
+    MeterReader,
+    MeterSnapshot,
+    PlausibilityConfig,
+    PlausibilityFilter,
+    SampleAggregator,
+    SampleHistory,
+    SampleJournal,
+    summarize,
+)
+from .meter.backfill import MIN_GAP as BACKFILL_MIN_GAP
+from .meter.history import COLUMN_NAMES, DEFAULT_PERCENTILES
+from .meter.meter import NO_FIELDS, SNAPSHOT_FIELDS
+from .profiler import IntegrationProfiler
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = ["binary_sensor", "sensor"]
 
+BACKFILL_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(
+            ATTR_DURATION, default=timedelta(seconds=DEFAULT_PROFILE_DURATION)
+        ): vol.All(
+            cv.positive_time_period,
+            vol.Range(max=timedelta(seconds=MAX_PROFILE_DURATION)),
+        ),
+    }
+)
+GET_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_DURATION): cv.positive_time_period,
+        vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list, [vol.In(COLUMN_NAMES)]),
+        vol.Optional(ATTR_PERCENTILES, default=list(DEFAULT_PERCENTILES)): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0, max=100))]
+        ),
+    }
+)
+
+
+@callback
+def async_create_resolver(hass: core.HomeAssistant) -> MdnsResolver:
+    """Create an mDNS resolver using Home Assistant's zeroconf."""
+    return MdnsResolver(partial(zeroconf.async_get_async_instance, hass))
+
+
+@callback
+def async_get_resolver(hass: core.HomeAssistant) -> MdnsResolver:
+    """Get the mDNS resolver of all entries."""
+    if DATA_RESOLVER not in hass.data:
+        hass.data[DATA_RESOLVER] = async_create_resolver(hass)
+    return hass.data[DATA_RESOLVER]
+
+
+class MeterCoordinator:
+    """Fetch meter data once per scan tick and share it with all entities."""
+
+    def __init__(
+        self,
+        hass: core.HomeAssistant,
+        entry_id: str,
+        meterclient: MeterReader,
+        scheduler: AdaptiveScheduler,
+        streaming: bool = False,
+        publish_interval: float | None = None,
+        journal_interval: float | None = None,
+        phase: float | None = None,
+        heartbeat: float = DEFAULT_HEARTBEAT,
+    ) -> None:
+        """Initialize.
+
+        The scheduler picks the delay until the next poll. With streaming,
+        readings pushed by the module are used while the stream is
+        connected, and the timer only polls while it is down.
+
+        With publish_interval, readings are sampled into the reader's
+        aggregator and entities are only notified every publish_interval
+        seconds, with the aggregate.
+
+        With journal_interval, the reader's journal is written to disk every
+        journal_interval seconds.
+
+        With phase, polls are aligned to the phase given by the Fleet, so
+        meters with the same interval do not all poll at once.
+
+        Entities are only notified when the reading or the status changed,
+        or nothing was notified for heartbeat seconds, and changed holds the
+        snapshot attributes that did. The reader's
+        metrics change with every fetch, so metrics_signal is sent after
+        each one.
+
+        When the reader returns stale readings while refreshing in the
+        background, entities are notified again when the refresh is done.
+        """
+        self.hass = hass
+        self.meterclient = meterclient
+        self.signal = f"{DOMAIN}_{entry_id}_refresh"
+        self.metrics_signal = f"{DOMAIN}_{entry_id}_metrics"
+        self.snapshot: MeterSnapshot | None = None
+        self.changed = SNAPSHOT_FIELDS
+        self.meter_time_frozen = False
+        self.connected = False
+        self.stuck_with_prev_value = False
+        self.last_update_success = False
+        self.aggregate: MeterAggregate | None = None
+        self._scheduler = scheduler
+        self._publish_interval = publish_interval
+        self._publish_remove = None
+        self._journal_interval = journal_interval
+        self._journal_remove = None
+        self._phase = phase
+        # Latest snapshot taken, also while fetches fail, and the status
+        # entities were last notified of
+        self._seen: MeterSnapshot | None = None
+        self._notified_status = None
+        self._notified_at = 0.0
+        self._heartbeat = heartbeat
+        self._timer_remove = None
+        self._stopped = True
+        self._lock = asyncio.Lock()
+        self._streaming = streaming
+        self._stream_task: asyncio.Task | None = None
+        self._stream_connected = False
+        meterclient.on_refresh = self._async_refreshed
+        meterclient.create_task = partial(
+            hass.async_create_background_task, name=f"{self.signal}_revalidate"
+        )
+
+    @property
+    def meter_sn(self):
+        """Serial number of the meter in the latest data."""
+        if self.snapshot is None:
+            return None
+        return self.snapshot.utility_sn
+
+    async def async_refresh(self) -> None:
+        """Fetch meter data, unless another caller is already doing so."""
+        if self._lock.locked():
+            # Share the result of the fetch in progress
+            async with self._lock:
+                return
+
+        async with self._lock:
+            try:
+                await self.meterclient.get_meter_data()
+                failed = False
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.warning("Failed to refresh meter data: %s", err)
+                failed = True
+
+            self._update_from_state(failed)
+
+    def _update_from_state(self, failed: bool) -> None:
+        """Take one consistent snapshot for all entities."""
+        self.last_update_success = not failed
+        state = self.meterclient.state
+        # A reading seeded from the journal lacks the serial number and info
+        snapshot = None if failed or state.seeded else state.snapshot
+        if snapshot is None:
+            self.changed = NO_FIELDS if self.snapshot is None else SNAPSHOT_FIELDS
+        else:
+            seen = self._seen
+            if snapshot is not seen:
+                # The same snapshot again is a stale or rejected reading
+                self.meter_time_frozen = (
+                    seen is not None and snapshot.meter_time == seen.meter_time
+                )
+            self.changed = (
+                SNAPSHOT_FIELDS
+                if self.snapshot is None
+                else snapshot.changed_fields(seen)
+            )
+            self._seen = snapshot
+        self.snapshot = snapshot
+        self.connected = state.connected
+        self.stuck_with_prev_value = state.stuck_with_prev_value
+
+    @callback
+    def _async_refreshed(self) -> None:
+        """Notify entities of a reading fetched in the background.
+
+        A failed fetch only makes entities unavailable once the last
+        reading is older than the reader's max staleness.
+        """
+        age = self.meterclient.age
+        self._update_from_state(age is None or age > self.meterclient.max_staleness)
+        if self._publish_interval is None:
+            self._async_notify()
+        async_dispatcher_send(self.hass, self.metrics_signal)
+
+    async def _async_tick(self, event_time=None):  # pylint: disable=unused-argument
+        """Call MEP to refresh information and notify entities."""
+        if not self._stream_connected:
+            await self.async_refresh()
+            if self._publish_interval is None:
+                self._async_notify()
+            async_dispatcher_send(self.hass, self.metrics_signal)
+        self._async_schedule(self._next_delay())
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify entities, unless a new reading is the same as the last one.
+
+        Failed fetches are always notified, and unchanged readings once the
+        heartbeat is due, so entities can write their state again.
+        """
+        now = time.monotonic()
+        status = (
+            self.last_update_success,
+            self.connected,
+            self.stuck_with_prev_value,
+            self.meter_time_frozen,
+        )
+        if (
+            self.last_update_success
+            and not self.changed
+            and status == self._notified_status
+            and now - self._notified_at < self._heartbeat
+        ):
+            _LOGGER.debug("Reading unchanged, not notifying %s", self.signal)
+            return
+        self._notified_status = status
+        self._notified_at = now
+        _LOGGER.debug("Signal_refresh: %s", self.signal)
+        async_dispatcher_send(self.hass, self.signal)
+
+    @callback
+    def _async_publish(self, event_time=None) -> None:  # pylint: disable=unused-argument
+        """Notify entities with the aggregate of the samples since last time."""
+        self.aggregate = self.meterclient.aggregator.pop()
+        self.changed = SNAPSHOT_FIELDS
+        _LOGGER.debug("Signal_refresh: %s", self.signal)
+        async_dispatcher_send(self.hass, self.signal)
+
+    async def async_flush_journal(self, event=None) -> None:  # pylint: disable=unused-argument
+        """Write the readings journaled since last time to disk."""
+        journal = self.meterclient.journal
+        if journal is None:
+            return
+        try:
+            await self.hass.async_add_executor_job(journal.flush)
+        except OSError as err:
+            _LOGGER.warning("Failed to write meter journal: %s", err)
+
+    def _next_delay(self) -> float:
+        """Get seconds until the next poll, based on the latest reading."""
+        snapshot = self.snapshot
+        if (
+            not self.last_update_success
+            or not self.connected
+            or self.stuck_with_prev_value
+            or snapshot is None
+            or not snapshot.is_complete
+        ):
+            return self._scheduler.next_delay(None, True)
+        power = (
+            snapshot.power_fwd - snapshot.power_rev,
+            snapshot.l1_power_fwd - snapshot.l1_power_rev,
+            snapshot.l2_power_fwd - snapshot.l2_power_rev,
+            snapshot.l3_power_fwd - snapshot.l3_power_rev,
+        )
+        return self._scheduler.next_delay(power, False)
+
+    @callback
+    def _async_schedule(self, delay: float) -> None:
+        """Schedule the next tick."""
+        if self._stopped:
+            return
+        if self._timer_remove is not None:
+            self._timer_remove()
+        if self._phase is not None:
+            delay = Fleet.next_delay(self._phase, delay)
+        _LOGGER.debug("Next poll of %s in %.1f s", self.signal, delay)
+        self._timer_remove = async_call_later(self.hass, delay, self._async_tick)
+
+    @callback
+    def _async_stream_update(self) -> None:
+        """Notify entities of a reading received on the stream."""
+        self._stream_connected = True
+        self._update_from_state(False)
+        if self._publish_interval is None:
+            self._async_notify()
+        async_dispatcher_send(self.hass, self.metrics_signal)
+
+    async def _async_run_stream(self) -> None:
+        """Keep the stream connected, reconnecting with back-off."""
+        retry = STREAM_RETRY_MIN
+        while True:
+            try:
+                await self.meterclient.async_stream(self._async_stream_update)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Meter stream down, polling instead: %s", err)
+            if self._stream_connected:
+                retry = STREAM_RETRY_MIN
+            self._stream_connected = False
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, STREAM_RETRY_MAX)
+
+    @callback
+    def async_start(self) -> None:
+        """Start the timer, and the stream if enabled."""
+        self._stopped = False
+        self._async_schedule(self._scheduler.interval)
+        if self._publish_interval is not None:
+            self._publish_remove = async_track_time_interval(
+                self.hass,
+                self._async_publish,
+                timedelta(seconds=self._publish_interval),
+            )
+        if self._journal_interval:
+            self._journal_remove = async_track_time_interval(
+                self.hass,
+                self.async_flush_journal,
+                timedelta(seconds=self._journal_interval),
+            )
+        if self._streaming:
+            self._stream_task = self.hass.async_create_background_task(
+                self._async_run_stream(), f"{self.signal}_stream"
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the timer."""
+        self._stopped = True
+        if self._timer_remove is not None:
+            _LOGGER.debug("Remove timer")
+            self._timer_remove()
+            self._timer_remove = None
+        if self._publish_remove is not None:
+            self._publish_remove()
+            self._publish_remove = None
+        if self._journal_remove is not None:
+            self._journal_remove()
+            self._journal_remove = None
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            self._stream_task = None
+            self._stream_connected = False
+
 
 async def async_setup_entry(
     hass: core.HomeAssistant, entry: config_entries.ConfigEntry
@@ -30,29 +430,123 @@ async def async_setup_entry(
         options_update_listener
     )
 
-    # Custom function to trigger polling
-    async def signal_refresh(event_time=None):  # pylint: disable=unused-argument
-        """Call MEP to refresh information."""
-        signal = f"{DOMAIN}_{entry.entry_id}_refresh"
-        _LOGGER.debug("Signal_refresh: %s", signal)
-        async_dispatcher_send(hass, signal)
-
-    # Setup repeating timer
-    scan_interval = timedelta(seconds=entry.options.get(CONF_SCAN_INTERVAL, 300))
-    data["timer_remove"] = async_track_time_interval(
-        hass, signal_refresh, scan_interval
-    )
-
     # data["email"] = entry.data["email"]
     # data["password"] = entry.data["password"]
     # data["namespace"] = entry.data["namespace"]
     data["name"] = entry.data["name"]
     data["url"] = entry.data["url"]
-    data["meterclient"] = MeterReader(entry.data["url"], hass)
+    # High-rate sampling, publishing aggregates every scan interval
+    scan_interval = entry.options.get(CONF_SCAN_INTERVAL, 300)
+    sample_interval = entry.options.get(CONF_SAMPLE_INTERVAL, 0)
+    sampling = 0 < sample_interval < scan_interval
+
+    # Setup timer, fetching once per tick for all entities
+    poll_interval = sample_interval if sampling else scan_interval
+    scheduler = AdaptiveScheduler(
+        poll_interval,
+        entry.options.get(CONF_SCAN_INTERVAL_MIN, poll_interval),
+        entry.options.get(CONF_SCAN_INTERVAL_MAX, scan_interval),
+    )
+    streaming = entry.options.get(CONF_STREAMING, False)
+
+    # Journal of readings, seeding the reader with the last one saved
+    journal_interval = entry.options.get(
+        CONF_JOURNAL_INTERVAL, DEFAULT_JOURNAL_INTERVAL
+    )
+    journal = None
+    last = None
+    if journal_interval:
+        journal = SampleJournal(hass.config.path(STORAGE_DIR, DOMAIN, entry.entry_id))
+        try:
+            last = await hass.async_add_executor_job(journal.open)
+        except OSError as err:
+            _LOGGER.warning(
+                "Failed to open meter journal, not saving readings: %s", err
+            )
+            journal = None
+
+    # Meters of all entries share a connection pool and take turns polling
+    fleet: Fleet = hass.data.setdefault(DATA_FLEET, Fleet())
+    phase = fleet.join(entry.entry_id)
+
+    # Room for a day of readings at the fastest rate they can arrive
+    fastest = 1 if streaming else scheduler.min_interval
+    history = SampleHistory(min(HISTORY_SPAN, math.ceil(HISTORY_SPAN / fastest)))
+
+    data["meterclient"] = MeterReader(
+        entry.data["url"],
+        session_provider=fleet.get_session,
+        resolver=async_get_resolver(hass),
+        connect_timeout=entry.options.get(
+            CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+        ),
+        read_timeout=entry.options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        limiter=fleet.limiter,
+        aggregator=SampleAggregator() if sampling else None,
+        cache_time=min(CACHE_TIME, sample_interval / 2) if sampling else CACHE_TIME,
+        history=history,
+        journal=journal,
+        plausibility=PlausibilityFilter(
+            PlausibilityConfig(
+                fuse_a=entry.options.get(CONF_FUSE_SIZE, DEFAULT_FUSE_SIZE)
+            )
+        ),
+        max_staleness=entry.options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS)
+        or None,
+    )
+    if last is not None:
+        data["meterclient"].seed(
+            last.snapshot, datetime.fromtimestamp(last.timestamp, tz=UTC)
+        )
+
+    data["coordinator"] = MeterCoordinator(
+        hass,
+        entry.entry_id,
+        data["meterclient"],
+        scheduler,
+        streaming=streaming,
+        publish_interval=scan_interval if sampling else None,
+        journal_interval=journal_interval if journal is not None else None,
+        phase=phase,
+        heartbeat=entry.options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+    )
+    # Unload is not called when Home Assistant stops
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, data["coordinator"].async_flush_journal
+        )
+    )
+
+    async def async_close_on_stop(event) -> None:  # pylint: disable=unused-argument
+        """Stop polling and close the connections, as unload does."""
+        data["coordinator"].async_stop()
+        await data["meterclient"].async_close()
+        await fleet.async_close()
+
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, async_close_on_stop)
+    )
     hass.data[DOMAIN][entry.entry_id] = data  # entry.data
 
     # Forward the setup to the sensor platform.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Only poll once setup can no longer fail, nothing would stop the timer
+    data["coordinator"].async_start()
+
+    # Fill in the energy statistics of the hours we were not running
+    if last is not None and (
+        datetime.now(tz=UTC).timestamp() - last.timestamp > BACKFILL_MIN_GAP
+    ):
+        # The recorder is only imported when there are statistics to fill in
+        from .backfill import (  # pylint: disable=import-outside-toplevel
+            async_backfill_statistics,
+        )
+
+        entry.async_create_background_task(
+            hass,
+            async_backfill_statistics(hass, entry.entry_id),
+            f"{DOMAIN}_{entry.entry_id}_backfill",
+        )
 
     return True
 
@@ -63,6 +557,86 @@ async def async_setup(
 ) -> bool:
     """Set up the GitHub Custom component from yaml configuration."""
     hass.data.setdefault(DOMAIN, {})
+
+    def get_entry_id(call: ServiceCall) -> str:
+        """Get the config entry a service call is for."""
+        entries = hass.data[DOMAIN]
+        entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+        if entry_id is None and len(entries) == 1:
+            entry_id = next(iter(entries))
+        if entry_id not in entries:
+            raise HomeAssistantError(f"Unknown config entry: {entry_id}")
+        return entry_id
+
+    async def async_get_statistics(call: ServiceCall) -> ServiceResponse:
+        """Get statistics of the readings held in memory."""
+        entry_id = get_entry_id(call)
+        history: SampleHistory = hass.data[DOMAIN][entry_id]["meterclient"].history
+        now = datetime.now(tz=UTC)
+        # Copy the window here, the calculation runs in the executor
+        columns = history.window(
+            (now - call.data[ATTR_DURATION]).timestamp(),
+            fields=call.data.get(ATTR_FIELDS),
+        )
+        result = await hass.async_add_executor_job(
+            summarize, columns, call.data[ATTR_PERCENTILES]
+        )
+        for key in ("start", "end"):
+            if result[key] is not None:
+                result[key] = datetime.fromtimestamp(result[key], tz=UTC).isoformat()
+        return result
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_STATISTICS,
+        async_get_statistics,
+        schema=GET_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_backfill(call: ServiceCall) -> ServiceResponse:
+        """Import energy statistics for the gaps in the journal."""
+        from .backfill import (  # pylint: disable=import-outside-toplevel
+            async_backfill_statistics,
+        )
+
+        imported = await async_backfill_statistics(hass, get_entry_id(call))
+        return {"imported": imported}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_STATISTICS,
+        async_backfill,
+        schema=BACKFILL_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    profiler = IntegrationProfiler(hass)
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the integration and write a report to the config directory."""
+        return await profiler.async_run(call.data[ATTR_DURATION].total_seconds())
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_stop_profile(call: ServiceCall) -> None:
+        """End a running profile early."""
+        profiler.stop()
+
+    hass.services.async_register(DOMAIN, SERVICE_STOP_PROFILE, async_stop_profile)
+
+    @callback
+    def async_stop_profiler(event) -> None:  # pylint: disable=unused-argument
+        """Finish a running profile when Home Assistant stops."""
+        profiler.stop()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop_profiler)
     return True
 
 
@@ -81,9 +655,8 @@ async def async_unload_entry(
     data = hass.data[DOMAIN][entry.entry_id]
 
     # Cancel previous timer
-    if ("timer_remove" in data) and (data["timer_remove"] is not None):
-        _LOGGER.debug("Remove timer")
-        data["timer_remove"]()
+    data["coordinator"].async_stop()
+    await data["coordinator"].async_flush_journal()
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     # unloaded = [
@@ -100,5 +673,24 @@ async def async_unload_entry(
     # Remove config entry from domain.
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await data["meterclient"].async_close()
+        fleet: Fleet = hass.data[DATA_FLEET]
+        fleet.leave(entry.entry_id)
+        if not fleet:
+            await fleet.async_close()
+            hass.data.pop(DATA_FLEET)
+            if DATA_RESOLVER in hass.data:
+                await hass.data.pop(DATA_RESOLVER).async_close()
 
     return unload_ok
+
+
+async def async_remove_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Remove the journal of a deleted config entry."""
+    await hass.async_add_executor_job(
+        shutil.rmtree,
+        hass.config.path(STORAGE_DIR, DOMAIN, entry.entry_id),
+        True,
+    )
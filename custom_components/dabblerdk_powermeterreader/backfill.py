@@ -0,0 +1,136 @@
+"""Backfill of long-term energy statistics for dabblerdk_powermeterreader."""
+
+from datetime import UTC, datetime, tzinfo
+import logging
+
+from homeassistant import core
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_import_statistics,
+    statistics_during_period,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .meter import SampleJournal
+from .meter.backfill import HOUR, HourlyCounter, interpolate_hourly, parse_meter_time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Snapshot attribute and sensor name, as used in the unique_id of the sensor
+ENERGY_SENSORS = (
+    ("energy_fwd", "energy consumption"),
+    ("energy_rev", "energy returned"),
+)
+
+
+def _hourly_from_journal(
+    journal: SampleJournal, tz: tzinfo
+) -> dict[str, list[HourlyCounter]]:
+    """Interpolate hourly counters from the journaled readings.
+
+    Readings are placed in time by the meter's own clock when it can be
+    parsed, otherwise by when they were accepted.
+    """
+    samples: dict[str, list[tuple[float, float | None]]] = {
+        attr: [] for attr, _ in ENERGY_SENSORS
+    }
+    for record in journal.records():
+        meter_time = parse_meter_time(record.meter_time, tz)
+        time = record.timestamp if meter_time is None else meter_time.timestamp()
+        for attr, values in samples.items():
+            values.append((time, getattr(record.snapshot, attr)))
+    return {attr: interpolate_hourly(values) for attr, values in samples.items()}
+
+
+async def _async_statistics(
+    hass: core.HomeAssistant, statistic_id: str, counters: list[HourlyCounter]
+) -> list[StatisticData]:
+    """Make statistics rows continuing the sum of the hour before each gap."""
+    existing = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        datetime.fromtimestamp(counters[0].start - HOUR, tz=UTC),
+        datetime.fromtimestamp(counters[-1].start + HOUR, tz=UTC),
+        {statistic_id},
+        "hour",
+        None,
+        {"state", "sum"},
+    )
+    rows = {row["start"]: row for row in existing.get(statistic_id, [])}
+
+    statistics: list[StatisticData] = []
+    base = None
+    prev_start = None
+    for counter in counters:
+        if prev_start is None or counter.start - HOUR != prev_start:
+            # A new gap, continue from the hour before it
+            row = rows.get(counter.start - HOUR)
+            base = None
+            if row is not None and None not in (row.get("sum"), row.get("state")):
+                base = (row["sum"], row["state"])
+        prev_start = counter.start
+        if base is None:
+            continue
+        base_sum, base_state = base
+        statistics.append(
+            StatisticData(
+                start=datetime.fromtimestamp(counter.start, tz=UTC),
+                state=counter.state,
+                sum=round(base_sum + counter.state - base_state, 3),
+            )
+        )
+    return statistics
+
+
+async def async_backfill_statistics(hass: core.HomeAssistant, entry_id: str) -> int:
+    """Import hourly energy statistics for the gaps in the journal.
+
+    Rows are calculated in the executor and imported in one batch per
+    sensor. Importing replaces rows with the same start, so it is safe to
+    run again. Returns the number of rows imported.
+    """
+    if "recorder" not in hass.config.components:
+        return 0
+    data = hass.data[DOMAIN][entry_id]
+    journal: SampleJournal | None = data["meterclient"].journal
+    meter_sn = data["coordinator"].meter_sn
+    if journal is None or meter_sn is None:
+        return 0
+
+    await data["coordinator"].async_flush_journal()
+    hourly = await hass.async_add_executor_job(
+        _hourly_from_journal, journal, dt_util.DEFAULT_TIME_ZONE
+    )
+
+    registry = er.async_get(hass)
+    imported = 0
+    for attr, name in ENERGY_SENSORS:
+        counters = hourly[attr]
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{DOMAIN}-{meter_sn}-{name}"
+        )
+        if not counters or entity_id is None:
+            continue
+
+        statistics = await _async_statistics(hass, entity_id, counters)
+        if not statistics:
+            continue
+        async_import_statistics(
+            hass,
+            StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=None,
+                source="recorder",
+                statistic_id=entity_id,
+                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            ),
+            statistics,
+        )
+        _LOGGER.debug("Backfilled %s hours of %s", len(statistics), entity_id)
+        imported += len(statistics)
+    return imported
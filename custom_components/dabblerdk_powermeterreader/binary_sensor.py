@@ -2,7 +2,6 @@
 
 from enum import IntEnum
 import logging
-import traceback
 
 from homeassistant import config_entries, core
 from homeassistant.components.binary_sensor import (
@@ -14,8 +13,8 @@ from homeassistant.core import callback
 from homeassistant.exceptions import PlatformNotReady
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
+from . import MeterCoordinator
 from .const import DOMAIN
-from .meter import MeterReader
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,11 +52,13 @@ async def async_setup_entry(
     """Set up the dabblerdk_powermeterreader binary_sensor platform."""
     config = hass.data[DOMAIN][config_entry.entry_id]
 
-    _meterclient: MeterReader = config["meterclient"]
+    _coordinator: MeterCoordinator = config["coordinator"]
 
     # Make sure we can get meter SN as it is part of the unique_id
     try:
-        meter_sn = await _meterclient.get_metersn()
+        if _coordinator.meter_sn is None:
+            await _coordinator.async_refresh()
+        meter_sn = _coordinator.meter_sn
         if meter_sn is None:
             raise PlatformNotReady
     except Exception as err:
@@ -66,14 +67,14 @@ async def async_setup_entry(
     try:
         # fmt: off
         sensors = []
-        sensors.append(MeterBinaryEntity(config_entry.entry_id, config["name"], True, _meterclient, SENSORS[EchelonBinarySensorType.MEP_CONNECTIVITY], meter_sn))
-        sensors.append(MeterBinaryEntity(config_entry.entry_id, config["name"], True, _meterclient, SENSORS[EchelonBinarySensorType.MEP_PROBLEM], meter_sn))
-        async_add_entities(sensors, update_before_add=True)
+        sensors.append(MeterBinaryEntity(config_entry.entry_id, config["name"], True, _coordinator, SENSORS[EchelonBinarySensorType.MEP_CONNECTIVITY], meter_sn))
+        sensors.append(MeterBinaryEntity(config_entry.entry_id, config["name"], True, _coordinator, SENSORS[EchelonBinarySensorType.MEP_PROBLEM], meter_sn))
+        async_add_entities(sensors)
         # fmt: on
 
     except Exception as err:
         _LOGGER.warning("Failed to add sensors: %s", err)
-        _LOGGER.debug("%s", traceback.format_exc())
+        _LOGGER.debug("Failed to add sensors", exc_info=True)
         raise PlatformNotReady from err
 
 
@@ -85,7 +86,7 @@ class MeterBinaryEntity(BinarySensorEntity):
         config_entry_id,
         meterName,
         is_mep,
-        meterclient,
+        coordinator: MeterCoordinator,
         description: BinarySensorEntityDescription,
         meter_sn,
     ) -> None:
@@ -95,11 +96,10 @@ class MeterBinaryEntity(BinarySensorEntity):
         self._itemName = self.entity_description.name
         self._is_mep = is_mep
         self._config_entry_id = config_entry_id
-        self._meterclient = meterclient
+        self._coordinator = coordinator
         self._manufacturer = None
         self._model = None
         self._sw_version = None
-        self._prev_time = None
         self._meter_sn = meter_sn
 
         self._attr_is_on = None
@@ -136,100 +136,55 @@ class MeterBinaryEntity(BinarySensorEntity):
         """Device availability."""
         return self._attr_is_on is not None
 
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
+    def _update_from_coordinator(self):
+        """Set state from the data fetched by the coordinator."""
         self._attr_is_on = None
 
         _LOGGER.debug("Setting status for %s", self._attr_name)
 
-        try:
-            # Unique ID
-            meter_sn = await self._meterclient.get_metersn()
-            if meter_sn is not None:
-                if self._meter_sn != meter_sn:
-                    self._meter_sn = meter_sn
-                    mep = "" if not self._is_mep else "MEP"
-                    self._attr_unique_id = f"{DOMAIN}-{self._meter_sn}-{mep}-{self.entity_description.name}".replace(
-                        "--", "-"
-                    )
-
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.warning(
-                "Failed to update binary sensor %s: %s", self._attr_name, err
-            )
-            _LOGGER.debug("%s", traceback.format_exc())
+        snapshot = self._coordinator.snapshot
+
+        # Unique ID
+        meter_sn = None if snapshot is None else snapshot.utility_sn
+        if meter_sn is not None:
+            if self._meter_sn != meter_sn:
+                self._meter_sn = meter_sn
+                mep = "" if not self._is_mep else "MEP"
+                self._attr_unique_id = f"{DOMAIN}-{self._meter_sn}-{mep}-{self.entity_description.name}".replace(
+                    "--", "-"
+                )
 
         if self._itemName == "Connection":
-            self._attr_is_on = await self._meterclient.is_connected()
+            self._attr_is_on = self._coordinator.connected
 
         if self._itemName == "Problem":
-            try:
-                self._attr_is_on = False
-                data = await self._meterclient.get_meter_data()
+            self._attr_is_on = False
 
-                if data is None:
-                    self._attr_is_on = True
-                    _LOGGER.debug("Problem: data is None")
-                else:
-                    if data["CurrentDateTime"] != self._prev_time:
-                        self._prev_time = data["CurrentDateTime"]
-                    else:
-                        self._attr_is_on = True
-                        _LOGGER.debug(
-                            "Problem: CurrentDateTime is the same as previous"
-                        )
-
-                    try:
-                        for param in [
-                            "Fwd_Act_Wh",
-                            "Rev_Act_Wh",
-                            "L1_RMS_A",
-                            "L2_RMS_A",
-                            "L3_RMS_A",
-                            "L1_RMS_V",
-                            "L2_RMS_V",
-                            "L3_RMS_V",
-                            "Fwd_W",
-                            "Rev_W",
-                            "L1_Fwd_W",
-                            "L2_Fwd_W",
-                            "L3_Fwd_W",
-                            "L1_Rev_W",
-                            "L2_Rev_W",
-                            "L3_Rev_W",
-                        ]:
-                            int(data[param])
-                    except Exception:  # pylint: disable=broad-except
-                        self._attr_is_on = True
-                        _LOGGER.debug("Problem: CurrentDateTime has not changed")
-
-                    if await self._meterclient.is_stuck_with_prev_value():
-                        self._attr_is_on = True
-                        _LOGGER.debug("Problem: Sticking with previous value")
-            except Exception:  # pylint: disable=broad-except
+            if snapshot is None:
                 self._attr_is_on = True
-                _LOGGER.debug("Problem: Exception")
+                _LOGGER.debug("Problem: data is None")
+            else:
+                if self._coordinator.meter_time_frozen:
+                    self._attr_is_on = True
+                    _LOGGER.debug("Problem: CurrentDateTime is the same as previous")
 
-        try:
+                if not snapshot.is_complete:
+                    self._attr_is_on = True
+                    _LOGGER.debug("Problem: Not all values are integers")
+
+                if self._coordinator.stuck_with_prev_value:
+                    self._attr_is_on = True
+                    _LOGGER.debug("Problem: Sticking with previous value")
+
+        if snapshot is not None:
             if self._is_mep:
-                self._manufacturer = await self._meterclient.get_value(["ESP_SW_By"])
-                self._model = await self._meterclient.get_value(["ESP_SW"])
-                self._sw_version = await self._meterclient.get_value(["ESP_SW_Version"])
+                self._manufacturer = snapshot.esp_sw_by
+                self._model = snapshot.esp_sw
+                self._sw_version = snapshot.esp_sw_version
             else:
-                self._manufacturer = await self._meterclient.get_value(
-                    ["Meter_Manufacturer"]
-                )
-                self._model = await self._meterclient.get_value(["Meter_Model"])
-                self._sw_version = await self._meterclient.get_value(
-                    ["Meter_SW_Version"]
-                )
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.debug(
-                "Failed to get Manufacturer, Model & SW. Version %s: %s",
-                self._attr_name,
-                err,
-            )
-            _LOGGER.debug("%s", traceback.format_exc())
+                self._manufacturer = snapshot.meter_manufacturer
+                self._model = snapshot.meter_model
+                self._sw_version = snapshot.meter_sw_version
 
     @property
     def should_poll(self):
@@ -238,6 +193,7 @@ class MeterBinaryEntity(BinarySensorEntity):
 
     async def async_added_to_hass(self):
         """Register callbacks."""
+        self._update_from_coordinator()
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
@@ -248,5 +204,11 @@ class MeterBinaryEntity(BinarySensorEntity):
 
     @callback
     def _update_callback(self):
-        """Call update method."""
-        self.async_schedule_update_ha_state(True)
+        """Update state from the coordinator data, no I/O involved.
+
+        The state is only written when it changed.
+        """
+        is_on = self._attr_is_on
+        self._update_from_coordinator()
+        if self._attr_is_on != is_on:
+            self.async_write_ha_state()
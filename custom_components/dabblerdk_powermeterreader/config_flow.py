@@ -11,7 +11,29 @@ from homeassistant.const import CONF_NAME, CONF_SCAN_INTERVAL, CONF_URL
 from homeassistant.core import HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN
+from . import async_create_resolver
+from .const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
+    CONF_FUSE_SIZE,
+    CONF_HEARTBEAT,
+    CONF_JOURNAL_INTERVAL,
+    CONF_MAX_STALENESS,
+    CONF_READ_TIMEOUT,
+    CONF_SAMPLE_INTERVAL,
+    CONF_SCAN_INTERVAL_MAX,
+    CONF_SCAN_INTERVAL_MIN,
+    CONF_STREAMING,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_DEADBANDS,
+    DEFAULT_FUSE_SIZE,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_JOURNAL_INTERVAL,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_READ_TIMEOUT,
+    DOMAIN,
+)
 from .meter import MeterReader
 
 _LOGGER = logging.getLogger(__name__)
@@ -75,6 +97,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry) -> None:
         """Initialize options flow."""
         self.config_entry = config_entry
+        self._data: dict[str, Any] = {}
+        self._options: dict[str, Any] = {}
 
     async def async_step_init(
         self, user_input: dict[str, Any] = None
@@ -94,18 +118,92 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             except Exception:  # pylint: disable=broad-except
                 errors[CONF_SCAN_INTERVAL] = "scan_interval_integer"
 
+            # Check adaptive scan interval bounds, those left at the old scan
+            # interval follow the new one
+            user_input = dict(user_input)
+            old_scan_interval = self.config_entry.options.get(CONF_SCAN_INTERVAL, 300)
+            for key in (CONF_SCAN_INTERVAL_MIN, CONF_SCAN_INTERVAL_MAX):
+                try:
+                    val = int(user_input[key])
+                    if val == old_scan_interval and CONF_SCAN_INTERVAL not in errors:
+                        user_input[key] = val = int(user_input[CONF_SCAN_INTERVAL])
+                    if val < 5 or val > 3600:
+                        errors[key] = "scan_interval_outofbounds"
+                except Exception:  # pylint: disable=broad-except
+                    errors[key] = "scan_interval_integer"
+            if not errors.keys() & {
+                CONF_SCAN_INTERVAL,
+                CONF_SCAN_INTERVAL_MIN,
+                CONF_SCAN_INTERVAL_MAX,
+            } and not (
+                int(user_input[CONF_SCAN_INTERVAL_MIN])
+                <= int(user_input[CONF_SCAN_INTERVAL])
+                <= int(user_input[CONF_SCAN_INTERVAL_MAX])
+            ):
+                errors[CONF_SCAN_INTERVAL_MIN] = "scan_interval_bounds"
+
+            # Check sample interval, 0 disables sampling
+            try:
+                val = int(user_input[CONF_SAMPLE_INTERVAL])
+                if val != 0 and (val < 1 or val > 3600):
+                    errors[CONF_SAMPLE_INTERVAL] = "sample_interval_outofbounds"
+            except Exception:  # pylint: disable=broad-except
+                errors[CONF_SAMPLE_INTERVAL] = "integer"
+
+            # Check journal interval, 0 disables the journal
+            try:
+                val = int(user_input[CONF_JOURNAL_INTERVAL])
+                if val != 0 and (val < 5 or val > 3600):
+                    errors[CONF_JOURNAL_INTERVAL] = "journal_interval_outofbounds"
+            except Exception:  # pylint: disable=broad-except
+                errors[CONF_JOURNAL_INTERVAL] = "integer"
+
+            # Check fuse size
+            try:
+                val = int(user_input[CONF_FUSE_SIZE])
+                if val < 6 or val > 250:
+                    errors[CONF_FUSE_SIZE] = "fuse_size_outofbounds"
+            except Exception:  # pylint: disable=broad-except
+                errors[CONF_FUSE_SIZE] = "integer"
+
+            # Check max staleness, 0 always waits for a fresh reading
+            try:
+                val = int(user_input[CONF_MAX_STALENESS])
+                if val != 0 and (val < 5 or val > 86400):
+                    errors[CONF_MAX_STALENESS] = "max_staleness_outofbounds"
+            except Exception:  # pylint: disable=broad-except
+                errors[CONF_MAX_STALENESS] = "integer"
+
+            # Check timeouts
+            for key in (CONF_CONNECT_TIMEOUT, CONF_READ_TIMEOUT):
+                try:
+                    val = int(user_input[key])
+                    if val < 1 or val > 60:
+                        errors[key] = "timeout_outofbounds"
+                except Exception:  # pylint: disable=broad-except
+                    errors[key] = "timeout_integer"
+
             if not errors:
                 data = dict(self.config_entry.data)
                 data[CONF_URL] = user_input[CONF_URL]
 
                 options = {}
                 options[CONF_SCAN_INTERVAL] = user_input[CONF_SCAN_INTERVAL]
+                options[CONF_SCAN_INTERVAL_MIN] = user_input[CONF_SCAN_INTERVAL_MIN]
+                options[CONF_SCAN_INTERVAL_MAX] = user_input[CONF_SCAN_INTERVAL_MAX]
+                options[CONF_SAMPLE_INTERVAL] = user_input[CONF_SAMPLE_INTERVAL]
+                options[CONF_JOURNAL_INTERVAL] = user_input[CONF_JOURNAL_INTERVAL]
+                options[CONF_FUSE_SIZE] = user_input[CONF_FUSE_SIZE]
+                options[CONF_MAX_STALENESS] = user_input[CONF_MAX_STALENESS]
+                options[CONF_CONNECT_TIMEOUT] = user_input[CONF_CONNECT_TIMEOUT]
+                options[CONF_READ_TIMEOUT] = user_input[CONF_READ_TIMEOUT]
+                options[CONF_STREAMING] = user_input[CONF_STREAMING]
 
-                self.hass.config_entries.async_update_entry(
-                    self.config_entry, data=data, options=options
-                )
-                return self.async_create_entry(title="", data=options)
+                self._data = data
+                self._options = options
+                return await self.async_step_deadband()
 
+        scan_interval = self.config_entry.options.get(CONF_SCAN_INTERVAL, 300)
         options_schema = vol.Schema(
             {
                 vol.Required(
@@ -113,14 +211,122 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 ): cv.string,
                 vol.Required(
                     CONF_SCAN_INTERVAL,
-                    default=self.config_entry.options.get(CONF_SCAN_INTERVAL, 300),
+                    default=scan_interval,
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_SCAN_INTERVAL_MIN,
+                    default=self.config_entry.options.get(
+                        CONF_SCAN_INTERVAL_MIN, scan_interval
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_SCAN_INTERVAL_MAX,
+                    default=self.config_entry.options.get(
+                        CONF_SCAN_INTERVAL_MAX, scan_interval
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_SAMPLE_INTERVAL,
+                    default=self.config_entry.options.get(CONF_SAMPLE_INTERVAL, 0),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_JOURNAL_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_JOURNAL_INTERVAL, DEFAULT_JOURNAL_INTERVAL
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_FUSE_SIZE,
+                    default=self.config_entry.options.get(
+                        CONF_FUSE_SIZE, DEFAULT_FUSE_SIZE
+                    ),
                 ): cv.positive_int,
+                vol.Required(
+                    CONF_MAX_STALENESS,
+                    default=self.config_entry.options.get(
+                        CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_CONNECT_TIMEOUT,
+                    default=self.config_entry.options.get(
+                        CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_READ_TIMEOUT,
+                    default=self.config_entry.options.get(
+                        CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_STREAMING,
+                    default=self.config_entry.options.get(CONF_STREAMING, False),
+                ): cv.boolean,
             }
         )
         return self.async_show_form(
             step_id="init", data_schema=options_schema, errors=errors
         )
 
+    async def async_step_deadband(
+        self, user_input: dict[str, Any] = None
+    ) -> dict[str, Any]:
+        """Manage the deadbands of the sensors."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            # Check percentages
+            for name in DEFAULT_DEADBANDS:
+                key = CONF_DEADBAND_PERCENT.format(name)
+                if user_input[key] > 100:
+                    errors[key] = "deadband_percent_outofbounds"
+
+            # Check heartbeat
+            try:
+                val = int(user_input[CONF_HEARTBEAT])
+                if val < 5 or val > 86400:
+                    errors[CONF_HEARTBEAT] = "heartbeat_outofbounds"
+            except Exception:  # pylint: disable=broad-except
+                errors[CONF_HEARTBEAT] = "integer"
+
+            if not errors:
+                options = self._options
+                for name in DEFAULT_DEADBANDS:
+                    for key in (
+                        CONF_DEADBAND.format(name),
+                        CONF_DEADBAND_PERCENT.format(name),
+                    ):
+                        options[key] = user_input[key]
+                options[CONF_HEARTBEAT] = user_input[CONF_HEARTBEAT]
+
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry, data=self._data, options=options
+                )
+                return self.async_create_entry(title="", data=options)
+
+        fields = {}
+        for name, (absolute, percent) in DEFAULT_DEADBANDS.items():
+            key = CONF_DEADBAND.format(name)
+            fields[
+                vol.Required(key, default=self.config_entry.options.get(key, absolute))
+            ] = cv.positive_float
+            key = CONF_DEADBAND_PERCENT.format(name)
+            fields[
+                vol.Required(key, default=self.config_entry.options.get(key, percent))
+            ] = cv.positive_float
+        fields[
+            vol.Required(
+                CONF_HEARTBEAT,
+                default=self.config_entry.options.get(
+                    CONF_HEARTBEAT, DEFAULT_HEARTBEAT
+                ),
+            )
+        ] = cv.positive_int
+        return self.async_show_form(
+            step_id="deadband", data_schema=vol.Schema(fields), errors=errors
+        )
+
 
 async def fnCheckUrl(url, hass: HomeAssistant, errors: dict[str, str]):
     """Check if url is working."""
@@ -130,31 +336,14 @@ async def fnCheckUrl(url, hass: HomeAssistant, errors: dict[str, str]):
     ):
         errors[CONF_URL] = "invalid_url"
     else:
+        # Not the shared resolver, which would outlive a flow without entry
+        resolver = async_create_resolver(hass)
+        client = MeterReader(url, resolver=resolver)
         try:
-            client = MeterReader(url, hass)
-            data = await client.get_meter_data()
+            await client.get_meter_data()
 
-            try:
-                for param in [
-                    "Fwd_Act_Wh",
-                    "Rev_Act_Wh",
-                    "L1_RMS_A",
-                    "L2_RMS_A",
-                    "L3_RMS_A",
-                    "L1_RMS_V",
-                    "L2_RMS_V",
-                    "L3_RMS_V",
-                    "Fwd_W",
-                    "Rev_W",
-                    "L1_Fwd_W",
-                    "L2_Fwd_W",
-                    "L3_Fwd_W",
-                    "L1_Rev_W",
-                    "L2_Rev_W",
-                    "L3_Rev_W",
-                ]:
-                    int(data[param])
-            except Exception:  # pylint: disable=broad-except
+            snapshot = client.state.snapshot
+            if snapshot is None or not snapshot.is_complete:
                 errors[CONF_URL] = "unexpected_response"
 
         except Exception as err:  # pylint: disable=broad-except
@@ -165,3 +354,6 @@ async def fnCheckUrl(url, hass: HomeAssistant, errors: dict[str, str]):
             # elif str(err).startswith("Requesting meter values failed:"):
             else:
                 errors[CONF_URL] = "request_failed"
+        finally:
+            await client.async_close()
+            await resolver.async_close()
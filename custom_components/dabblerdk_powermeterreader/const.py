@@ -1,3 +1,65 @@
 """Support for dabblerdk_powermeterreader."""
 
 DOMAIN = "dabblerdk_powermeterreader"
+# hass.data key of the Fleet shared by all config entries
+DATA_FLEET = f"{DOMAIN}_fleet"
+# hass.data key of the MdnsResolver shared by all config entries
+DATA_RESOLVER = f"{DOMAIN}_resolver"
+
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_STREAMING = "streaming"
+CONF_SAMPLE_INTERVAL = "sample_interval"
+CONF_SCAN_INTERVAL_MIN = "scan_interval_min"
+CONF_SCAN_INTERVAL_MAX = "scan_interval_max"
+CONF_JOURNAL_INTERVAL = "journal_interval"
+CONF_FUSE_SIZE = "fuse_size"
+CONF_MAX_STALENESS = "max_staleness"
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 10
+# Ampere per phase, limiting how fast the energy counter can grow
+DEFAULT_FUSE_SIZE = 16
+# Seconds between writes of the journal to disk, 0 disables the journal
+DEFAULT_JOURNAL_INTERVAL = 60
+# Seconds an expired reading may be shown while refreshing, 0 always waits
+DEFAULT_MAX_STALENESS = 0
+
+# Seconds between attempts to reconnect the stream
+STREAM_RETRY_MIN = 5
+STREAM_RETRY_MAX = 300
+
+# Deadbands, only writing a new state when the value has moved this much,
+# or when nothing was written for heartbeat seconds
+CONF_DEADBAND = "deadband_{}"
+CONF_DEADBAND_PERCENT = "deadband_{}_percent"
+CONF_HEARTBEAT = "heartbeat"
+
+DEFAULT_HEARTBEAT = 600
+# (absolute, percent) per EchelonSensorType, by lower case name
+DEFAULT_DEADBANDS = {
+    "energy_fwd": (0, 0),
+    "energy_rev": (0, 0),
+    "voltage": (0.5, 0),
+    "current": (0.05, 0),
+    "power": (5, 1),
+    "power_phase": (5, 1),
+    "power_rev": (5, 1),
+    "frequency": (0.01, 0),
+}
+
+# Readings kept in memory for the get_statistics service
+HISTORY_SPAN = 86400
+
+SERVICE_GET_STATISTICS = "get_statistics"
+SERVICE_BACKFILL_STATISTICS = "backfill_statistics"
+SERVICE_PROFILE = "profile"
+SERVICE_STOP_PROFILE = "stop_profile"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DURATION = "duration"
+ATTR_FIELDS = "fields"
+ATTR_PERCENTILES = "percentiles"
+
+# Seconds the profile service runs for, by default and at most
+DEFAULT_PROFILE_DURATION = 60
+MAX_PROFILE_DURATION = 1800
@@ -0,0 +1,39 @@
+"""Diagnostics support for dabblerdk_powermeterreader."""
+
+from typing import Any
+
+from homeassistant import config_entries, core
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import DATA_FLEET, DOMAIN
+from .meter import MeterReader
+
+TO_REDACT = {"Utility_SN"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    meterclient: MeterReader = hass.data[DOMAIN][entry.entry_id]["meterclient"]
+    state = meterclient.state
+
+    return {
+        "options": dict(entry.options),
+        "state": {
+            "connected": state.connected,
+            "stuck_with_prev_value": state.stuck_with_prev_value,
+            "fetched_at": state.fetched_at,
+            "accepted_at": state.accepted_at,
+        },
+        "resolver": meterclient.get_resolver_stats(),
+        "metrics": meterclient.metrics.as_dict(),
+        "plausibility": meterclient.plausibility.stats(),
+        "fleet": hass.data[DATA_FLEET].stats(),
+        "history": {
+            "samples": len(meterclient.history),
+            "capacity": meterclient.history.capacity,
+            "bytes": meterclient.history.nbytes,
+        },
+        "debug_log": async_redact_data(meterclient.get_debug_log(), TO_REDACT),
+    }
@@ -1,5 +1,13 @@
 """Wrapper for dabbler.dk MEP module."""
 
-from .meter import MeterReader
+from .aggregate import MeterAggregate, SampleAggregator
+from .filters import PlausibilityConfig, PlausibilityFilter, Verdict
+from .fleet import Fleet
+from .history import SampleHistory, summarize
+from .journal import JournalRecord, SampleJournal
+from .meter import CACHE_TIME, MeterReader, MeterSnapshot, MeterState
+from .metrics import ReaderMetrics
+from .resolver import MdnsResolver
+from .scheduler import AdaptiveScheduler
 
 __version__ = "0.1.0"
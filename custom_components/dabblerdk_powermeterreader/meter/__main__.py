@@ -1 +1,193 @@
-"""Wrapper for dabbler.dk MEP module."""
+"""Command line reader of dabbler.dk MEP modules.
+
+Run from the integration directory with python -m meter URL [URL ...].
+The modules are polled concurrently and each reading is printed as a JSON
+line on stdout. A summary per module, with latency and errors, is printed
+as JSON on stderr when done.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+import contextlib
+from datetime import UTC, datetime
+import json
+import logging
+import signal
+import sys
+from typing import TextIO
+
+from .fleet import DEFAULT_MAX_CONCURRENT, Fleet
+from .meter import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, MeterReader
+
+
+async def _async_poll(
+    reader: MeterReader,
+    url: str,
+    phase: float,
+    options: argparse.Namespace,
+    out: TextIO | None,
+    record: TextIO | None,
+    errors: Counter,
+    stop: asyncio.Event,
+) -> None:
+    """Poll one module count times, or until stopped."""
+    polls = 0
+    while not options.count or polls < options.count:
+        if polls:
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(Fleet.next_delay(phase, options.interval)):
+                    await stop.wait()
+        if stop.is_set():
+            return
+        polls += 1
+
+        rejections = reader.metrics.rejections.copy()
+        payload = None
+        try:
+            data = await reader.get_meter_data()
+        except Exception as err:  # pylint: disable=broad-except
+            errors[str(err)] += 1
+            verdict = f"error: {err}"
+        else:
+            if reader.state.stuck_with_prev_value:
+                # data is the previous reading, the rejected one is not kept
+                reasons = reader.metrics.rejections - rejections
+                verdict = next(iter(reasons), "rejected")
+            else:
+                verdict = "accepted"
+                payload = dict(data)
+
+        now = datetime.now(tz=UTC).isoformat()
+        if out is not None:
+            snapshot = reader.state.snapshot if payload is not None else None
+            line = {
+                "time": now,
+                "url": url,
+                "verdict": verdict,
+                "snapshot": None if snapshot is None else snapshot.as_dict(),
+            }
+            out.write(json.dumps(line) + "\n")
+            out.flush()
+        if record is not None:
+            line = {"url": url, "time": now, "verdict": verdict, "payload": payload}
+            record.write(json.dumps(line) + "\n")
+
+
+def _summary(url: str, reader: MeterReader, errors: Counter) -> dict:
+    """Get what happened polling one module."""
+    metrics = reader.metrics
+    total = metrics.latency["total"]
+    mean = total.mean
+    return {
+        "url": url,
+        "fetches": metrics.fetches,
+        "failures": metrics.failures,
+        "rejections": dict(metrics.rejections),
+        "errors": dict(errors),
+        "latency_ms": {
+            "mean": None if mean is None else round(mean, 3),
+            "p50": total.quantile(0.5),
+            "p95": total.quantile(0.95),
+        },
+        "latency_parts_ms": {
+            part: None if histogram.mean is None else round(histogram.mean, 3)
+            for part, histogram in metrics.latency.items()
+        },
+    }
+
+
+async def _async_main(options: argparse.Namespace, record: TextIO | None) -> list[dict]:
+    """Poll the modules until done, returning the summaries."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    with contextlib.suppress(NotImplementedError):
+        loop.add_signal_handler(signal.SIGINT, stop.set)
+    if options.duration:
+        loop.call_later(options.duration, stop.set)
+
+    fleet = Fleet(options.concurrency)
+    readers = {
+        url: MeterReader(
+            url,
+            session_provider=fleet.get_session,
+            limiter=fleet.limiter,
+            connect_timeout=options.connect_timeout,
+            read_timeout=options.read_timeout,
+            cache_time=0,
+        )
+        for url in dict.fromkeys(options.urls)
+    }
+    errors = {url: Counter() for url in readers}
+    try:
+        # A module failing in an unexpected way does not stop the others
+        results = await asyncio.gather(
+            *(
+                _async_poll(
+                    reader,
+                    url,
+                    fleet.join(url),
+                    options,
+                    None if options.quiet else sys.stdout,
+                    record,
+                    errors[url],
+                    stop,
+                )
+                for url, reader in readers.items()
+            ),
+            return_exceptions=True,
+        )
+        for url, result in zip(readers, results, strict=True):
+            if isinstance(result, Exception):
+                errors[url][repr(result)] += 1
+    finally:
+        for reader in readers.values():
+            await reader.async_close()
+        await fleet.async_close()
+    return [_summary(url, reader, errors[url]) for url, reader in readers.items()]
+
+
+def main(argv: list[str]) -> int:
+    """Poll the modules given in argv."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("urls", nargs="+", metavar="URL", help="e.g. http://mep.local")
+    parser.add_argument(
+        "--interval", type=float, default=10, help="seconds between polls"
+    )
+    parser.add_argument(
+        "--count", type=int, default=1, help="polls per module, 0 to keep polling"
+    )
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT,
+        help="most requests in flight",
+    )
+    parser.add_argument(
+        "--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT
+    )
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT)
+    parser.add_argument("--record", help="append raw payloads as JSON lines here")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    parser.add_argument("--verbose", action="store_true", help="log debug messages")
+    options = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if options.verbose else logging.ERROR)
+
+    with contextlib.ExitStack() as stack:
+        record = None
+        if options.record:
+            record = stack.enter_context(open(options.record, "a", encoding="utf-8"))
+        summaries = asyncio.run(_async_main(options, record))
+
+    json.dump(summaries, sys.stderr, indent=2)
+    sys.stderr.write("\n")
+    return (
+        0
+        if all(summary["failures"] < summary["fetches"] for summary in summaries)
+        else 1
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
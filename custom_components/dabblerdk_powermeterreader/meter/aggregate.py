@@ -0,0 +1,94 @@
+"""Aggregation of high-rate samples from dabbler.dk MEP module."""
+
+from dataclasses import dataclass
+import math
+
+from .meter import FIELDS, INFO_FIELDS, MeterSnapshot
+
+_ATTRS = tuple(attr for _, attr, _ in FIELDS)
+
+
+@dataclass(frozen=True, slots=True)
+class MeterAggregate:
+    """Statistics over the samples accepted in one publish interval.
+
+    mean, minimum and maximum are MeterSnapshot objects holding the
+    statistic of each field, so they can be read like a single reading.
+    """
+
+    count: int
+    mean: MeterSnapshot
+    minimum: MeterSnapshot
+    maximum: MeterSnapshot
+    last: MeterSnapshot
+
+
+class SampleAggregator:
+    """Accumulate accepted snapshots until the next publish."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._reset()
+
+    def _reset(self) -> None:
+        """Start a new interval."""
+        size = len(_ATTRS)
+        self._count = 0
+        self._counts = [0] * size
+        self._sums = [0.0] * size
+        self._mins = [math.inf] * size
+        self._maxs = [-math.inf] * size
+        self._last: MeterSnapshot | None = None
+
+    @property
+    def count(self) -> int:
+        """Samples in the current interval."""
+        return self._count
+
+    def add(self, snapshot: MeterSnapshot) -> None:
+        """Add an accepted sample."""
+        counts, sums, mins, maxs = self._counts, self._sums, self._mins, self._maxs
+        for index, attr in enumerate(_ATTRS):
+            value = getattr(snapshot, attr)
+            if value is None:
+                continue
+            counts[index] += 1
+            sums[index] += value
+            if value < mins[index]:
+                mins[index] = value
+            if value > maxs[index]:
+                maxs[index] = value
+        self._count += 1
+        self._last = snapshot
+
+    def pop(self) -> MeterAggregate | None:
+        """Get statistics of the current interval and start a new one.
+
+        Returns None if no samples were accepted in the interval.
+        """
+        if self._last is None:
+            return None
+
+        counts = self._counts
+        means = [
+            round(total / count, 3) if count else None
+            for total, count in zip(self._sums, counts)
+        ]
+        mins = [value if count else None for value, count in zip(self._mins, counts)]
+        maxs = [value if count else None for value, count in zip(self._maxs, counts)]
+        aggregate = MeterAggregate(
+            count=self._count,
+            mean=self._to_snapshot(means),
+            minimum=self._to_snapshot(mins),
+            maximum=self._to_snapshot(maxs),
+            last=self._last,
+        )
+        self._reset()
+        return aggregate
+
+    def _to_snapshot(self, values: list) -> MeterSnapshot:
+        """Make a snapshot holding values, with text fields from the last sample."""
+        snapshot = MeterSnapshot.from_values(values)
+        for _, attr in INFO_FIELDS:
+            setattr(snapshot, attr, getattr(self._last, attr))
+        return snapshot
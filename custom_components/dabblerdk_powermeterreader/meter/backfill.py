@@ -0,0 +1,84 @@
+"""Hourly energy counters interpolated across gaps in the readings."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, tzinfo
+
+HOUR = 3600
+# Gaps shorter than this are left to the recorder's own statistics
+MIN_GAP = HOUR
+
+METER_TIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%d-%m-%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%d-%m-%Y %H:%M",
+)
+
+
+def parse_meter_time(value: str | None, tz: tzinfo = UTC) -> datetime | None:
+    """Parse CurrentDateTime of the meter, or None if not understood.
+
+    ISO 8601 with an offset is taken as is, other formats are in tz.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = None
+        for time_format in METER_TIME_FORMATS:
+            try:
+                parsed = datetime.strptime(value, time_format)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed
+
+
+@dataclass(frozen=True, slots=True)
+class HourlyCounter:
+    """Interpolated counter at the end of the hour starting at start."""
+
+    start: float
+    state: float
+
+
+def interpolate_hourly(
+    samples: Iterable[tuple[float, float | None]], min_gap: float = MIN_GAP
+) -> list[HourlyCounter]:
+    """Get counters at the hour boundaries inside gaps between samples.
+
+    samples are (POSIX seconds, counter) pairs. For each pair of
+    consecutive samples more than min_gap apart, the counter at every hour
+    boundary between them is interpolated linearly. Gaps where the counter
+    went down are skipped. Returns one HourlyCounter per hour ending inside
+    a gap, in time order, without duplicates.
+    """
+    result: list[HourlyCounter] = []
+    prev_time = prev_value = None
+    for time, value in sorted(sample for sample in samples if sample[1] is not None):
+        if prev_time is not None and time - prev_time > min_gap and value >= prev_value:
+            rate = (value - prev_value) / (time - prev_time)
+            boundary = (prev_time // HOUR + 1) * HOUR
+            while boundary < time:
+                start = boundary - HOUR
+                if not result or start > result[-1].start:
+                    result.append(
+                        HourlyCounter(
+                            start,
+                            round(prev_value + rate * (boundary - prev_time), 3),
+                        )
+                    )
+                boundary += HOUR
+        prev_time, prev_value = time, value
+    return result
@@ -0,0 +1,212 @@
+"""Plausibility rules for readings from dabbler.dk MEP module."""
+
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .meter import MeterSnapshot
+
+DEFAULT_FUSE_A = 16
+
+
+@dataclass(frozen=True, slots=True)
+class PlausibilityConfig:
+    """Thresholds of the rules.
+
+    The energy counter may not grow faster than margin times what the
+    fuses allow, over at least min_elapsed seconds. After max_elapsed
+    seconds without an accepted reading any increase is taken.
+    """
+
+    fuse_a: float = DEFAULT_FUSE_A
+    phases: int = 3
+    voltage: float = 230
+    margin: float = 3
+    min_elapsed: float = 60
+    max_elapsed: float = 1800
+    phase_sum_tolerance_w: float = 3
+
+    @property
+    def max_power_w(self) -> float:
+        """Most power the installation can draw."""
+        return self.fuse_a * self.phases * self.voltage
+
+
+@dataclass(frozen=True, slots=True)
+class Verdict:
+    """Outcome of the rules for one reading.
+
+    rule and reason are set when rejected, detail may hold the numbers
+    behind it.
+    """
+
+    accepted: bool
+    rule: str | None = None
+    reason: str | None = None
+    detail: str | None = None
+
+    def __bool__(self) -> bool:
+        """Accepted."""
+        return self.accepted
+
+
+ACCEPTED = Verdict(True)
+
+# A rule gets the last accepted reading, the new one, seconds since the
+# last accepted one (None if unknown) and the config. It returns None to
+# pass, or a (reason, detail) tuple to reject.
+Rule = Callable[
+    ["MeterSnapshot", "MeterSnapshot", float | None, PlausibilityConfig],
+    tuple[str, str | None] | None,
+]
+
+
+def energy_present(
+    prev: "MeterSnapshot",
+    snapshot: "MeterSnapshot",
+    elapsed: float | None,
+    config: PlausibilityConfig,
+) -> tuple[str, str | None] | None:
+    """The forward energy counter must be there."""
+    if snapshot.energy_fwd is None:
+        return ("Fwd_Act_Wh is None", None)
+    return None
+
+
+def energy_rate(
+    prev: "MeterSnapshot",
+    snapshot: "MeterSnapshot",
+    elapsed: float | None,
+    config: PlausibilityConfig,
+) -> tuple[str, str | None] | None:
+    """Fwd_Act_Wh has been seen to jump temporarily.
+
+    That messes up the delta when using state_class=total_increasing, so a
+    decrease, or an increase above what the fuses allow, is rejected for
+    max_elapsed seconds.
+    """
+    elapsed = config.min_elapsed if elapsed is None else elapsed
+    elapsed = max(elapsed, config.min_elapsed)
+    if elapsed > config.max_elapsed:
+        return None
+
+    wh_limit = config.max_power_w / 3600 * config.margin * elapsed
+    if prev.energy_fwd is None:
+        return ("Fwd_Act_Wh changed too much", "no previous value")
+    diff = round((snapshot.energy_fwd - prev.energy_fwd) * 1000)
+    if 0 <= diff <= wh_limit:
+        return None
+    return ("Fwd_Act_Wh changed too much", f"diff {diff} Wh, wh_limit {wh_limit:g} Wh")
+
+
+def phase_sum(
+    prev: "MeterSnapshot",
+    snapshot: "MeterSnapshot",
+    elapsed: float | None,
+    config: PlausibilityConfig,
+) -> tuple[str, str | None] | None:
+    """L1 + L2 + L3 must equal the total, net of returned power."""
+    values = (
+        snapshot.power_fwd,
+        snapshot.power_rev,
+        snapshot.l1_power_fwd,
+        snapshot.l2_power_fwd,
+        snapshot.l3_power_fwd,
+        snapshot.l1_power_rev,
+        snapshot.l2_power_rev,
+        snapshot.l3_power_rev,
+    )
+    if None in values:
+        return ("Power missing", None)
+    total_fwd, total_rev, l1_fwd, l2_fwd, l3_fwd, l1_rev, l2_rev, l3_rev = values
+    sum_power = l1_fwd + l2_fwd + l3_fwd - (l1_rev + l2_rev + l3_rev)
+    total_power = total_fwd - total_rev
+    if abs(total_power - sum_power) <= config.phase_sum_tolerance_w:
+        return None
+    return ("Phase sum does not equal total", f"{sum_power} != {total_power}")
+
+
+DEFAULT_RULES: tuple[Rule, ...] = (energy_present, energy_rate, phase_sum)
+
+
+@dataclass(slots=True)
+class _RuleCounter:
+    """Decisions of one rule."""
+
+    passed: int = 0
+    rejected: int = 0
+
+
+class PlausibilityFilter:
+    """Run readings through the rules, counting what each rule decides.
+
+    Rules run in order and the first rejection wins. The first reading,
+    without a previous one to compare to, is accepted as is.
+    """
+
+    def __init__(
+        self,
+        config: PlausibilityConfig | None = None,
+        rules: Sequence[Rule] = DEFAULT_RULES,
+    ) -> None:
+        """Initialize."""
+        self.config = config or PlausibilityConfig()
+        self.rules = tuple(rules)
+        self.evaluated = 0
+        self.accepted = 0
+        self._counters = {rule.__name__: _RuleCounter() for rule in self.rules}
+
+    def evaluate(
+        self,
+        prev: "MeterSnapshot | None",
+        snapshot: "MeterSnapshot",
+        elapsed: float | None,
+    ) -> Verdict:
+        """Judge snapshot, given the last accepted one and the time since."""
+        self.evaluated += 1
+        if prev is None:
+            self.accepted += 1
+            return ACCEPTED
+
+        config = self.config
+        for rule in self.rules:
+            counter = self._counters[rule.__name__]
+            rejected = rule(prev, snapshot, elapsed, config)
+            if rejected is not None:
+                counter.rejected += 1
+                reason, detail = rejected
+                return Verdict(False, rule.__name__, reason, detail)
+            counter.passed += 1
+        self.accepted += 1
+        return ACCEPTED
+
+    def evaluate_batch(
+        self,
+        readings: Iterable[tuple[float, "MeterSnapshot"]],
+        prev: "MeterSnapshot | None" = None,
+        prev_time: float | None = None,
+    ) -> list[Verdict]:
+        """Judge (POSIX seconds, snapshot) readings in order, like a reader would.
+
+        Each reading is compared to the last accepted one before it.
+        """
+        verdicts = []
+        for timestamp, snapshot in readings:
+            elapsed = None if prev_time is None else timestamp - prev_time
+            verdict = self.evaluate(prev, snapshot, elapsed)
+            if verdict.accepted:
+                prev, prev_time = snapshot, timestamp
+            verdicts.append(verdict)
+        return verdicts
+
+    def stats(self) -> dict:
+        """Get counts of readings judged, and of what each rule decided."""
+        return {
+            "evaluated": self.evaluated,
+            "accepted": self.accepted,
+            "rules": {
+                name: {"passed": counter.passed, "rejected": counter.rejected}
+                for name, counter in self._counters.items()
+            },
+        }
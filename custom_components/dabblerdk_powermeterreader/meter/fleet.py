@@ -0,0 +1,128 @@
+"""Many dabbler.dk MEP modules polled from one host."""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from .metrics import connect_trace_config
+
+if TYPE_CHECKING:
+    import aiohttp
+
+DEFAULT_MAX_CONCURRENT = 8
+CONNECTION_LIMIT_PER_HOST = 2
+KEEPALIVE_TIMEOUT = 60
+# Phases of members k = 0, 1, 2... are k times this, modulo 1, which keeps
+# them spread over the interval however many there are
+GOLDEN_RATIO = (5**0.5 - 1) / 2
+
+
+class RequestLimiter:
+    """Async context manager letting max_concurrent requests in at a time."""
+
+    def __init__(self, max_concurrent: int) -> None:
+        """Initialize."""
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waited = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def __aenter__(self) -> None:
+        """Wait for a free slot."""
+        if self._semaphore.locked():
+            self.waited += 1
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Free the slot."""
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class Fleet:
+    """Meters sharing one connection pool and a limit on requests in flight.
+
+    Each member gets a phase, a fraction of its poll interval, and its polls
+    are aligned to times that are a whole number of intervals past that
+    phase. Members with the same interval then take turns instead of
+    polling at the same instant.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT) -> None:
+        """Initialize."""
+        self.limiter = RequestLimiter(max_concurrent)
+        self._session: "aiohttp.ClientSession | None" = None
+        self._members: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Number of members."""
+        return len(self._members)
+
+    def get_session(self) -> "aiohttp.ClientSession":
+        """Get the shared session, creating it on first use."""
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        if self._session is None or self._session.closed:
+            # Streams hold on to their connections, only requests are limited
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=0,
+                    limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ),
+                trace_configs=[connect_trace_config()],
+            )
+        return self._session
+
+    def join(self, key: str) -> float:
+        """Add a member, returning its phase.
+
+        Members get the lowest free slot, so a member leaving and joining
+        again, e.g. on reload, mostly gets its old phase back.
+        """
+        if key not in self._members:
+            taken = set(self._members.values())
+            self._members[key] = next(
+                slot for slot in range(len(taken) + 1) if slot not in taken
+            )
+        return self._members[key] * GOLDEN_RATIO % 1
+
+    def leave(self, key: str) -> None:
+        """Remove a member."""
+        self._members.pop(key, None)
+
+    @staticmethod
+    def next_delay(phase: float, delay: float, now: float | None = None) -> float:
+        """Get delay moved to the nearest poll time of the member's phase.
+
+        Poll times are phase * delay past a multiple of delay, counted from
+        the epoch. Polling on time every delay seconds lands on them
+        without changes. The result is between half and one and a half
+        delay.
+        """
+        if delay <= 0:
+            return delay
+        now = time.time() if now is None else now
+        offset = phase * delay
+        slot = round((now + delay - offset) / delay) * delay + offset
+        return max(slot - now, delay / 2)
+
+    def stats(self) -> dict:
+        """Get the members and the use of the request limit."""
+        limiter = self.limiter
+        return {
+            "members": len(self._members),
+            "max_concurrent": limiter.max_concurrent,
+            "in_flight": limiter.in_flight,
+            "peak_in_flight": limiter.peak_in_flight,
+            "waited": limiter.waited,
+        }
+
+    async def async_close(self) -> None:
+        """Close the shared session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
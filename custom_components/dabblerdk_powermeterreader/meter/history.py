@@ -0,0 +1,172 @@
+"""Bounded in-memory history of readings from dabbler.dk MEP module."""
+
+from array import array
+from collections.abc import Iterable, Sequence
+from itertools import filterfalse
+import math
+
+from .meter import FIELDS, MeterSnapshot
+
+TIMESTAMP = "timestamp"
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+# Energy counters need double precision, float is plenty for the rest
+_DOUBLE_FIELDS = ("energy_fwd", "energy_rev")
+_COLUMNS = tuple(
+    (attr, "d" if attr in _DOUBLE_FIELDS else "f") for _, attr, _ in FIELDS
+)
+COLUMN_NAMES = tuple(attr for attr, _ in _COLUMNS)
+
+
+class SampleHistory:
+    """Ring buffer of accepted readings, one typed array per field.
+
+    All arrays are allocated up front, so memory use is fixed by capacity,
+    about 80 bytes per reading. When full, the oldest reading is
+    overwritten. Missing values are stored as NaN.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize."""
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._columns = {
+            attr: array(typecode, bytes(array(typecode).itemsize * capacity))
+            for attr, typecode in _COLUMNS
+        }
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Readings held."""
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self._timestamps, *self._columns.values())
+        )
+
+    def append(self, timestamp: float, snapshot: MeterSnapshot) -> None:
+        """Add a reading taken at timestamp (POSIX seconds).
+
+        Timestamps must not decrease, a reading older than the newest one is
+        stored with the newest timestamp.
+        """
+        index = self._next
+        if self._size:
+            timestamp = max(timestamp, self._timestamps[index - 1])
+        self._timestamps[index] = timestamp
+        for attr, column in self._columns.items():
+            value = getattr(snapshot, attr)
+            column[index] = math.nan if value is None else value
+        self._next = (index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _physical(self, position: int) -> int:
+        """Get the array index of the position'th oldest reading."""
+        return (self._next - self._size + position) % self.capacity
+
+    def _bisect(self, timestamp: float, right: bool) -> int:
+        """Find the position of timestamp among the readings."""
+        low, high = 0, self._size
+        timestamps = self._timestamps
+        while low < high:
+            middle = (low + high) // 2
+            value = timestamps[self._physical(middle)]
+            if value < timestamp or (right and value == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _slice(self, column: array, start: int, count: int) -> array:
+        """Copy count readings of column, starting at array index start."""
+        end = start + count
+        if end <= self.capacity:
+            return column[start:end]
+        return column[start:] + column[: end - self.capacity]
+
+    def window(
+        self,
+        start: float,
+        end: float | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> dict[str, array]:
+        """Copy the readings taken from start to end (inclusive).
+
+        Returns the timestamps and the columns of fields (default all), in
+        time order.
+        """
+        first = self._bisect(start, False)
+        last = self._size if end is None else self._bisect(end, True)
+        count = max(last - first, 0)
+        offset = self._physical(first)
+
+        result = {TIMESTAMP: self._slice(self._timestamps, offset, count)}
+        for attr in COLUMN_NAMES if fields is None else fields:
+            result[attr] = self._slice(self._columns[attr], offset, count)
+        return result
+
+    def statistics(
+        self,
+        start: float,
+        end: float | None = None,
+        fields: Iterable[str] | None = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> dict:
+        """Get statistics of the readings taken from start to end."""
+        return summarize(self.window(start, end, fields), percentiles)
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """Get a percentile of sorted values, interpolating linearly."""
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(
+    columns: dict[str, array], percentiles: Sequence[float] = DEFAULT_PERCENTILES
+) -> dict:
+    """Calculate statistics of a window copied from SampleHistory.
+
+    Does not touch the history, so it can run in an executor.
+    """
+    timestamps = columns[TIMESTAMP]
+    result = {
+        "samples": len(timestamps),
+        "start": timestamps[0] if timestamps else None,
+        "end": timestamps[-1] if timestamps else None,
+        "fields": {},
+    }
+
+    for attr, column in columns.items():
+        if attr == TIMESTAMP:
+            continue
+        ordered = sorted(filterfalse(math.isnan, column))
+        if not ordered:
+            result["fields"][attr] = None
+            continue
+        stats = {
+            "min": round(ordered[0], 3),
+            "max": round(ordered[-1], 3),
+            "mean": round(math.fsum(ordered) / len(ordered), 3),
+            "percentiles": {
+                f"{percent:g}": round(_percentile(ordered, percent), 3)
+                for percent in percentiles
+            },
+        }
+        if attr in _DOUBLE_FIELDS:
+            first = next(filterfalse(math.isnan, column))
+            last = next(filterfalse(math.isnan, reversed(column)))
+            stats["delta"] = round(last - first, 3)
+        result["fields"][attr] = stats
+
+    return result
@@ -0,0 +1,199 @@
+"""Append-only journal of readings from dabbler.dk MEP module, kept on disk."""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from .meter import FIELDS, MeterSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+SEGMENT_RECORDS = 8192
+MAX_SEGMENTS = 8
+SEGMENT_SUFFIX = ".jnl"
+
+# Segment header: magic, version, record size
+_HEADER = struct.Struct("<3sBI")
+_MAGIC = b"DMJ"
+_VERSION = 1
+# Record: accepted at (POSIX seconds), CurrentDateTime, FIELDS values (NaN
+# if missing), followed by a CRC32 of the rest
+_BODY = struct.Struct(f"<d24s{len(FIELDS)}d")
+_CRC = struct.Struct("<I")
+RECORD_SIZE = _BODY.size + _CRC.size
+
+
+@dataclass(frozen=True, slots=True)
+class JournalRecord:
+    """A reading read back from the journal."""
+
+    timestamp: float
+    meter_time: str | None
+    snapshot: MeterSnapshot
+
+
+def _pack(timestamp: float, snapshot: MeterSnapshot) -> bytes:
+    """Encode a reading as a record."""
+    meter_time = (snapshot.meter_time or "").encode()[:24]
+    values = (getattr(snapshot, attr) for _, attr, _ in FIELDS)
+    body = _BODY.pack(
+        timestamp,
+        meter_time,
+        *(math.nan if value is None else value for value in values),
+    )
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def _unpack(buffer, offset: int) -> JournalRecord | None:
+    """Decode the record at offset, or None if it is damaged."""
+    body = buffer[offset : offset + _BODY.size]
+    (crc,) = _CRC.unpack_from(buffer, offset + _BODY.size)
+    if zlib.crc32(body) != crc:
+        return None
+    timestamp, meter_time, *values = _BODY.unpack(body)
+    snapshot = MeterSnapshot.from_values(
+        None if math.isnan(value) else value for value in values
+    )
+    meter_time = meter_time.rstrip(b"\0").decode(errors="replace") or None
+    snapshot.meter_time = meter_time
+    return JournalRecord(timestamp, meter_time, snapshot)
+
+
+class SampleJournal:
+    """Accepted readings appended to segment files in a directory.
+
+    append() only buffers, and is safe to call from the event loop. open(),
+    flush() and records() do file I/O and belong in an executor. flush()
+    writes the buffered records and fsyncs, so at most the readings since
+    the last flush are lost on a crash. A torn record at the end of a
+    segment is cut off when the journal is opened.
+
+    A segment holds segment_records records, after that a new one is
+    started and only the newest max_segments are kept.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_records: int = SEGMENT_RECORDS,
+        max_segments: int = MAX_SEGMENTS,
+    ) -> None:
+        """Initialize."""
+        self._directory = directory
+        self._segment_records = segment_records
+        self._max_segments = max_segments
+        self._pending: list[bytes] = []
+        self._io_lock = threading.Lock()
+        self._segment: int | None = None
+        self._segment_count = 0
+
+    def _path(self, segment: int) -> str:
+        """Get the file name of a segment."""
+        return os.path.join(self._directory, f"{segment:08d}{SEGMENT_SUFFIX}")
+
+    def _segments(self) -> list[int]:
+        """Get the numbers of the segments on disk, oldest first."""
+        try:
+            names = os.listdir(self._directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in names
+            if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def _read_header(self, file) -> bool:
+        """Check the header of an open segment."""
+        header = file.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            return False
+        magic, version, record_size = _HEADER.unpack(header)
+        return magic == _MAGIC and version == _VERSION and record_size == RECORD_SIZE
+
+    def open(self) -> JournalRecord | None:
+        """Open the journal, returning the newest intact record, if any."""
+        with self._io_lock:
+            os.makedirs(self._directory, exist_ok=True)
+            for segment in reversed(self._segments()):
+                path = self._path(segment)
+                with open(path, "r+b") as file:
+                    if not self._read_header(file):
+                        _LOGGER.warning("Ignoring unreadable journal segment %s", path)
+                        continue
+                    size = os.fstat(file.fileno()).st_size
+                    count = (size - _HEADER.size) // RECORD_SIZE
+                    end = _HEADER.size + count * RECORD_SIZE
+                    if end != size:
+                        _LOGGER.debug("Cutting torn record off %s", path)
+                        file.truncate(end)
+                    if self._segment is None:
+                        self._segment = segment
+                        self._segment_count = count
+                    if count == 0:
+                        continue
+                    with mmap.mmap(file.fileno(), end, access=mmap.ACCESS_READ) as buf:
+                        for index in range(count - 1, -1, -1):
+                            record = _unpack(buf, _HEADER.size + index * RECORD_SIZE)
+                            if record is not None:
+                                return record
+            return None
+
+    def append(self, timestamp: float, snapshot: MeterSnapshot) -> None:
+        """Buffer a reading until the next flush()."""
+        self._pending.append(_pack(timestamp, snapshot))
+
+    def flush(self) -> None:
+        """Write buffered records to disk and fsync."""
+        with self._io_lock:
+            pending, self._pending = self._pending, []
+            while pending:
+                if (
+                    self._segment is None
+                    or self._segment_count >= self._segment_records
+                ):
+                    self._start_segment()
+                room = self._segment_records - self._segment_count
+                chunk, pending = pending[:room], pending[room:]
+                with open(self._path(self._segment), "ab") as file:
+                    file.write(b"".join(chunk))
+                    file.flush()
+                    os.fsync(file.fileno())
+                self._segment_count += len(chunk)
+
+    def _start_segment(self) -> None:
+        """Start a new segment and drop the oldest ones."""
+        os.makedirs(self._directory, exist_ok=True)
+        if self._segment is None:
+            segment = max(self._segments(), default=-1) + 1
+        else:
+            segment = self._segment + 1
+        with open(self._path(segment), "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD_SIZE))
+        self._segment = segment
+        self._segment_count = 0
+
+        segments = self._segments()
+        for old in segments[: max(len(segments) - self._max_segments, 0)]:
+            os.remove(self._path(old))
+
+    def records(self, since: float | None = None) -> Iterator[JournalRecord]:
+        """Read back the intact records on disk, oldest first."""
+        for segment in self._segments():
+            try:
+                with open(self._path(segment), "rb") as file:
+                    if not self._read_header(file):
+                        continue
+                    data = file.read()
+            except FileNotFoundError:
+                continue
+            for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+                record = _unpack(data, offset)
+                if record is not None and (since is None or record.timestamp >= since):
+                    yield record
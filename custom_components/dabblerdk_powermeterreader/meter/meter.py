@@ -1,43 +1,386 @@
 """Wrapper for dabbler.dk MEP module."""
 
 import asyncio
+from collections import deque
+from collections.abc import Callable, Coroutine, Mapping
+from contextlib import nullcontext, suppress
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime, timedelta
 import json
 import logging
+import time
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 from urllib.parse import urlparse
 
-import aiohttp
-from zeroconf.asyncio import AsyncServiceInfo
+from .filters import PlausibilityFilter, Verdict
+from .metrics import ReaderMetrics, RequestTiming, connect_trace_config
+from .resolver import MdnsResolver
 
-from homeassistant.components import zeroconf
-from homeassistant.core import HomeAssistant
+try:
+    # Comes with Home Assistant, and decodes several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+if TYPE_CHECKING:
+    import aiohttp
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 10
+KEEPALIVE_TIMEOUT = 60
+CONNECTION_LIMIT = 2
+DEBUG_LOG_SIZE = 50
+CACHE_TIME = 2
+STREAM_PATH = "/ws"
+STREAM_HEARTBEAT = 30
+STREAM_RECEIVE_TIMEOUT = 60
+USER_AGENT = "HomeAssistent integration dabblerdk_powermeterreader"
+
+
+class _JsonDump:
+    """Serialize to json only if the log record is actually emitted."""
+
+    __slots__ = ("_obj",)
+
+    def __init__(self, obj) -> None:
+        self._obj = obj
+
+    def __str__(self) -> str:
+        return json.dumps(self._obj)
+
+
+# Numeric fields: payload key, MeterSnapshot attribute and the divisor giving
+# kWh, A, V, W and Hz. The first REQUIRED_FIELDS must be valid integers for a
+# reading to be complete.
+FIELDS = (
+    ("Fwd_Act_Wh", "energy_fwd", 1000),
+    ("Rev_Act_Wh", "energy_rev", 1000),
+    ("L1_RMS_A", "l1_current", 1000),
+    ("L2_RMS_A", "l2_current", 1000),
+    ("L3_RMS_A", "l3_current", 1000),
+    ("L1_RMS_V", "l1_voltage", 1000),
+    ("L2_RMS_V", "l2_voltage", 1000),
+    ("L3_RMS_V", "l3_voltage", 1000),
+    ("Fwd_W", "power_fwd", 1),
+    ("Rev_W", "power_rev", 1),
+    ("L1_Fwd_W", "l1_power_fwd", 1),
+    ("L2_Fwd_W", "l2_power_fwd", 1),
+    ("L3_Fwd_W", "l3_power_fwd", 1),
+    ("L1_Rev_W", "l1_power_rev", 1),
+    ("L2_Rev_W", "l2_power_rev", 1),
+    ("L3_Rev_W", "l3_power_rev", 1),
+    ("Freq_mHz", "frequency", 1000),
+)
+REQUIRED_FIELDS = 16
+REQUIRED_MASK = (1 << REQUIRED_FIELDS) - 1
+# FIELDS with the bit set in MeterSnapshot.valid
+_CONVERSIONS = tuple(
+    (key, attr, divisor, 1 << index)
+    for index, (key, attr, divisor) in enumerate(FIELDS)
+)
+
+# Text fields: payload key and MeterSnapshot attribute
+INFO_FIELDS = (
+    ("Utility_SN", "utility_sn"),
+    ("CurrentDateTime", "meter_time"),
+    ("Meter_Manufacturer", "meter_manufacturer"),
+    ("Meter_Model", "meter_model"),
+    ("Meter_SW_Version", "meter_sw_version"),
+    ("ESP_SW_By", "esp_sw_by"),
+    ("ESP_SW", "esp_sw"),
+    ("ESP_SW_Version", "esp_sw_version"),
+)
+
+
+class MeterSnapshot:
+    """Reading converted once per fetch, to be treated as read-only.
+
+    Numeric attributes are scaled to kWh, A, V, W and Hz, or None if the
+    field was missing or not an integer. Bit n of valid is set if FIELDS[n]
+    was converted.
+    """
+
+    __slots__ = (
+        *(attr for _, attr, _ in FIELDS),
+        *(attr for _, attr in INFO_FIELDS),
+        "valid",
+    )
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> "MeterSnapshot":
+        """Convert a getDashDataWS payload, reading only the fields used."""
+        self = cls.__new__(cls)
+        get = payload.get
+        valid = 0
+        for key, attr, divisor, bit in _CONVERSIONS:
+            value = get(key)
+            # The module sends integers, anything else is converted if it can be
+            if type(value) is not int:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    setattr(self, attr, None)
+                    continue
+            setattr(self, attr, value if divisor == 1 else value / divisor)
+            valid |= bit
+        for key, attr in INFO_FIELDS:
+            setattr(self, attr, get(key))
+        self.valid = valid
+        return self
+
+    @classmethod
+    def from_values(cls, values) -> "MeterSnapshot":
+        """Make a snapshot from already scaled values, in FIELDS order."""
+        self = cls.__new__(cls)
+        valid = 0
+        for index, ((_, attr, _), value) in enumerate(zip(FIELDS, values)):
+            if value is not None:
+                valid |= 1 << index
+            setattr(self, attr, value)
+        for _, attr in INFO_FIELDS:
+            setattr(self, attr, None)
+        self.valid = valid
+        return self
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the attributes, e.g. to serialize as JSON."""
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    def changed_fields(self, prev: "MeterSnapshot | None") -> frozenset[str]:
+        """Get the attributes that differ from prev, all of them without prev.
+
+        A reading with the same CurrentDateTime as prev is the module
+        repeating itself, and has no changes.
+        """
+        if prev is None:
+            return SNAPSHOT_FIELDS
+        if self is prev or (
+            self.meter_time is not None and self.meter_time == prev.meter_time
+        ):
+            return NO_FIELDS
+        return frozenset(
+            attr
+            for attr in self.__slots__
+            if getattr(self, attr) != getattr(prev, attr)
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """All required fields are valid integers."""
+        return self.valid & REQUIRED_MASK == REQUIRED_MASK
+
+
+# Results of MeterSnapshot.changed_fields() when everything or nothing changed
+SNAPSHOT_FIELDS = frozenset(MeterSnapshot.__slots__)
+NO_FIELDS: frozenset[str] = frozenset()
+
+
+@dataclass(frozen=True, slots=True)
+class MeterState:
+    """A validated reading and its status, replaced as a whole after each fetch.
+
+    Readers get the latest complete state without taking the update lock.
+    """
+
+    data: Mapping[str, Any] | None = None
+    snapshot: MeterSnapshot | None = None
+    connected: bool = False
+    stuck_with_prev_value: bool = False
+    fetched_at: datetime | None = None
+    accepted_at: datetime | None = None
+    expires: datetime | None = None
+    # data is from before a restart, see MeterReader.seed()
+    seeded: bool = False
+
+
+def decode_payload(body: bytes | str) -> Any:
+    """Decode a getDashDataWS body, None if it is empty."""
+    if not body.strip():
+        return None
+    return json_loads(body)
+
+
+class PayloadDecodeError(ValueError):
+    """A response body that is not valid JSON, kept for the debug log."""
+
+    def __init__(self, body: bytes, err: ValueError) -> None:
+        """Initialize."""
+        super().__init__(f"Invalid JSON: {err}")
+        self.body = body
+
 
 class MeterReader:
     """Primary exported interface for dabbler.dk MEP module wrapper."""
 
-    def __init__(self, target_url, hass: HomeAssistant) -> None:
-        """Initialize."""
+    def __init__(
+        self,
+        target_url,
+        session_provider: Callable[[], "aiohttp.ClientSession"] | None = None,
+        resolver: MdnsResolver | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        debug_log_size: int = DEBUG_LOG_SIZE,
+        stream_path: str = STREAM_PATH,
+        aggregator=None,
+        cache_time: float = CACHE_TIME,
+        history=None,
+        journal=None,
+        plausibility: PlausibilityFilter | None = None,
+        limiter=None,
+        max_staleness: float | None = None,
+    ) -> None:
+        """Initialize.
+
+        session_provider is called for the session of each request, to share
+        a connection pool, otherwise the reader creates its own session on
+        first use and closes it in async_close(). .local names are resolved
+        by resolver, which can be shared too, otherwise by one of the
+        reader's own with its own zeroconf instance.
+        The last debug_log_size raw payloads are kept for get_debug_log().
+        stream_path is the WebSocket endpoint used by async_stream().
+        Accepted readings are added to aggregator, history and journal, if
+        given. A reading is reused by get_meter_data() for cache_time
+        seconds. Readings are checked by plausibility, by default with a
+        16 A fuse. Requests are made inside limiter, an async context
+        manager, if given, to cap the requests in flight over many readers.
+        What the reader does is counted in metrics. Connect times are only
+        known for sessions with metrics.connect_trace_config().
+        With max_staleness, an expired reading is still returned by
+        get_meter_data() for up to max_staleness seconds after it was
+        accepted, while a single fetch runs in the background. on_refresh()
+        is called when that fetch is done, whether it succeeded or not. The
+        fetch is started with create_task(), asyncio.create_task() unless
+        set, and cancelled by async_close().
+        """
         self._base_url = target_url.strip("/")
-        self._data = None
-        self._data_expires = None
+        self._session_provider = session_provider
+        self._session: "aiohttp.ClientSession | None" = None
+        # aiohttp is imported when the first request is made
+        self._timeouts = (connect_timeout, read_timeout)
+        self._timeout: "aiohttp.ClientTimeout | None" = None
+        self._state = MeterState()
         self._lockUpdate = asyncio.Lock()
-        #        self._fail_count = 0
-        self._succeed_timestamp = datetime.now(tz=UTC)  # datetime.utcnow()
-        self._connected = False
-        self._sticking_with_prev_value = False
-        self._hass = hass
+        self._stream_path = stream_path
+        self.aggregator = aggregator
+        self.history = history
+        self.journal = journal
+        self.plausibility = plausibility or PlausibilityFilter()
+        self._limiter = limiter or nullcontext()
+        self.metrics = ReaderMetrics()
+        self._cache_time = timedelta(seconds=cache_time)
+        self._debug_log: deque[dict[str, Any]] = deque(maxlen=debug_log_size)
+        self._resolver = resolver or MdnsResolver()
+        self._owns_resolver = resolver is None
+        self.max_staleness = max_staleness
+        self.on_refresh: Callable[[], None] | None = None
+        self.create_task: Callable[[Coroutine], asyncio.Task] = asyncio.create_task
+        self._refresh_task: asyncio.Task | None = None
 
         #        self._debugcount = 0
         _LOGGER.debug("Meter init")
 
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Get the session, creating a keep-alive session if we own it."""
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        if self._timeout is None:
+            connect_timeout, read_timeout = self._timeouts
+            self._timeout = aiohttp.ClientTimeout(
+                total=None, sock_connect=connect_timeout, sock_read=read_timeout
+            )
+        if self._session_provider is not None:
+            return self._session_provider()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=CONNECTION_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT
+                ),
+                timeout=self._timeout,
+                trace_configs=[connect_trace_config()],
+            )
+        return self._session
+
+    def get_debug_log(self) -> list[dict[str, Any]]:
+        """Get the latest raw payloads and what was decided about them."""
+        return list(self._debug_log)
+
+    def _log_payload(self, payload, verdict: str) -> None:
+        """Add a payload to the debug log, dropping the oldest."""
+        self._debug_log.append(
+            {
+                "time": datetime.now(tz=UTC).isoformat(),
+                "verdict": verdict,
+                "payload": payload,
+            }
+        )
+
+    def get_resolver_stats(self):
+        """Get mDNS cache hit/miss counters."""
+        return self._resolver.stats()
+
+    async def async_close(self):
+        """Cancel a background refresh, close the session and resolver if ours."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._refresh_task
+        if self._owns_resolver:
+            await self._resolver.async_close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request_json(self, req_url, headers):
+        """GET json, retrying once if a pooled connection was dropped."""
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        session = self._get_session()
+        async with self._limiter:
+            try:
+                return await self._get_json(session, req_url, headers)
+            except aiohttp.ServerDisconnectedError:
+                # The MEP module closed an idle keep-alive connection
+                _LOGGER.debug("Connection closed by module, retrying")
+                return await self._get_json(session, req_url, headers)
+
+    async def _get_json(self, session, req_url, headers):
+        """GET json, timing the parts of the request."""
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        latency = self.metrics.latency
+        timing = RequestTiming()
+        start = time.perf_counter()
+        async with session.get(
+            req_url, headers=headers, timeout=self._timeout, trace_request_ctx=timing
+        ) as response:
+            headers_at = time.perf_counter()
+            if "json" not in response.content_type:
+                raise aiohttp.ContentTypeError(
+                    response.request_info,
+                    response.history,
+                    message=f"Unexpected mimetype: {response.content_type}",
+                    headers=response.headers,
+                )
+            body = await response.read()
+            try:
+                result = decode_payload(body)
+            except ValueError as err:
+                raise PayloadDecodeError(body, err) from err
+        if timing.connect:
+            latency["connect"].observe(timing.connect)
+        latency["response"].observe((headers_at - start) * 1000 - timing.connect)
+        latency["parse"].observe((time.perf_counter() - headers_at) * 1000)
+        return result
+
     async def get_metersn(self):
         """Get Serial Number for the meter."""
         meter_sn = None
-        if self._data is not None:
-            meter_sn = self._data["Utility_SN"]
+        state = self._state
+        if state.data is not None and not state.seeded:
+            meter_sn = state.data.get("Utility_SN")
         else:
             meter_sn = await self.get_value(["Utility_SN"])
         return meter_sn
@@ -60,182 +403,304 @@ class MeterReader:
         ret = obj
         return ret
 
+    @property
+    def state(self) -> MeterState:
+        """Latest published state. Never waits for a fetch in progress."""
+        return self._state
+
+    @property
+    def age(self) -> float | None:
+        """Seconds since the latest reading was accepted."""
+        accepted_at = self._state.accepted_at
+        if accepted_at is None:
+            return None
+        return (datetime.now(tz=UTC) - accepted_at).total_seconds()
+
     async def is_connected(self):
         """Get connected status."""
-        ret = None
-        async with self._lockUpdate:
-            ret = self._connected
-        return ret
+        return self._state.connected
 
     async def is_stuck_with_prev_value(self):
         """Get bool indicating if stuck with cahed data or freshly read."""
-        ret = None
-        async with self._lockUpdate:
-            ret = self._sticking_with_prev_value
-        return ret
+        return self._state.stuck_with_prev_value
 
     async def get_meter_data(self):
         """Read data from API."""
 
-        #      self._debugcount = self._debugcount + 1
-        #      dbgcnt = self._debugcount
-
+        # Fresh data is returned without taking the lock
+        state = self._state
+        if (
+            state.data is not None
+            and state.expires is not None
+            and datetime.now(tz=UTC) <= state.expires
+        ):
+            self.metrics.cache_hits += 1
+            return state.data
+
+        # So is stale data, while it is refreshed in the background
+        if self.max_staleness is not None and self._revalidate(state):
+            return state.data
+
+        metrics = self.metrics
+        metrics.cache_misses += 1
+        start = time.perf_counter()
         async with self._lockUpdate:
+            metrics.lock_wait.observe((time.perf_counter() - start) * 1000)
+            # Another caller may have fetched while we waited for the lock
+            state = self._state
             if (
-                self._data_expires is None
-                or self._data is None
-                or datetime.now(tz=UTC) > self._data_expires
+                state.expires is None
+                or state.data is None
+                or datetime.now(tz=UTC) > state.expires
             ):
-                self._data_expires = None
-                # self._data = None
-                self._connected = False
-
-                #          _LOGGER.debug(f"get_meter_data: {dbgcnt}, time: {self._data_expires}")
-
-                url = urlparse(self._base_url)
-                try:
-                    aryhost = url.netloc.split(":")
-                    host = aryhost[0]
-
-                    # Resolve local names using mdns
-                    if host.rstrip(".").endswith(".local"):
-                        _LOGGER.debug("Resolving name: %s", host)
-                        # logging.getLogger('zeroconf').setLevel(logging.DEBUG)
-                        aiozc = await zeroconf.async_get_async_instance(self._hass)
-
-                        info = AsyncServiceInfo("local.", f"{host.rstrip('.')}.")
-                        found = await info.async_request(aiozc.zeroconf, 3000)
-
-                        if info and found:
-                            for addr in info.parsed_addresses():
-                                host = (
-                                    addr
-                                    if (len(aryhost) == 1)
-                                    else f"{addr}:{aryhost[1]}"
-                                )
-                                url = url._replace(netloc=host)
-                                _LOGGER.debug("  Url: %s", url.geturl())
-                                break
-                except BaseException as err:  # pylint: disable=broad-except
-                    _LOGGER.warning("Zeroconf failed. %s", err)
-                # logging.getLogger('zeroconf').setLevel(logging.WARNING)
-
-                headers = {
-                    "Accept": "application/json",
-                    "User-Agent": "HomeAssistent integration dabblerdk_powermeterreader",
-                }
-
-                req_url = f"{url.geturl()}/getDashDataWS"
-
-                temp = None
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(req_url, headers=headers) as response:
-                            temp = await response.json()
-
-                        # temp = json.loads('')
-                        self._connected = True
-                        if temp is not None:
-                            _LOGGER.debug("Got meter data: %s", json.dumps(temp))
-
-                            # Fwd_Act_Wh has been seen to jump temporarily, which messes up the delta when using state_class=total_increasing
-                            # Ignore negative or more than 1000 wh increase for an hour or until restarted.
-                            stuck_with_prev_value = self._sticking_with_prev_value
-                            self._sticking_with_prev_value = False
-                            if self._data is not None:
-                                energy_prev = self._data["Fwd_Act_Wh"]
-                                energy_now = temp["Fwd_Act_Wh"]
-
-                                if not isinstance(
-                                    energy_now, int
-                                ):  # energy_now is None
-                                    _LOGGER.warning(
-                                        "Fwd_Act_Wh is None, sticking to previous values"
-                                    )
-                                    self._sticking_with_prev_value = True
-                                else:
-                                    diff = energy_now - energy_prev
-                                    # _LOGGER.warning(f"(isinstance(energy_prev, int)): { (isinstance(energy_prev, int)) }")
-                                    # _LOGGER.warning(f"(diff >= 0 and diff <= 1000): { (diff >= 0 and diff <= 1000) }")
-                                    # _LOGGER.warning(f"((datetime.utcnow()-self._succeed_timestamp).seconds < 3600): { ((datetime.utcnow()-self._succeed_timestamp).seconds < 3600) }")
-
-                                    elapsed_time = (
-                                        60
-                                        if (self._succeed_timestamp is None)
-                                        else (
-                                            datetime.now(tz=UTC)
-                                            - self._succeed_timestamp
-                                        ).total_seconds()
-                                    )
-                                    if elapsed_time < 60:
-                                        elapsed_time = 60
-                                    wh_limit = 16 * 3 * 230 / 3600 * 3 * elapsed_time
-                                    _LOGGER.debug("wh_limit: %f", wh_limit)
-
-                                    if (
-                                        (isinstance(energy_prev, int))
-                                        and (diff >= 0 and diff <= wh_limit)
-                                    ) or elapsed_time > 1800:
-                                        sum_power = (
-                                            temp["L1_Fwd_W"]
-                                            + temp["L2_Fwd_W"]
-                                            + temp["L3_Fwd_W"]
-                                        )
-                                        sum_power -= (
-                                            temp["L1_Rev_W"]
-                                            + temp["L2_Rev_W"]
-                                            + temp["L3_Rev_W"]
-                                        )
-                                        total_power = temp["Fwd_W"] - temp["Rev_W"]
-                                        if (
-                                            total_power <= sum_power + 3
-                                            and total_power >= sum_power - 3
-                                        ):
-                                            self._data = temp
-                                            self._succeed_timestamp = datetime.now(
-                                                tz=UTC
-                                            )
-                                            if stuck_with_prev_value:
-                                                _LOGGER.warning(
-                                                    "Resume-read meter data: %s",
-                                                    json.dumps(temp),
-                                                )
-                                        else:
-                                            _LOGGER.warning(
-                                                "L1 [W] + L2 [W] + L3 [W] does not equal Total [W] (%s != %s), sticking to previous values",
-                                                sum_power,
-                                                total_power,
-                                            )
-                                            _LOGGER.warning(
-                                                "Data: %s", json.dumps(temp)
-                                            )
-                                            self._sticking_with_prev_value = True
-                                    else:
-                                        _LOGGER.warning(
-                                            "Fwd_Act_Wh changed too much (%s), sticking to previous values. wh_limit: %s",
-                                            diff,
-                                            wh_limit,
-                                        )
-                                        self._sticking_with_prev_value = True
-
-                            else:
-                                self._data = temp
-                                self._succeed_timestamp = datetime.now(tz=UTC)
-                                _LOGGER.warning(
-                                    "First meter data: %s", json.dumps(temp)
-                                )
-                            self._data_expires = datetime.now(tz=UTC) + timedelta(
-                                seconds=2
-                            )
-                        else:
-                            raise Exception("empty_response")  # pylint: disable=broad-exception-raised
-
-                except aiohttp.ClientError as client_error:
-                    _LOGGER.warning("Requesting meter values failed: %s", client_error)
-                    raise Exception(  # pylint: disable=broad-exception-raised
-                        f"Requesting meter values failed: {client_error}"
-                    ) from client_error
-
-        #        _LOGGER.debug(f"get_meter_data end: {dbgcnt}, time: {self._data_expires}")
-
-        return self._data
+                await self._async_fetch(state)
+            else:
+                metrics.coalesced += 1
+
+        return self._state.data
+
+    async def get_snapshot(self) -> tuple[MeterSnapshot | None, float | None]:
+        """Get the latest accepted snapshot and its age, as get_meter_data()."""
+        await self.get_meter_data()
+        return self._state.snapshot, self.age
+
+    def _revalidate(self, state: MeterState) -> bool:
+        """Refresh state in the background if it may be returned meanwhile."""
+        if state.data is None or state.seeded or state.accepted_at is None:
+            return False
+        age = (datetime.now(tz=UTC) - state.accepted_at).total_seconds()
+        if age > self.max_staleness:
+            return False
+
+        self.metrics.stale_hits += 1
+        if self._refresh_task is None:
+            self._refresh_task = self.create_task(self._async_refresh())
+        return True
+
+    async def _async_refresh(self) -> None:
+        """Fetch in the background, unless another caller already did."""
+        try:
+            async with self._lockUpdate:
+                state = self._state
+                if state.expires is None or datetime.now(tz=UTC) > state.expires:
+                    await self._async_fetch(state)
+                else:
+                    self.metrics.coalesced += 1
+        except Exception as err:  # pylint: disable=broad-except
+            # Already logged and counted by _async_fetch()
+            _LOGGER.debug("Background refresh failed: %s", err)
+        finally:
+            self._refresh_task = None
+        if self.on_refresh is not None:
+            self.on_refresh()
+
+    def seed(self, snapshot: MeterSnapshot, accepted_at: datetime) -> None:
+        """Start from a reading accepted before a restart.
+
+        The next fetched reading is checked against its energy counter and
+        the time passed since accepted_at, instead of being taken as the
+        first reading. It is only returned as data if that reading is
+        rejected, and has no serial number or meter and ESP info.
+        """
+        if snapshot.energy_fwd is None:
+            return
+        data = {"Fwd_Act_Wh": round(snapshot.energy_fwd * 1000)}
+        if snapshot.energy_rev is not None:
+            data["Rev_Act_Wh"] = round(snapshot.energy_rev * 1000)
+        data["CurrentDateTime"] = snapshot.meter_time
+        self._publish(
+            self._state,
+            data=MappingProxyType(data),
+            snapshot=snapshot,
+            accepted_at=accepted_at,
+            expires=None,
+            seeded=True,
+        )
+
+    def _publish(self, prev: MeterState, **changes) -> None:
+        """Swap in a new state, based on prev with changes applied."""
+        self._state = replace(prev, fetched_at=datetime.now(tz=UTC), **changes)
+
+    async def _async_resolve_url(self):
+        """Get the module url with .local names resolved, and the mdns name."""
+        url = urlparse(self._base_url)
+        aryhost = url.netloc.split(":")
+        mdns_name = None
+
+        # Resolve local names using the mdns cache
+        if aryhost[0].rstrip(".").endswith(".local"):
+            mdns_name = aryhost[0].rstrip(".")
+            start = time.perf_counter()
+            addr = await self._resolver.async_resolve(mdns_name)
+            self.metrics.latency["resolve"].observe(
+                (time.perf_counter() - start) * 1000
+            )
+            if addr is not None:
+                host = addr if (len(aryhost) == 1) else f"{addr}:{aryhost[1]}"
+                url = url._replace(netloc=host)
+                _LOGGER.debug("  Url: %s", url.geturl())
+
+        return url, mdns_name
+
+    async def _async_fetch(self, prev: MeterState) -> None:
+        """Fetch, validate and publish a new reading. Called with lock held."""
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        start = time.perf_counter()
+        url, mdns_name = await self._async_resolve_url()
+
+        headers = {
+            "Accept": "application/json",
+            "User-Agent": USER_AGENT,
+        }
+
+        req_url = f"{url.geturl()}/getDashDataWS"
+
+        try:
+            temp = await self._request_json(req_url, headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as client_error:
+            _LOGGER.warning("Requesting meter values failed: %s", client_error)
+            if mdns_name is not None:
+                # The module may have been given a new address
+                self._resolver.invalidate(mdns_name)
+            self._publish(prev, connected=False, expires=None)
+            self._log_payload(None, f"request failed: {client_error!r}")
+            self.metrics.fetch_failed()
+            raise Exception(  # pylint: disable=broad-exception-raised
+                f"Requesting meter values failed: {client_error}"
+            ) from client_error
+        except PayloadDecodeError as decode_error:
+            _LOGGER.warning("Meter values are not valid JSON: %s", decode_error)
+            self._publish(prev, connected=False, expires=None)
+            self._log_payload(
+                decode_error.body.decode(errors="replace"),
+                f"invalid JSON: {decode_error!r}",
+            )
+            self.metrics.fetch_failed()
+            raise Exception(  # pylint: disable=broad-exception-raised
+                f"Requesting meter values failed: {decode_error}"
+            ) from decode_error
+
+        # temp = json.loads('')
+        if temp is None:
+            self._publish(prev, connected=True, expires=None)
+            self._log_payload(None, "empty response")
+            self.metrics.fetch_failed()
+            raise Exception("empty_response")  # pylint: disable=broad-exception-raised
+
+        try:
+            self._accept_payload(prev, temp)
+        except Exception:
+            self.metrics.fetch_failed()
+            raise
+        self.metrics.fetch_succeeded((time.perf_counter() - start) * 1000)
+
+    def _accept_payload(self, prev: MeterState, temp: dict) -> bool:
+        """Validate a payload and publish it, or keep prev data if rejected.
+
+        Returns True if the payload was accepted. Called with lock held.
+        """
+        try:
+            snapshot = MeterSnapshot.from_payload(temp)
+            verdict = self._check_reading(prev, snapshot, temp)
+        except Exception as err:
+            self._publish(prev, connected=True, expires=None)
+            self._log_payload(temp, f"invalid: {err!r}")
+            raise
+
+        self._log_payload(temp, "accepted" if verdict else verdict.reason)
+        if not verdict:
+            self.metrics.rejections[verdict.reason] += 1
+        now = datetime.now(tz=UTC)
+        if verdict:
+            if self.aggregator is not None:
+                self.aggregator.add(snapshot)
+            if self.history is not None:
+                self.history.append(now.timestamp(), snapshot)
+            if self.journal is not None:
+                self.journal.append(now.timestamp(), snapshot)
+            self._publish(
+                prev,
+                data=MappingProxyType(temp),
+                snapshot=snapshot,
+                connected=True,
+                stuck_with_prev_value=False,
+                accepted_at=now,
+                expires=now + self._cache_time,
+                seeded=False,
+            )
+        else:
+            self._publish(
+                prev,
+                connected=True,
+                stuck_with_prev_value=True,
+                expires=now + self._cache_time,
+            )
+        return verdict.accepted
+
+    async def async_stream(self, on_update) -> None:
+        """Receive readings over a WebSocket until the connection is lost.
+
+        Each message is a getDashDataWS payload. It goes through the same
+        checks as a polled reading, and on_update() is called after each
+        published state. Raises when the connection fails or is closed.
+        """
+        import aiohttp  # pylint: disable=import-outside-toplevel
+
+        url, mdns_name = await self._async_resolve_url()
+        ws_url = url._replace(
+            scheme="wss" if url.scheme == "https" else "ws",
+            path=self._stream_path,
+        ).geturl()
+
+        _LOGGER.debug("Connecting stream: %s", ws_url)
+        try:
+            async with self._get_session().ws_connect(
+                ws_url,
+                headers={"User-Agent": USER_AGENT},
+                heartbeat=STREAM_HEARTBEAT,
+                receive_timeout=STREAM_RECEIVE_TIMEOUT,
+            ) as ws:
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    async with self._lockUpdate:
+                        try:
+                            self._accept_payload(self._state, decode_payload(msg.data))
+                        except Exception as err:  # pylint: disable=broad-except
+                            _LOGGER.warning("Invalid stream message: %s", err)
+                    on_update()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as client_error:
+            if mdns_name is not None:
+                self._resolver.invalidate(mdns_name)
+            raise Exception(  # pylint: disable=broad-exception-raised
+                f"Meter stream failed: {client_error}"
+            ) from client_error
+
+        raise Exception("Meter stream closed")  # pylint: disable=broad-exception-raised
+
+    def _check_reading(
+        self, prev: MeterState, snapshot: MeterSnapshot, temp: dict
+    ) -> Verdict:
+        """Validate a reading against the last accepted one."""
+        _LOGGER.debug("Got meter data: %s", _JsonDump(temp))
+
+        if prev.snapshot is None:
+            _LOGGER.warning("First meter data: %s", _JsonDump(temp))
+
+        elapsed = (
+            None
+            if prev.accepted_at is None
+            else (datetime.now(tz=UTC) - prev.accepted_at).total_seconds()
+        )
+        verdict = self.plausibility.evaluate(prev.snapshot, snapshot, elapsed)
+        if not verdict:
+            _LOGGER.warning(
+                "%s (%s), sticking to previous values. Data: %s",
+                verdict.reason,
+                verdict.detail,
+                _JsonDump(temp),
+            )
+        elif prev.stuck_with_prev_value:
+            _LOGGER.warning("Resume-read meter data: %s", _JsonDump(temp))
+        return verdict
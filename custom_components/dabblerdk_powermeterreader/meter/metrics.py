@@ -0,0 +1,175 @@
+"""Counters and latency histograms of a dabbler.dk MEP module reader."""
+
+from bisect import bisect_left
+from collections import Counter
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+# Parts of a fetch: resolving a .local name, opening a connection, waiting
+# for the response headers, reading and decoding the body, and all of it
+LATENCY_PARTS = ("resolve", "connect", "response", "parse", "total")
+
+
+class Histogram:
+    """Counts of observations per bucket, cheap enough for every fetch."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "last")
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKETS_MS) -> None:
+        """Initialize."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    @property
+    def mean(self) -> float | None:
+        """Mean of the observations."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile as the upper bound of the bucket holding it.
+
+        Observations above the last bound give that bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.bounds[-1]
+
+    def as_dict(self) -> dict:
+        """Get the summary and the buckets."""
+        mean = self.mean
+        return {
+            "count": self.count,
+            "mean": None if mean is None else round(mean, 3),
+            "last": None if self.last is None else round(self.last, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(self.bounds, self.counts)
+                },
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class RequestTiming:
+    """Milliseconds spent connecting for one request.
+
+    Passed as trace_request_ctx to a session with connect_trace_config().
+    """
+
+    __slots__ = ("connect",)
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.connect = 0.0
+
+
+class ReaderMetrics:
+    """What a MeterReader has done, for diagnostics.
+
+    Latencies are in milliseconds. A cache hit is get_meter_data() returning
+    a fresh reading without taking the lock, a miss is a call that had to
+    take it. Misses are coalesced when another caller fetched while waiting
+    for the lock. Stale hits are expired readings returned while they are
+    refreshed in the background, counted as neither.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.latency = {part: Histogram() for part in LATENCY_PARTS}
+        self.lock_wait = Histogram()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.fetches = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.rejections: Counter[str] = Counter()
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        """Part of get_meter_data() calls answered from the cache."""
+        calls = self.cache_hits + self.cache_misses
+        return self.cache_hits / calls if calls else None
+
+    def fetch_succeeded(self, elapsed_ms: float) -> None:
+        """Count a fetch that got a payload, accepted or not."""
+        self.fetches += 1
+        self.consecutive_failures = 0
+        self.latency["total"].observe(elapsed_ms)
+
+    def fetch_failed(self) -> None:
+        """Count a fetch without a usable payload."""
+        self.fetches += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+
+    def as_dict(self) -> dict:
+        """Get all metrics."""
+        ratio = self.cache_hit_ratio
+        return {
+            "latency_ms": {
+                part: histogram.as_dict() for part, histogram in self.latency.items()
+            },
+            "lock_wait_ms": self.lock_wait.as_dict(),
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "coalesced": self.coalesced,
+                "stale": self.stale_hits,
+                "hit_ratio": None if ratio is None else round(ratio, 4),
+            },
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "rejections": dict(self.rejections),
+        }
+
+
+async def _on_connection_create_start(session, context, params) -> None:
+    """Note when a new connection is started."""
+    context.connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(session, context, params) -> None:
+    """Add the time taken to connect to the timing of the request."""
+    timing = context.trace_request_ctx
+    if timing is not None:
+        timing.connect += (time.perf_counter() - context.connect_start) * 1000
+
+
+def connect_trace_config() -> "aiohttp.TraceConfig":
+    """Get a trace config timing new connections of a session.
+
+    Requests pass a RequestTiming as trace_request_ctx to get the time.
+    """
+    import aiohttp  # pylint: disable=import-outside-toplevel
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    return trace_config
@@ -0,0 +1,148 @@
+"""Cached mDNS resolution for dabbler.dk MEP module."""
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TTL = 120
+REQUEST_TIMEOUT_MS = 3000
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """Resolved address and when it should be refreshed."""
+
+    address: str
+    expires: float
+
+
+class MdnsResolver:
+    """Resolve .local names, keeping the addresses in a cache.
+
+    Only the first lookup of a name waits on zeroconf. After that the cached
+    address is returned straight away, and the name is re-resolved in the
+    background when its TTL runs out or when invalidate() is called.
+    """
+
+    def __init__(
+        self,
+        zeroconf_provider=None,
+        default_ttl: float = DEFAULT_TTL,
+        timeout_ms: int = REQUEST_TIMEOUT_MS,
+    ) -> None:
+        """Initialize.
+
+        zeroconf_provider is a coroutine function returning an AsyncZeroconf.
+        Without it, the resolver starts its own on first use and closes it
+        in async_close().
+        """
+        self._zeroconf_provider = zeroconf_provider or self._async_own_zeroconf
+        self._own_zeroconf = None
+        self._default_ttl = default_ttl
+        self._timeout_ms = timeout_ms
+        self._cache: dict[str, _CacheEntry] = {}
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    async def async_resolve(self, host: str) -> str | None:
+        """Get address for host, only waiting on zeroconf if never resolved."""
+        entry = self._cache.get(host)
+        if entry is not None:
+            self.hits += 1
+            if time.monotonic() >= entry.expires:
+                self._schedule_refresh(host)
+            return entry.address
+
+        self.misses += 1
+        _LOGGER.debug("Resolving name: %s", host)
+        return await self._async_request(host)
+
+    def invalidate(self, host: str) -> None:
+        """Re-resolve host in the background, e.g. after a failed connection."""
+        if host in self._cache:
+            self._schedule_refresh(host)
+
+    def stats(self) -> dict:
+        """Get resolution counters and cached addresses."""
+        now = time.monotonic()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "cache": {
+                host: {
+                    "address": entry.address,
+                    "expires_in": round(entry.expires - now, 1),
+                }
+                for host, entry in self._cache.items()
+            },
+        }
+
+    async def async_close(self) -> None:
+        """Cancel background refreshes."""
+        tasks = list(self._refresh_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_tasks.clear()
+        if self._own_zeroconf is not None:
+            await self._own_zeroconf.async_close()
+            self._own_zeroconf = None
+
+    async def _async_own_zeroconf(self):
+        """Get the resolver's own zeroconf instance, starting it if needed."""
+        if self._own_zeroconf is None:
+            from zeroconf.asyncio import (  # pylint: disable=import-outside-toplevel
+                AsyncZeroconf,
+            )
+
+            self._own_zeroconf = AsyncZeroconf()
+        return self._own_zeroconf
+
+    def _schedule_refresh(self, host: str) -> None:
+        """Start a background refresh of host, unless one is running."""
+        if host in self._refresh_tasks:
+            return
+        self.refreshes += 1
+        task = asyncio.create_task(self._async_request(host))
+        self._refresh_tasks[host] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(host, None))
+
+    async def _async_request(self, host: str) -> str | None:
+        """Query zeroconf for host and update the cache."""
+        from zeroconf.asyncio import (  # pylint: disable=import-outside-toplevel
+            AsyncServiceInfo,
+        )
+
+        try:
+            aiozc = await self._zeroconf_provider()
+            info = AsyncServiceInfo("local.", f"{host}.")
+            found = await info.async_request(aiozc.zeroconf, self._timeout_ms)
+            if found:
+                for addr in info.parsed_addresses():
+                    ttl = min(
+                        (record.ttl for record in info.dns_addresses()),
+                        default=self._default_ttl,
+                    )
+                    self._cache[host] = _CacheEntry(addr, time.monotonic() + ttl)
+                    _LOGGER.debug("Resolved %s to %s, ttl: %s", host, addr, ttl)
+                    return addr
+        except asyncio.CancelledError:
+            raise
+        except BaseException as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Zeroconf failed. %s", err)
+
+        self.failures += 1
+        entry = self._cache.get(host)
+        if entry is not None:
+            # Keep using the last known address, try again later
+            entry.expires = time.monotonic() + self._default_ttl
+            return entry.address
+        return None
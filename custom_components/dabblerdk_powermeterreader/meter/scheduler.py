@@ -0,0 +1,80 @@
+"""Adaptive poll interval for dabbler.dk MEP module."""
+
+from collections.abc import Sequence
+import random
+
+CHANGE_THRESHOLD_W = 100
+CHANGE_RATIO = 0.1
+RELAX_FACTOR = 1.5
+BACKOFF_FACTOR = 2
+JITTER = 0.1
+
+
+class AdaptiveScheduler:
+    """Choose the delay until the next poll.
+
+    Polls every min_interval while power changes quickly, and relaxes step
+    by step towards interval while the load is flat. While the module fails
+    or readings are rejected, the delay grows exponentially with jitter, up
+    to max_interval. With min_interval == interval == max_interval this is
+    a fixed interval.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        change_threshold_w: float = CHANGE_THRESHOLD_W,
+        change_ratio: float = CHANGE_RATIO,
+    ) -> None:
+        """Initialize."""
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self._change_threshold_w = change_threshold_w
+        self._change_ratio = change_ratio
+        self._delay = interval
+        self._failures = 0
+        self._last_power: Sequence[float] | None = None
+
+    @property
+    def failures(self) -> int:
+        """Consecutive failed polls."""
+        return self._failures
+
+    def next_delay(self, power: Sequence[float] | None, failed: bool) -> float:
+        """Get seconds until the next poll, given the outcome of this one.
+
+        power holds the total and per-phase power of an accepted reading.
+        """
+        if failed or power is None:
+            self._failures += 1
+            delay = min(
+                self.max_interval,
+                max(self._delay, self.interval)
+                * BACKOFF_FACTOR ** (self._failures - 1),
+            )
+            if delay <= self.interval:
+                return delay
+            return delay * random.uniform(1 - JITTER, 1)
+
+        if self._failures:
+            # Recovered, start over at the normal interval
+            self._failures = 0
+            self._delay = self.interval
+
+        last_power = self._last_power
+        self._last_power = power
+        if last_power is not None and len(last_power) == len(power):
+            change = max(abs(now - prev) for now, prev in zip(power, last_power))
+            limit = max(
+                self._change_threshold_w,
+                self._change_ratio * max(abs(prev) for prev in last_power),
+            )
+            if change >= limit:
+                self._delay = self.min_interval
+                return self._delay
+
+        self._delay = min(self.interval, self._delay * RELAX_FACTOR)
+        return self._delay
@@ -0,0 +1,147 @@
+"""On-demand profiling of dabblerdk_powermeterreader."""
+
+import asyncio
+import cProfile
+from datetime import datetime
+import io
+import os
+import pstats
+import re
+import time
+import tracemalloc
+
+from homeassistant import core
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+# Functions and allocations are reported for the code of this integration
+INTEGRATION_DIR = os.path.dirname(os.path.abspath(__file__))
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+
+def _write_report(
+    path: str,
+    profile: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot | None,
+    elapsed: float,
+    fetches: dict[str, int],
+) -> None:
+    """Write the report, and the raw profile next to it."""
+    profile.dump_stats(f"{os.path.splitext(path)[0]}.cprof")
+    restriction = re.escape(INTEGRATION_DIR)
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(f"Profile of {DOMAIN}, {elapsed:.1f} s\n")
+        file.write("Fetches per meter: ")
+        file.write(", ".join(f"{name}: {count}" for name, count in fetches.items()))
+        file.write("\n\nTimes are CPU time of the event loop thread.\n")
+
+        for sort in ("cumulative", "tottime"):
+            stream = io.StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.sort_stats(sort).print_stats(restriction, TOP_FUNCTIONS)
+            file.write(f"\n=== Functions by {sort} time ===\n")
+            file.write(stream.getvalue())
+
+        file.write("\n=== Memory allocated and still held, by line ===\n")
+        if snapshot is None:
+            file.write("Not traced, tracemalloc was stopped during the run.\n")
+            return
+        snapshot = snapshot.filter_traces(
+            (tracemalloc.Filter(True, os.path.join(INTEGRATION_DIR, "*")),)
+        )
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            file.write(f"{stat}\n")
+
+
+class IntegrationProfiler:
+    """Profile the integration for a while, one run at a time.
+
+    CPU time and calls are profiled with cProfile and allocations traced
+    with tracemalloc, only while a run is going on. The report is written
+    to the configuration directory.
+    """
+
+    def __init__(self, hass: core.HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._stop: asyncio.Event | None = None
+
+    @property
+    def running(self) -> bool:
+        """A run is going on."""
+        return self._stop is not None
+
+    def stop(self) -> bool:
+        """End the run early, it still writes its report."""
+        if self._stop is None:
+            return False
+        self._stop.set()
+        return True
+
+    async def async_run(self, duration: float) -> dict:
+        """Profile for duration seconds, or until stopped.
+
+        Returns the path of the report. If cancelled, profiling is turned
+        off and no report is written.
+        """
+        if self._stop is not None:
+            raise HomeAssistantError("Profiling is already running")
+
+        data = self.hass.data.get(DOMAIN, {})
+        # Keyed by entry, meters may share a name
+        readers = {
+            entry_id: entry["meterclient"]
+            for entry_id, entry in data.items()
+            if "meterclient" in entry
+        }
+        labels = {
+            entry_id: f"{data[entry_id]['name']} ({entry_id})" for entry_id in readers
+        }
+        fetches = {
+            entry_id: reader.metrics.fetches for entry_id, reader in readers.items()
+        }
+
+        profile = cProfile.Profile(time.thread_time)
+        try:
+            profile.enable()
+        except ValueError as err:
+            raise HomeAssistantError(f"Failed to start profiling: {err}") from err
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        self._stop = asyncio.Event()
+        start = time.monotonic()
+        snapshot = None
+        try:
+            try:
+                async with asyncio.timeout(duration):
+                    await self._stop.wait()
+            except TimeoutError:
+                pass
+            if tracemalloc.is_tracing():
+                # Traces cover the whole process, taking them takes a while
+                snapshot = await self.hass.async_add_executor_job(
+                    tracemalloc.take_snapshot
+                )
+        finally:
+            profile.disable()
+            if started_tracing:
+                tracemalloc.stop()
+            self._stop = None
+        elapsed = time.monotonic() - start
+
+        fetches = {
+            labels[entry_id]: reader.metrics.fetches - fetches[entry_id]
+            for entry_id, reader in readers.items()
+        }
+        path = self.hass.config.path(
+            f"{DOMAIN}_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        )
+        await self.hass.async_add_executor_job(
+            _write_report, path, profile, snapshot, elapsed, fetches
+        )
+        return {"report": path, "duration": round(elapsed, 1)}
@@ -1,8 +1,11 @@
 """Support for dabblerdk_powermeterreader."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
 from enum import IntEnum
 import logging
-import traceback
+from operator import attrgetter
+import time
 
 from homeassistant import config_entries, core
 from homeassistant.components.sensor import (
@@ -12,21 +15,86 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
     UnitOfEnergy,
     UnitOfFrequency,
     UnitOfPower,
+    UnitOfTime,
 )
 from homeassistant.core import callback
 from homeassistant.exceptions import PlatformNotReady
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
-from .const import DOMAIN
-from .meter import MeterReader
+from . import MeterCoordinator
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
+    CONF_HEARTBEAT,
+    DEFAULT_DEADBANDS,
+    DEFAULT_HEARTBEAT,
+    DOMAIN,
+)
+from .meter import MeterAggregate, MeterSnapshot, ReaderMetrics
+from .meter.metrics import LATENCY_PARTS
 
 _LOGGER = logging.getLogger(__name__)
 
+ATTR_MEAN = "mean"
+ATTR_MIN = "min"
+ATTR_MAX = "max"
+ATTR_LAST = "last"
+ATTR_SAMPLES = "samples"
+
+
+@dataclass(frozen=True, kw_only=True)
+class MeterSensorEntityDescription(SensorEntityDescription):
+    """Sensor description, including where the value is read from.
+
+    value_fields are (attribute, sign) pairs summed from the MeterSnapshot.
+    {prefix} in an attribute is replaced by the phase, e.g. "l1_", or "" for
+    totals.
+    """
+
+    value_fields: tuple[tuple[str, int], ...]
+
+    def phase_fields(self, phase: str) -> tuple[tuple[str, int], ...]:
+        """Get value_fields with the phase filled in."""
+        prefix = f"{phase.lower()}_" if phase != "" else ""
+        return tuple(
+            (attr.format(prefix=prefix), sign) for attr, sign in self.value_fields
+        )
+
+    def compile_extractor(
+        self, phase: str
+    ) -> Callable[[MeterSnapshot], float | int | None]:
+        """Get a function reading the value of this sensor from a snapshot."""
+        fields = self.phase_fields(phase)
+
+        if len(fields) == 1 and fields[0][1] == 1:
+            return attrgetter(fields[0][0])
+
+        def extract_sum(snapshot: MeterSnapshot) -> float | int | None:
+            total = 0
+            for attr, sign in fields:
+                value = getattr(snapshot, attr)
+                if value is None:
+                    return None
+                total += sign * value
+            return total
+
+        return extract_sum
+
+
+@dataclass(frozen=True, kw_only=True)
+class MeterDiagnosticEntityDescription(SensorEntityDescription):
+    """Diagnostic sensor description, reading from the metrics of the reader."""
+
+    value_fn: Callable[[ReaderMetrics], float | int | None]
+    attributes_fn: Callable[[ReaderMetrics], dict] | None = None
+
 
 class EchelonSensorType(IntEnum):
     """Supported sensor types."""
@@ -41,8 +109,42 @@ class EchelonSensorType(IntEnum):
     FREQUENCY = 7
 
 
+@dataclass(frozen=True, slots=True)
+class Deadband:
+    """Minimum change of a sensor before a new state is written.
+
+    The change must reach absolute, and percent of the written value.
+    A state is written anyway when nothing was written for heartbeat
+    seconds.
+    """
+
+    absolute: float = 0
+    percent: float = 0
+    heartbeat: float = DEFAULT_HEARTBEAT
+
+    @classmethod
+    def from_options(cls, options, sensor_type: EchelonSensorType) -> "Deadband":
+        """Get the deadband of a sensor type from the config entry options."""
+        name = sensor_type.name.lower()
+        absolute, percent = DEFAULT_DEADBANDS[name]
+        return cls(
+            absolute=options.get(CONF_DEADBAND.format(name), absolute),
+            percent=options.get(CONF_DEADBAND_PERCENT.format(name), percent),
+            heartbeat=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+        )
+
+    def exceeded(self, written, value) -> bool:
+        """Check if value has moved outside the deadband around written."""
+        if written is None or value is None:
+            return written is not value
+        change = abs(value - written)
+        return change > 0 and change >= max(
+            self.absolute, abs(written) * self.percent / 100
+        )
+
+
 SENSORS = [
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.ENERGY_FWD,
         device_class=SensorDeviceClass.ENERGY,
         entity_category=None,
@@ -51,8 +153,9 @@ SENSORS = [
         entity_registry_enabled_default=True,
         icon="mdi:home-import-outline",
         name="energy consumption",
+        value_fields=(("energy_fwd", 1),),
     ),
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.ENERGY_REV,
         device_class=SensorDeviceClass.ENERGY,
         entity_category=None,
@@ -61,8 +164,9 @@ SENSORS = [
         entity_registry_enabled_default=False,
         icon="mdi:home-export-outline",
         name="energy returned",
+        value_fields=(("energy_rev", 1),),
     ),
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.VOLTAGE,
         device_class=SensorDeviceClass.VOLTAGE,
         entity_category=None,
@@ -70,8 +174,9 @@ SENSORS = [
         entity_registry_enabled_default=False,
         icon="mdi:lightning-bolt",
         name="voltage",
+        value_fields=(("{prefix}voltage", 1),),
     ),
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.CURRENT,
         device_class=SensorDeviceClass.CURRENT,
         entity_category=None,
@@ -79,8 +184,9 @@ SENSORS = [
         entity_registry_enabled_default=False,
         icon="mdi:current-ac",
         name="current",
+        value_fields=(("{prefix}current", 1),),
     ),
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.POWER,
         device_class=SensorDeviceClass.POWER,
         entity_category=None,
@@ -89,8 +195,9 @@ SENSORS = [
         entity_registry_enabled_default=True,
         icon="mdi:flash",
         name="power",
+        value_fields=(("{prefix}power_fwd", 1),),
     ),
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.POWER_PHASE,
         device_class=SensorDeviceClass.POWER,
         entity_category=None,
@@ -99,8 +206,9 @@ SENSORS = [
         entity_registry_enabled_default=False,
         icon="mdi:flash",
         name="power",
+        value_fields=(("{prefix}power_fwd", 1),),
     ),
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.POWER_REV,
         device_class=SensorDeviceClass.POWER,
         entity_category=None,
@@ -109,8 +217,9 @@ SENSORS = [
         entity_registry_enabled_default=False,
         icon="mdi:flash",
         name="power returned",
+        value_fields=(("{prefix}power_rev", 1),),
     ),
-    SensorEntityDescription(
+    MeterSensorEntityDescription(
         key=EchelonSensorType.FREQUENCY,
         device_class=SensorDeviceClass.FREQUENCY,
         entity_category=None,
@@ -118,6 +227,81 @@ SENSORS = [
         entity_registry_enabled_default=False,
         icon="mdi:sine-wave",
         name="frequency",
+        value_fields=(("frequency", 1),),
+    ),
+]
+
+
+def _ratio_percent(ratio: float | None) -> float | None:
+    """Get a ratio as a rounded percentage."""
+    return None if ratio is None else round(ratio * 100, 1)
+
+
+def _mean_ms(histogram) -> float | None:
+    """Get the rounded mean of a histogram."""
+    mean = histogram.mean
+    return None if mean is None else round(mean, 1)
+
+
+DIAGNOSTIC_SENSORS = [
+    MeterDiagnosticEntityDescription(
+        key="request_latency",
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        icon="mdi:timer-outline",
+        name="request latency",
+        value_fn=lambda metrics: (
+            None
+            if metrics.latency["total"].last is None
+            else round(metrics.latency["total"].last, 1)
+        ),
+        attributes_fn=lambda metrics: {
+            f"{part}_mean": _mean_ms(histogram)
+            for part, histogram in metrics.latency.items()
+        },
+    ),
+    MeterDiagnosticEntityDescription(
+        key="cache_hit_ratio",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        icon="mdi:cached",
+        name="cache hit ratio",
+        value_fn=lambda metrics: _ratio_percent(metrics.cache_hit_ratio),
+    ),
+    MeterDiagnosticEntityDescription(
+        key="lock_wait",
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        icon="mdi:lock-clock",
+        name="lock wait",
+        value_fn=lambda metrics: _mean_ms(metrics.lock_wait),
+    ),
+    MeterDiagnosticEntityDescription(
+        key="consecutive_failures",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        icon="mdi:lan-disconnect",
+        name="consecutive failures",
+        value_fn=lambda metrics: metrics.consecutive_failures,
+    ),
+    MeterDiagnosticEntityDescription(
+        key="rejected_readings",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        icon="mdi:filter-remove-outline",
+        name="rejected readings",
+        value_fn=lambda metrics: metrics.rejections.total(),
+        attributes_fn=lambda metrics: dict(metrics.rejections),
     ),
 ]
 
@@ -130,42 +314,59 @@ async def async_setup_entry(
     """Set up the dabblerdk_powermeterreader sensor platform."""
     config = hass.data[DOMAIN][config_entry.entry_id]
 
-    _meterclient: MeterReader = config["meterclient"]
+    _coordinator: MeterCoordinator = config["coordinator"]
 
     # Make sure we can get meter SN as it is part of the unique_id
     try:
-        meter_sn = await _meterclient.get_metersn()
+        if _coordinator.meter_sn is None:
+            await _coordinator.async_refresh()
+        meter_sn = _coordinator.meter_sn
         if meter_sn is None:
             raise PlatformNotReady
     except Exception as err:
         raise PlatformNotReady from err
 
+    deadbands = {
+        sensor_type: Deadband.from_options(config_entry.options, sensor_type)
+        for sensor_type in EchelonSensorType
+    }
+
     try:
         # fmt: off
         sensors = []
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   False,  _meterclient, SENSORS[EchelonSensorType.ENERGY_FWD],    meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   True,   _meterclient, SENSORS[EchelonSensorType.ENERGY_REV],    meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", False,  _meterclient, SENSORS[EchelonSensorType.VOLTAGE],       meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", False,  _meterclient, SENSORS[EchelonSensorType.VOLTAGE],       meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", False,  _meterclient, SENSORS[EchelonSensorType.VOLTAGE],       meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", False,  _meterclient, SENSORS[EchelonSensorType.CURRENT],       meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", False,  _meterclient, SENSORS[EchelonSensorType.CURRENT],       meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", False,  _meterclient, SENSORS[EchelonSensorType.CURRENT],       meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   False,  _meterclient, SENSORS[EchelonSensorType.POWER],         meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", False,  _meterclient, SENSORS[EchelonSensorType.POWER_PHASE],   meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", False,  _meterclient, SENSORS[EchelonSensorType.POWER_PHASE],   meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", False,  _meterclient, SENSORS[EchelonSensorType.POWER_PHASE],   meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   True,   _meterclient, SENSORS[EchelonSensorType.POWER_REV],     meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", True,   _meterclient, SENSORS[EchelonSensorType.POWER_REV],     meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", True,   _meterclient, SENSORS[EchelonSensorType.POWER_REV],     meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", True,   _meterclient, SENSORS[EchelonSensorType.POWER_REV],     meter_sn))
-        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   False,  _meterclient, SENSORS[EchelonSensorType.FREQUENCY],     meter_sn))
-        async_add_entities(sensors, update_before_add=True)
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   False,  _coordinator, SENSORS[EchelonSensorType.ENERGY_FWD],    meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   True,   _coordinator, SENSORS[EchelonSensorType.ENERGY_REV],    meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", False,  _coordinator, SENSORS[EchelonSensorType.VOLTAGE],       meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", False,  _coordinator, SENSORS[EchelonSensorType.VOLTAGE],       meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", False,  _coordinator, SENSORS[EchelonSensorType.VOLTAGE],       meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", False,  _coordinator, SENSORS[EchelonSensorType.CURRENT],       meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", False,  _coordinator, SENSORS[EchelonSensorType.CURRENT],       meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", False,  _coordinator, SENSORS[EchelonSensorType.CURRENT],       meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   False,  _coordinator, SENSORS[EchelonSensorType.POWER],         meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", False,  _coordinator, SENSORS[EchelonSensorType.POWER_PHASE],   meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", False,  _coordinator, SENSORS[EchelonSensorType.POWER_PHASE],   meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", False,  _coordinator, SENSORS[EchelonSensorType.POWER_PHASE],   meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   True,   _coordinator, SENSORS[EchelonSensorType.POWER_REV],     meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L1", True,   _coordinator, SENSORS[EchelonSensorType.POWER_REV],     meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L2", True,   _coordinator, SENSORS[EchelonSensorType.POWER_REV],     meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "L3", True,   _coordinator, SENSORS[EchelonSensorType.POWER_REV],     meter_sn, deadbands))
+        sensors.append(MeterEntity(config_entry.entry_id, config["name"], "",   False,  _coordinator, SENSORS[EchelonSensorType.FREQUENCY],     meter_sn, deadbands))
         # fmt: on
+        sensors.extend(
+            MeterDiagnosticEntity(
+                config_entry.entry_id,
+                config["name"],
+                _coordinator,
+                description,
+                meter_sn,
+            )
+            for description in DIAGNOSTIC_SENSORS
+        )
+        async_add_entities(sensors)
 
     except Exception as err:
         _LOGGER.warning("Failed to add sensors: %s", err)
-        _LOGGER.debug("%s", traceback.format_exc())
+        _LOGGER.debug("Failed to add sensors", exc_info=True)
         raise PlatformNotReady from err
 
     # # Build array of devices to keep
@@ -194,9 +395,10 @@ class MeterEntity(SensorEntity):
         meterName,
         phase,
         returned,
-        meterclient,
-        description: SensorEntityDescription,
+        coordinator: MeterCoordinator,
+        description: MeterSensorEntityDescription,
         meter_sn,
+        deadbands: dict[EchelonSensorType, Deadband],
     ) -> None:
         """Initialize the sensor."""
         self.entity_description = description
@@ -209,7 +411,15 @@ class MeterEntity(SensorEntity):
         self._phase = phase
         self._returned = returned
         self._meter_sn = meter_sn
-        self._meterclient = meterclient
+        self._coordinator = coordinator
+        self._extract = description.compile_extractor(phase)
+        # Snapshot attributes the state and unique_id are made from
+        self._source_fields = frozenset(
+            (*(attr for attr, _ in description.phase_fields(phase)), "utility_sn")
+        )
+        self._deadband = deadbands[description.key]
+        self._written_value = None
+        self._written_at = 0.0
 
         self._attr_native_value = None
         self._attr_name = (
@@ -245,15 +455,20 @@ class MeterEntity(SensorEntity):
         """Device availability."""
         return self._attr_native_value is not None
 
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
+    def _update_from_coordinator(self):
+        """Set state from the data fetched by the coordinator."""
         _LOGGER.debug("Setting status for %s", self._attr_name)
 
         self._attr_native_value = None
+        self._attr_extra_state_attributes = None
+        aggregate = self._coordinator.aggregate
+        snapshot = self._coordinator.snapshot if aggregate is None else aggregate.last
+        if snapshot is None:
+            return
 
         try:
             # Unique ID
-            meter_sn = await self._meterclient.get_metersn()
+            meter_sn = snapshot.utility_sn
             if meter_sn is not None:
                 if self._meter_sn != meter_sn:
                     self._meter_sn = meter_sn
@@ -262,73 +477,133 @@ class MeterEntity(SensorEntity):
                     )
 
             # Measurement
-            if self._itemName == "energy consumption":
-                energy = await self._meterclient.get_value(["Fwd_Act_Wh"])
-                if energy is not None:
-                    self._attr_native_value = int(energy) / 1000
-                    # _LOGGER.warning(f"state: {self._attr_native_value}, attrib: {self.extra_state_attributes}")
-            if self._itemName == "energy returned":
-                energy = await self._meterclient.get_value(["Rev_Act_Wh"])
-                if energy is not None:
-                    self._attr_native_value = int(energy) / 1000
-            if self._itemName == "voltage":
-                voltage = await self._meterclient.get_value([self._phase + "_RMS_V"])
-                if voltage is not None:
-                    self._attr_native_value = int(voltage) / 1000
-            if self._itemName == "current":
-                current = await self._meterclient.get_value([self._phase + "_RMS_A"])
-                if current is not None:
-                    self._attr_native_value = int(current) / 1000
-            if self._itemName in ("power", "power returned"):
-                prop = "Fwd_W" if not self._returned else "Rev_W"
-                if self._phase != "":
-                    prop = f"{self._phase}_{prop}"
-                power = await self._meterclient.get_value([prop])
-                if power is not None:
-                    self._attr_native_value = int(power)
-                # current = await self._meterclient.get_value([ self._phase + "_RMS_A"])
-                # voltage = await self._meterclient.get_value([ self._phase + "_RMS_V"])
-                # if (current is not None and voltage is not None):
-                #     self._attr_native_value = round((int(current) / 1000) * (int(voltage) / 1000), 3)
-            if self._itemName == "frequency":
-                frequency = await self._meterclient.get_value(["Freq_mHz"])
-                if frequency is not None:
-                    self._attr_native_value = int(frequency) / 1000
+            if aggregate is None:
+                self._attr_native_value = self._extract(snapshot)
+            else:
+                self._update_from_aggregate(aggregate)
 
         except Exception as err:  # pylint: disable=broad-except
             _LOGGER.warning("Failed to update sensor %s: %s", self._attr_name, err)
-            _LOGGER.debug("%s", traceback.format_exc())
+            _LOGGER.debug("Failed to update sensor %s", self._attr_name, exc_info=True)
+
+        self._manufacturer = snapshot.meter_manufacturer
+        self._model = snapshot.meter_model
+        self._sw_version = snapshot.meter_sw_version
+
+    def _update_from_aggregate(self, aggregate: MeterAggregate):
+        """Set state and statistics attributes from sampled readings."""
+        mean = self._extract(aggregate.mean)
+        last = self._extract(aggregate.last)
+        # The mean of a meter reading is meaningless, use the latest
+        self._attr_native_value = (
+            last
+            if self.entity_description.state_class == SensorStateClass.TOTAL_INCREASING
+            else mean
+        )
+        self._attr_extra_state_attributes = {
+            ATTR_MEAN: mean,
+            ATTR_MIN: self._extract(aggregate.minimum),
+            ATTR_MAX: self._extract(aggregate.maximum),
+            ATTR_LAST: last,
+            ATTR_SAMPLES: aggregate.count,
+        }
 
-        try:
-            self._manufacturer = await self._meterclient.get_value(
-                ["Meter_Manufacturer"]
-            )
-            self._model = await self._meterclient.get_value(["Meter_Model"])
-            self._sw_version = await self._meterclient.get_value(["Meter_SW_Version"])
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.debug(
-                "Failed to get Manufacturer, Model & SW. Version %s: %s",
-                self._attr_name,
-                err,
+    @property
+    def should_poll(self):
+        """Should Home Assistant check with the entity for an updated state?."""
+        return False
+
+    async def async_added_to_hass(self):
+        """Register callbacks."""
+        self._update_from_coordinator()
+        # The initial state is written when the entity is added
+        self._written_value = self._attr_native_value
+        self._written_at = time.monotonic()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{DOMAIN}_{self._config_entry_id}_refresh",
+                self._update_callback,
             )
-            _LOGGER.debug("%s", traceback.format_exc())
+        )
+
+    @callback
+    def _update_callback(self):
+        """Update state from the coordinator data, no I/O involved.
+
+        The state is only written when the value leaves the deadband, or the
+        heartbeat is due. Until then, nothing is done if none of the fields
+        the value is read from changed. A heartbeat write is forced, so
+        last_updated moves on while the value stays the same.
+        """
+        now = time.monotonic()
+        heartbeat_due = now - self._written_at >= self._deadband.heartbeat
+        if not heartbeat_due and self._source_fields.isdisjoint(
+            self._coordinator.changed
+        ):
+            return
+        self._update_from_coordinator()
+        value = self._attr_native_value
+        if not heartbeat_due and not self._deadband.exceeded(
+            self._written_value, value
+        ):
+            return
+        self._written_value = value
+        self._written_at = now
+        self._attr_force_update = heartbeat_due
+        self.async_write_ha_state()
+
+
+class MeterDiagnosticEntity(SensorEntity):
+    """Sensor of how the reader of the MEP module is doing."""
+
+    entity_description: MeterDiagnosticEntityDescription
+    # Latencies change with every fetch
+    _unrecorded_attributes = frozenset(f"{part}_mean" for part in LATENCY_PARTS)
+
+    def __init__(
+        self,
+        config_entry_id,
+        meterName,
+        coordinator: MeterCoordinator,
+        description: MeterDiagnosticEntityDescription,
+        meter_sn,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._config_entry_id = config_entry_id
+        self._coordinator = coordinator
+        self._attr_name = f"{meterName} MEP {description.name}"
+        self._attr_unique_id = f"{DOMAIN}-{meter_sn}-MEP-{description.name}"
+        # The MEP device is described by the binary sensors
+        self._attr_device_info = {"identifiers": {(DOMAIN, f"{meter_sn}_MEP")}}
 
     @property
     def should_poll(self):
         """Should Home Assistant check with the entity for an updated state?."""
         return False
 
+    def _update_from_metrics(self):
+        """Set state from the metrics of the reader."""
+        metrics = self._coordinator.meterclient.metrics
+        description = self.entity_description
+        self._attr_native_value = description.value_fn(metrics)
+        if description.attributes_fn is not None:
+            self._attr_extra_state_attributes = description.attributes_fn(metrics)
+
     async def async_added_to_hass(self):
         """Register callbacks."""
+        self._update_from_metrics()
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
-                f"{DOMAIN}_{self._config_entry_id}_refresh",
+                self._coordinator.metrics_signal,
                 self._update_callback,
             )
         )
 
     @callback
     def _update_callback(self):
-        """Call update method."""
-        self.async_schedule_update_ha_state(True)
+        """Update state from the metrics, no I/O involved."""
+        self._update_from_metrics()
+        self.async_write_ha_state()
@@ -0,0 +1 @@
+"""Tests for dabblerdk_powermeterreader."""
@@ -0,0 +1,63 @@
+"""Helpers for dabblerdk_powermeterreader tests."""
+
+from typing import Any
+
+from aiohttp import web
+
+from custom_components.dabblerdk_powermeterreader.meter import MeterSnapshot
+from custom_components.dabblerdk_powermeterreader.meter.meter import FIELDS
+
+
+def make_payload(
+    energy_wh: int = 1_000_000,
+    phases_w: tuple[int, int, int] = (100, 200, 300),
+    meter_time: str = "2024-01-01 12:00:00",
+    **changes: Any,
+) -> dict[str, Any]:
+    """Get a getDashDataWS payload, consistent unless changes say otherwise."""
+    payload: dict[str, Any] = {
+        "Utility_SN": "12345678",
+        "CurrentDateTime": meter_time,
+        "Fwd_Act_Wh": energy_wh,
+        "Rev_Act_Wh": 0,
+        "Fwd_W": sum(phases_w),
+        "Rev_W": 0,
+        "Freq_mHz": 50000,
+        "Meter_Manufacturer": "Echelon",
+        "Meter_Model": "83331-3I",
+        "Meter_SW_Version": "1",
+        "ESP_SW_By": "dabbler.dk",
+        "ESP_SW": "MEP",
+        "ESP_SW_Version": "1",
+    }
+    for phase, power in enumerate(phases_w, 1):
+        payload[f"L{phase}_RMS_A"] = round(power / 230 * 1000)
+        payload[f"L{phase}_RMS_V"] = 230000
+        payload[f"L{phase}_Fwd_W"] = power
+        payload[f"L{phase}_Rev_W"] = 0
+    payload.update(changes)
+    return payload
+
+
+def make_snapshot(**kwargs: Any) -> MeterSnapshot:
+    """Get a snapshot of make_payload(**kwargs)."""
+    return MeterSnapshot.from_payload(make_payload(**kwargs))
+
+
+def values_snapshot(**values: float | None) -> MeterSnapshot:
+    """Get a snapshot with only the given attributes set."""
+    return MeterSnapshot.from_values(values.get(attr) for _, attr, _ in FIELDS)
+
+
+class Module:
+    """A MEP module stand-in with a payload that tests can change."""
+
+    def __init__(self) -> None:
+        self.payload: dict[str, Any] | None = make_payload()
+        self.requests = 0
+        self.url = ""
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Answer getDashDataWS with the payload."""
+        self.requests += 1
+        return web.json_response(self.payload)
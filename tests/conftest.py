@@ -0,0 +1,88 @@
+"""Fixtures for dabblerdk_powermeterreader tests."""
+
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+
+from tools.simulator import (
+    MeterSimulator,
+)
+
+from .common import Module
+
+pytest_plugins = ["pytest_homeassistant_custom_component"]
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the benchmark options."""
+    parser.addoption(
+        "--benchmark-output", help="write the benchmark results as JSON to this file"
+    )
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+async def simulator(socket_enabled) -> AsyncIterator[MeterSimulator]:
+    """A simulated MEP module, standing in for the hardware."""
+    server = MeterSimulator()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def stand_in(
+    socket_enabled,
+) -> AsyncIterator[Callable[[Handler], Awaitable[str]]]:
+    """Start a MEP module stand-in answering getDashDataWS with a handler.
+
+    Returns the url of the stand-in.
+    """
+    runners: list[web.AppRunner] = []
+
+    async def start(handler: Handler) -> str:
+        app = web.Application()
+        app.router.add_get("/getDashDataWS", handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        runners.append(runner)
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    yield start
+    for runner in runners:
+        await runner.cleanup()
+
+
+@pytest.fixture
+async def module(
+    stand_in: Callable[[Handler], Awaitable[str]],
+) -> AsyncIterator[Module]:
+    """A MEP module stand-in, with the reader's cache disabled."""
+    module = Module()
+    module.url = await stand_in(module.handle)
+    with patch("custom_components.dabblerdk_powermeterreader.CACHE_TIME", 0):
+        yield module
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(pytestconfig: pytest.Config):
+    """Collect benchmark results, written as JSON when the session ends."""
+    results: dict[str, dict] = {}
+    yield results
+    path = pytestconfig.getoption("benchmark_output")
+    if path and results:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,90 @@
+"""Tests of the hourly counters interpolated across gaps."""
+
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.dabblerdk_powermeterreader.meter.backfill import (
+    HOUR,
+    HourlyCounter,
+    interpolate_hourly,
+    parse_meter_time,
+)
+
+# An hour boundary
+T0 = 1_700_000_000 // HOUR * HOUR
+
+
+def test_short_gaps_are_left_alone() -> None:
+    """Gaps up to min_gap are covered by the recorder."""
+    assert interpolate_hourly([(T0 - 600, 10.0), (T0 + 3000, 11.0)]) == []
+
+
+def test_gap_is_interpolated() -> None:
+    """Each hour boundary inside the gap gets a linear counter."""
+    samples = [(T0 + 1800, 100.0), (T0 + 3 * HOUR + 1800, 103.0)]
+    assert interpolate_hourly(samples) == [
+        HourlyCounter(T0, 100.5),
+        HourlyCounter(T0 + HOUR, 101.5),
+        HourlyCounter(T0 + 2 * HOUR, 102.5),
+    ]
+
+
+def test_boundary_at_sample_is_not_interpolated() -> None:
+    """Only boundaries strictly between the samples are filled in."""
+    samples = [(T0, 100.0), (T0 + 2 * HOUR, 102.0)]
+    assert interpolate_hourly(samples) == [HourlyCounter(T0, 101.0)]
+
+
+def test_decreasing_counter_is_skipped() -> None:
+    """A counter going down across a gap, e.g. a new meter, is not filled."""
+    samples = [(T0, 100.0), (T0 + 3 * HOUR, 50.0), (T0 + 6 * HOUR, 53.0)]
+    assert [counter.start for counter in interpolate_hourly(samples)] == [
+        T0 + 3 * HOUR,
+        T0 + 4 * HOUR,
+    ]
+
+
+def test_samples_are_sorted_and_missing_dropped() -> None:
+    """Unsorted samples and None counters are handled."""
+    samples = [(T0 + 2 * HOUR, 102.0), (T0 + HOUR, None), (T0, 100.0)]
+    assert interpolate_hourly(samples) == [HourlyCounter(T0, 101.0)]
+
+
+def test_no_duplicate_hours() -> None:
+    """Each hour appears once, also when samples share a timestamp."""
+    samples = [(T0, 100.0), (T0 + 2 * HOUR, 102.0), (T0 + 2 * HOUR, 102.0)]
+    starts = [counter.start for counter in interpolate_hourly(samples)]
+    assert starts == sorted(set(starts))
+
+
+def test_min_gap() -> None:
+    """min_gap can be lowered to fill shorter gaps."""
+    samples = [(T0 - 600, 10.0), (T0 + 600, 12.0)]
+    assert interpolate_hourly(samples, min_gap=900) == [HourlyCounter(T0 - HOUR, 11.0)]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2024-01-02 03:04:05",
+        "2024-01-02T03:04:05",
+        "2024/01/02 03:04:05",
+        "02-01-2024 03:04:05",
+        "02/01/2024 03:04:05",
+        "02.01.2024 03:04:05",
+    ],
+)
+def test_parse_meter_time(value: str) -> None:
+    """The formats seen from meters are understood, in the given zone."""
+    tz = timezone(timedelta(hours=1))
+    assert parse_meter_time(value, tz) == datetime(2024, 1, 2, 3, 4, 5, tzinfo=tz)
+
+
+def test_parse_meter_time_offset_and_garbage() -> None:
+    """An explicit offset is kept, anything else unknown is None."""
+    assert parse_meter_time("2024-01-02T03:04:05+00:00", timezone.max) == datetime(
+        2024, 1, 2, 3, 4, 5, tzinfo=UTC
+    )
+    assert parse_meter_time("yesterday") is None
+    assert parse_meter_time(None) is None
@@ -0,0 +1,89 @@
+"""Run the benchmarks at a small scale, keeping their results.
+
+With --benchmark-output, the results are written to that file as JSON,
+like python -m tools.benchmark does.
+"""
+
+import argparse
+import inspect
+
+import pytest
+
+from tools.benchmark import BENCHMARKS
+
+OPTIONS = argparse.Namespace(latency=0.001, requests=50, concurrency=5, payloads=None)
+
+
+def _check_import(result: dict) -> None:
+    assert result["heavy_modules_loaded"] == []
+
+
+def _check_fetch(result: dict) -> None:
+    assert result["calls"] == OPTIONS.requests
+
+
+def _check_stale(result: dict) -> None:
+    # Every stale read refreshed in the background, once
+    assert result["refreshes"] == OPTIONS.requests
+    assert result["requests_to_module"] == OPTIONS.requests
+
+
+def _check_concurrent(result: dict) -> None:
+    assert result["calls"] == OPTIONS.requests
+    # Concurrent callers share the fetches in progress
+    assert result["requests_to_module"] <= OPTIONS.requests
+
+
+def _check_cache_hit(result: dict) -> None:
+    assert result["requests_to_module"] == 1
+
+
+def _check_fleet(result: dict) -> None:
+    for count, meters in result.items():
+        assert meters["peak_in_flight"] <= OPTIONS.concurrency, count
+        assert meters["smallest_gap_ratio"] > 0, count
+
+
+def _check_backfill(result: dict) -> None:
+    assert result["hours_backfilled"] > 0
+
+
+def _check_filters(result: dict) -> None:
+    assert 0 < result["rejected"] < result["readings"]
+
+
+def _check_decode(result: dict) -> None:
+    assert result["payloads"] > 0
+    assert result["baseline_us"] > 0
+    assert result["per_poll_us"] > 0
+
+
+def _check_fanout(result: dict) -> None:
+    assert result["entities"] == 19
+    # Entities skip readings without changes of their fields
+    unchanged = result["fanout_unchanged"]["percentiles"]["50"]
+    assert unchanged < result["fanout_changed"]["percentiles"]["50"]
+
+
+CHECKS = {
+    "import": _check_import,
+    "fetch": _check_fetch,
+    "stale": _check_stale,
+    "concurrent": _check_concurrent,
+    "cache_hit": _check_cache_hit,
+    "fleet": _check_fleet,
+    "backfill": _check_backfill,
+    "filters": _check_filters,
+    "decode": _check_decode,
+    "fanout": _check_fanout,
+}
+
+
+@pytest.mark.parametrize("name", CHECKS)
+async def test_benchmark(name: str, socket_enabled, benchmark_results: dict) -> None:
+    """Test that a benchmark runs and that its result makes sense."""
+    result = BENCHMARKS[name](OPTIONS)
+    if inspect.isawaitable(result):
+        result = await result
+    benchmark_results[name] = result
+    CHECKS[name](result)
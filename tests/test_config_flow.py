@@ -0,0 +1,143 @@
+"""Tests of the config and options flows."""
+
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dabblerdk_powermeterreader.const import (
+    DATA_RESOLVER,
+    DOMAIN,
+)
+
+from .common import Module
+
+
+async def _user_step(hass: HomeAssistant, url: str) -> dict:
+    """Run the user step with url."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] == FlowResultType.FORM
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"], user_input={"name": "Echelon", "url": url}
+    )
+
+
+async def test_user_step(hass: HomeAssistant, module: Module) -> None:
+    """Test that a working url creates an entry, without a shared resolver."""
+    with patch(
+        "custom_components.dabblerdk_powermeterreader.async_setup_entry",
+        return_value=True,
+    ) as setup_entry:
+        result = await _user_step(hass, module.url)
+        await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert len(setup_entry.mock_calls) == 1
+    assert result["data"] == {"name": "Echelon", "url": module.url}
+    assert DATA_RESOLVER not in hass.data
+
+
+async def test_user_step_errors(hass: HomeAssistant, module: Module) -> None:
+    """Test the errors of urls that do not lead to a MEP module."""
+    result = await _user_step(hass, "esp32-mep.local")
+    assert result["errors"] == {"url": "invalid_url"}
+
+    module.payload = None
+    result = await _user_step(hass, module.url)
+    assert result["errors"] == {"url": "empty_response"}
+
+    module.payload = {"Utility_SN": "12345678"}
+    result = await _user_step(hass, module.url)
+    assert result["errors"] == {"url": "unexpected_response"}
+
+    # Nothing listens on the discard port
+    result = await _user_step(hass, "http://127.0.0.1:9/")
+    assert result["errors"] == {"url": "request_failed"}
+    assert DATA_RESOLVER not in hass.data
+
+
+async def test_options_flow(hass: HomeAssistant, module: Module) -> None:
+    """Test that the options are validated, then saved with the deadbands."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"name": "Echelon", "url": module.url},
+        options={"scan_interval": 300, "journal_interval": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    options = result["data_schema"]({})
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=options | {"max_staleness": 2}
+    )
+    assert result["errors"] == {"max_staleness": "max_staleness_outofbounds"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=options | {"max_staleness": 60}
+    )
+    assert result["step_id"] == "deadband"
+    deadbands = result["data_schema"]({})
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=deadbands | {"deadband_power_percent": 150}
+    )
+    assert result["errors"] == {
+        "deadband_power_percent": "deadband_percent_outofbounds"
+    }
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=deadbands
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    await hass.async_block_till_done()
+    assert entry.options["max_staleness"] == 60
+    assert entry.options["journal_interval"] == 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_options_scan_interval_bounds(
+    hass: HomeAssistant, module: Module
+) -> None:
+    """Test that bounds left at the scan interval follow it, and their errors."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"name": "Echelon", "url": module.url},
+        options={"scan_interval": 300, "journal_interval": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    options = result["data_schema"]({})
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=options | {"scan_interval_max": 4000}
+    )
+    assert result["errors"] == {"scan_interval_max": "scan_interval_outofbounds"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=options | {"scan_interval_min": 600}
+    )
+    assert result["errors"] == {"scan_interval_min": "scan_interval_bounds"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=options | {"scan_interval": 60}
+    )
+    assert result["step_id"] == "deadband"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=result["data_schema"]({})
+    )
+    await hass.async_block_till_done()
+    assert entry.options["scan_interval"] == 60
+    assert entry.options["scan_interval_min"] == 60
+    assert entry.options["scan_interval_max"] == 60
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,106 @@
+"""Tests of the plausibility rules."""
+
+from custom_components.dabblerdk_powermeterreader.meter import (
+    PlausibilityConfig,
+    PlausibilityFilter,
+)
+
+from .common import make_snapshot
+
+ENERGY_WH = 1_000_000
+
+
+def test_first_reading_is_accepted() -> None:
+    """Without a previous reading there is nothing to compare to."""
+    plausibility = PlausibilityFilter()
+    assert plausibility.evaluate(None, make_snapshot(Fwd_Act_Wh=None), None)
+
+
+def test_energy_must_be_present() -> None:
+    """A reading without the forward energy counter is rejected."""
+    verdict = PlausibilityFilter().evaluate(
+        make_snapshot(), make_snapshot(Fwd_Act_Wh=None), 60
+    )
+    assert not verdict
+    assert verdict.rule == "energy_present"
+
+
+def test_energy_may_not_decrease() -> None:
+    """The counter going down is rejected."""
+    verdict = PlausibilityFilter().evaluate(
+        make_snapshot(energy_wh=ENERGY_WH), make_snapshot(energy_wh=ENERGY_WH - 1), 60
+    )
+    assert verdict.rule == "energy_rate"
+
+
+def test_energy_rate_follows_the_fuse() -> None:
+    """The counter may grow three times what the fuses allow."""
+    prev = make_snapshot(energy_wh=ENERGY_WH)
+    # 16 A * 3 phases * 230 V * 3 for 60 seconds is 552 Wh
+    plausibility = PlausibilityFilter()
+    assert plausibility.evaluate(prev, make_snapshot(energy_wh=ENERGY_WH + 552), 60)
+    verdict = plausibility.evaluate(prev, make_snapshot(energy_wh=ENERGY_WH + 553), 60)
+    assert verdict.rule == "energy_rate"
+    assert verdict.detail == "diff 553 Wh, wh_limit 552 Wh"
+
+    # A bigger fuse allows more
+    plausibility = PlausibilityFilter(PlausibilityConfig(fuse_a=35))
+    assert plausibility.evaluate(prev, make_snapshot(energy_wh=ENERGY_WH + 1200), 60)
+
+
+def test_energy_rate_uses_min_elapsed() -> None:
+    """Readings close together, or of unknown age, get the min_elapsed limit."""
+    prev = make_snapshot(energy_wh=ENERGY_WH)
+    plausibility = PlausibilityFilter()
+    assert plausibility.evaluate(prev, make_snapshot(energy_wh=ENERGY_WH + 552), 1)
+    assert plausibility.evaluate(prev, make_snapshot(energy_wh=ENERGY_WH + 552), None)
+
+
+def test_energy_rate_gives_up_after_max_elapsed() -> None:
+    """After max_elapsed any increase is taken, a decrease still is not."""
+    prev = make_snapshot(energy_wh=ENERGY_WH)
+    plausibility = PlausibilityFilter()
+    assert plausibility.evaluate(prev, make_snapshot(energy_wh=ENERGY_WH * 2), 1801)
+    assert plausibility.evaluate(prev, make_snapshot(energy_wh=ENERGY_WH - 1), 1801)
+
+
+def test_phase_sum() -> None:
+    """The phases must add up to the total, within the tolerance."""
+    prev = make_snapshot()
+    plausibility = PlausibilityFilter()
+    assert plausibility.evaluate(prev, make_snapshot(Fwd_W=603), 60)
+    verdict = plausibility.evaluate(prev, make_snapshot(Fwd_W=604), 60)
+    assert verdict.rule == "phase_sum"
+    assert verdict.detail == "600 != 604"
+
+    verdict = plausibility.evaluate(prev, make_snapshot(L2_Fwd_W=None), 60)
+    assert verdict.reason == "Power missing"
+
+
+def test_phase_sum_nets_returned_power() -> None:
+    """Power returned on one phase is subtracted from the others."""
+    snapshot = make_snapshot(
+        phases_w=(500, 0, 300), Fwd_W=500, L2_Rev_W=300, L2_Fwd_W=0
+    )
+    assert PlausibilityFilter().evaluate(make_snapshot(), snapshot, 60)
+
+
+def test_batch_compares_to_last_accepted() -> None:
+    """A spike is rejected, and the reading after it checked against the one before."""
+    readings = [
+        (0, make_snapshot(energy_wh=ENERGY_WH)),
+        (60, make_snapshot(energy_wh=ENERGY_WH + 100_000)),
+        (120, make_snapshot(energy_wh=ENERGY_WH + 10)),
+    ]
+    plausibility = PlausibilityFilter()
+    verdicts = plausibility.evaluate_batch(readings)
+    assert [verdict.accepted for verdict in verdicts] == [True, False, True]
+    assert plausibility.stats() == {
+        "evaluated": 3,
+        "accepted": 2,
+        "rules": {
+            "energy_present": {"passed": 2, "rejected": 0},
+            "energy_rate": {"passed": 1, "rejected": 1},
+            "phase_sum": {"passed": 1, "rejected": 0},
+        },
+    }
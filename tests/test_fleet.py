@@ -0,0 +1,34 @@
+"""Tests of spreading polls over a fleet of meters."""
+
+import pytest
+
+from custom_components.dabblerdk_powermeterreader.meter import Fleet
+
+
+@pytest.mark.parametrize("phase", [0, 0.25, 0.618])
+@pytest.mark.parametrize("now", [1_700_000_000.0, 1_700_000_017.3])
+def test_fleet_next_delay_lands_on_phase(phase: float, now: float) -> None:
+    """The poll is moved to the member's slot, by at most half a delay."""
+    delay = 60
+    result = Fleet.next_delay(phase, delay, now)
+    assert delay / 2 <= result <= delay * 1.5
+    slots = (now + result - phase * delay) / delay
+    assert slots == pytest.approx(round(slots))
+
+
+def test_fleet_next_delay_on_time() -> None:
+    """Polling on time every delay seconds is not changed."""
+    now = 1_700_000_000 // 60 * 60 + 15.0
+    assert Fleet.next_delay(0.25, 60, now) == 60
+    assert Fleet.next_delay(0.25, 0, now) == 0
+
+
+def test_fleet_phases() -> None:
+    """Members are spread, and get their phase back when rejoining."""
+    fleet = Fleet()
+    phases = [fleet.join(key) for key in "abcd"]
+    assert len(set(phases)) == 4
+    assert fleet.join("b") == phases[1]
+    fleet.leave("b")
+    assert len(fleet) == 3
+    assert fleet.join("e") == phases[1]
@@ -0,0 +1,94 @@
+"""Tests of the in-memory history of readings."""
+
+import math
+
+import pytest
+
+from custom_components.dabblerdk_powermeterreader.meter import SampleHistory
+from custom_components.dabblerdk_powermeterreader.meter.history import TIMESTAMP
+
+from .common import values_snapshot
+
+
+def _filled(capacity: int, count: int) -> SampleHistory:
+    """Get a history with readings at 0, 10, 20, ... of energy 0, 1, 2, ..."""
+    history = SampleHistory(capacity)
+    for index in range(count):
+        history.append(index * 10.0, values_snapshot(energy_fwd=float(index)))
+    return history
+
+
+def test_capacity_must_be_positive() -> None:
+    """A history must hold at least one reading."""
+    with pytest.raises(ValueError):
+        SampleHistory(0)
+
+
+def test_wraparound_keeps_newest() -> None:
+    """When full, the oldest readings are overwritten."""
+    history = _filled(4, 10)
+    assert len(history) == 4
+    window = history.window(0)
+    assert list(window[TIMESTAMP]) == [60, 70, 80, 90]
+    assert list(window["energy_fwd"]) == [6, 7, 8, 9]
+
+
+def test_window_bounds_are_inclusive() -> None:
+    """Readings at start and end are included."""
+    history = _filled(16, 10)
+    assert list(history.window(20, 50)[TIMESTAMP]) == [20, 30, 40, 50]
+    assert list(history.window(15, 45)[TIMESTAMP]) == [20, 30, 40]
+    assert list(history.window(95)[TIMESTAMP]) == []
+    assert list(history.window(50, 40)[TIMESTAMP]) == []
+
+
+def test_window_across_the_wrap() -> None:
+    """Bisecting works on the logical order, not the array order."""
+    history = _filled(5, 8)
+    # Array holds 50, 60, 70, 30, 40
+    window = history.window(35, 65, fields=["energy_fwd"])
+    assert list(window[TIMESTAMP]) == [40, 50, 60]
+    assert list(window["energy_fwd"]) == [4, 5, 6]
+    assert set(window) == {TIMESTAMP, "energy_fwd"}
+
+
+def test_timestamps_never_decrease() -> None:
+    """A reading older than the newest one gets the newest timestamp."""
+    history = _filled(4, 3)
+    history.append(5.0, values_snapshot(energy_fwd=3.0))
+    assert list(history.window(0)[TIMESTAMP]) == [0, 10, 20, 20]
+
+
+def test_missing_values_are_nan() -> None:
+    """None is stored as NaN and left out of the statistics."""
+    history = SampleHistory(4)
+    history.append(0.0, values_snapshot(energy_fwd=1.0, power_fwd=100.0))
+    history.append(10.0, values_snapshot(energy_fwd=2.0))
+    assert math.isnan(history.window(0)["power_fwd"][1])
+
+    stats = history.statistics(0, fields=["energy_fwd", "power_fwd", "frequency"])
+    assert stats["samples"] == 2
+    assert stats["fields"]["power_fwd"]["mean"] == 100
+    assert stats["fields"]["energy_fwd"]["delta"] == 1
+    assert stats["fields"]["frequency"] is None
+
+
+def test_statistics() -> None:
+    """Min, max, mean and interpolated percentiles."""
+    history = _filled(16, 11)
+    stats = history.statistics(0, fields=["energy_fwd"], percentiles=[50, 95])
+    energy = stats["fields"]["energy_fwd"]
+    assert (stats["start"], stats["end"]) == (0, 100)
+    assert (energy["min"], energy["max"], energy["mean"]) == (0, 10, 5)
+    assert energy["percentiles"] == {"50": 5, "95": 9.5}
+    assert energy["delta"] == 10
+
+
+def test_memory_is_fixed() -> None:
+    """Memory is allocated up front, about 80 bytes per reading."""
+    history = SampleHistory(1000)
+    nbytes = history.nbytes
+    for index in range(2000):
+        history.append(float(index), values_snapshot(energy_fwd=1.0))
+    assert history.nbytes == nbytes
+    assert 60_000 < nbytes < 100_000
@@ -0,0 +1,195 @@
+"""Tests of setting up the integration against a MEP module stand-in."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.dabblerdk_powermeterreader.const import (
+    DATA_FLEET,
+    DATA_RESOLVER,
+    DOMAIN,
+)
+from custom_components.dabblerdk_powermeterreader.meter import SampleJournal
+
+from .common import Module, make_payload, make_snapshot
+
+ENERGY = "sensor.echelon_energy_consumption"
+POWER = "sensor.echelon_power"
+CONNECTION = "binary_sensor.echelon_mep_connection"
+
+
+async def _setup(hass: HomeAssistant, url: str, **options: Any) -> MockConfigEntry:
+    """Set up an entry polling url, without the journal unless asked for."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"name": "Echelon", "url": url},
+        options={"scan_interval": 300, "journal_interval": 0} | options,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_setup_and_unload(hass: HomeAssistant, module: Module) -> None:
+    """Test that one fetch sets up all entities, and unload cleans up."""
+    entry = await _setup(hass, module.url)
+
+    assert module.requests == 1
+    assert hass.states.get(ENERGY).state == "1000.0"
+    assert hass.states.get(POWER).state == "600"
+    assert hass.states.get(CONNECTION).state == "on"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert DATA_FLEET not in hass.data
+    assert DATA_RESOLVER not in hass.data
+
+
+async def test_tick_updates_entities(hass: HomeAssistant, module: Module) -> None:
+    """Test that changes beyond the deadband reach the entities."""
+    entry = await _setup(hass, module.url)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    # 2 W is within the default power deadband
+    module.payload = make_payload(phases_w=(102, 200, 300))
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+    assert hass.states.get(POWER).state == "600"
+
+    module.payload = make_payload(
+        energy_wh=1_000_100,
+        phases_w=(500, 200, 300),
+        meter_time="2024-01-01 12:00:10",
+    )
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+    assert hass.states.get(POWER).state == "1000"
+    assert hass.states.get(ENERGY).state == "1000.1"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_unchanged_reading_updates_metrics(
+    hass: HomeAssistant, module: Module
+) -> None:
+    """Test that an unchanged reading skips the entities but not the metrics."""
+    entry = await _setup(hass, module.url)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    signals: list[str] = []
+    for signal in (coordinator.signal, coordinator.metrics_signal):
+        entry.async_on_unload(
+            async_dispatcher_connect(
+                hass, signal, lambda signal=signal: signals.append(signal)
+            )
+        )
+
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+
+    assert module.requests == 3
+    assert signals.count(coordinator.metrics_signal) == 2
+    assert signals.count(coordinator.signal) <= 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_heartbeat_rewrites_unchanged_state(
+    hass: HomeAssistant, module: Module
+) -> None:
+    """Test that an unchanged reading is written again once the heartbeat is due."""
+    entry = await _setup(hass, module.url, heartbeat=1)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    written = hass.states.get(POWER)
+
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+    assert hass.states.get(POWER).last_updated == written.last_updated
+
+    await asyncio.sleep(1.1)
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+    state = hass.states.get(POWER)
+    assert state.state == written.state
+    assert state.last_updated > written.last_updated
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_failed_fetch_is_unavailable(hass: HomeAssistant, module: Module) -> None:
+    """Test that entities go unavailable while the module answers nothing."""
+    entry = await _setup(hass, module.url)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    module.payload = None
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+    assert hass.states.get(POWER).state == "unavailable"
+    # The module did answer
+    assert hass.states.get(CONNECTION).state == "on"
+
+    module.payload = make_payload(meter_time="2024-01-01 12:00:10")
+    await coordinator._async_tick()
+    await hass.async_block_till_done()
+    assert hass.states.get(POWER).state == "600"
+    assert hass.states.get(CONNECTION).state == "on"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_seeded_reading_is_not_an_entity_value(
+    hass: HomeAssistant, module: Module
+) -> None:
+    """Test that a rejected first reading after a restart delays the entities."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"name": "Echelon", "url": module.url},
+        options={"scan_interval": 300, "journal_interval": 60},
+    )
+    entry.add_to_hass(hass)
+    journal = SampleJournal(hass.config.path(STORAGE_DIR, DOMAIN, entry.entry_id))
+    await hass.async_add_executor_job(journal.open)
+    # The energy counter cannot have run backwards since the restart
+    journal.append(
+        datetime.now(tz=UTC).timestamp() - 10, make_snapshot(energy_wh=2_000_000)
+    )
+    await hass.async_add_executor_job(journal.flush)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(POWER) is None
+
+    module.payload = make_payload(energy_wh=2_000_010, meter_time="2024-01-01 12:00:10")
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=60))
+    await hass.async_block_till_done()
+    assert hass.states.get(ENERGY).state == "2000.01"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_stop_closes_session(hass: HomeAssistant, module: Module) -> None:
+    """Test that stopping Home Assistant closes the shared session."""
+    await _setup(hass, module.url)
+    session = hass.data[DATA_FLEET].get_session()
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    assert session.closed
@@ -0,0 +1,129 @@
+"""Tests of the journal of readings on disk."""
+
+import os
+
+import pytest
+
+from custom_components.dabblerdk_powermeterreader.meter import SampleJournal
+from custom_components.dabblerdk_powermeterreader.meter.journal import (
+    RECORD_SIZE,
+    SEGMENT_SUFFIX,
+)
+
+from .common import make_snapshot
+
+# Magic, version and record size
+HEADER_SIZE = 8
+
+
+def _write(directory: str, count: int, **kwargs) -> SampleJournal:
+    """Write count readings, at 1000, 1001, ... with energy 1000, 1001, ... Wh."""
+    journal = SampleJournal(directory, **kwargs)
+    journal.open()
+    for index in range(count):
+        journal.append(
+            1000.0 + index,
+            make_snapshot(
+                energy_wh=1000 + index, meter_time=f"2024-01-01 12:00:{index:02d}"
+            ),
+        )
+    journal.flush()
+    return journal
+
+
+def _segments(directory: str) -> list[str]:
+    """Get the paths of the segments, oldest first."""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+def test_open_returns_newest(tmp_path) -> None:
+    """The newest record is read back with its values and meter time."""
+    _write(str(tmp_path), 3)
+    record = SampleJournal(str(tmp_path)).open()
+    assert record.timestamp == 1002
+    assert record.meter_time == "2024-01-01 12:00:02"
+    assert record.snapshot.energy_fwd == 1.002
+    assert record.snapshot.l3_power_fwd == 300
+    assert record.snapshot.utility_sn is None
+
+
+def test_empty_journal(tmp_path) -> None:
+    """A new journal has no records."""
+    assert SampleJournal(str(tmp_path / "new")).open() is None
+
+
+def test_torn_tail_is_cut_off(tmp_path) -> None:
+    """A record only partly written before a crash is removed on open."""
+    _write(str(tmp_path), 3)
+    (path,) = _segments(str(tmp_path))
+    with open(path, "ab") as file:
+        file.write(b"\x01" * (RECORD_SIZE // 2))
+
+    journal = SampleJournal(str(tmp_path))
+    assert journal.open().timestamp == 1002
+    assert os.path.getsize(path) == HEADER_SIZE + 3 * RECORD_SIZE
+
+    # New records follow the intact ones
+    journal.append(2000.0, make_snapshot())
+    journal.flush()
+    assert [record.timestamp for record in journal.records()] == [
+        1000,
+        1001,
+        1002,
+        2000,
+    ]
+
+
+def test_damaged_record_is_skipped(tmp_path) -> None:
+    """A record failing its CRC is passed over."""
+    _write(str(tmp_path), 3)
+    (path,) = _segments(str(tmp_path))
+    with open(path, "r+b") as file:
+        file.seek(HEADER_SIZE + 2 * RECORD_SIZE + 10)
+        file.write(b"\xff\xff")
+
+    journal = SampleJournal(str(tmp_path))
+    assert journal.open().timestamp == 1001
+    assert [record.timestamp for record in journal.records()] == [1000, 1001]
+
+
+def test_unreadable_segment_is_ignored(tmp_path) -> None:
+    """A segment with a wrong header is skipped, older ones are still used."""
+    _write(str(tmp_path), 2)
+    with open(tmp_path / f"{99:08d}{SEGMENT_SUFFIX}", "wb") as file:
+        file.write(b"not a journal")
+    assert SampleJournal(str(tmp_path)).open().timestamp == 1001
+
+
+def test_segments_rotate(tmp_path) -> None:
+    """Full segments are closed, and only the newest max_segments kept."""
+    journal = _write(str(tmp_path), 7, segment_records=2, max_segments=2)
+    assert len(_segments(str(tmp_path))) == 2
+    assert [record.timestamp for record in journal.records()] == [1004, 1005, 1006]
+    assert [record.timestamp for record in journal.records(since=1005)] == [
+        1005,
+        1006,
+    ]
+
+
+def test_reopen_continues_segment(tmp_path) -> None:
+    """After a restart, records are added to the newest segment."""
+    _write(str(tmp_path), 1, segment_records=4)
+    journal = SampleJournal(str(tmp_path), segment_records=4)
+    assert journal.open().timestamp == 1000
+    journal.append(1001.0, make_snapshot())
+    journal.flush()
+    assert len(_segments(str(tmp_path))) == 1
+    assert len(list(journal.records())) == 2
+
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_flush_without_records(tmp_path, count: int) -> None:
+    """Flushing nothing writes nothing."""
+    journal = _write(str(tmp_path), count)
+    journal.flush()
+    assert len(_segments(str(tmp_path))) == count
@@ -0,0 +1,207 @@
+"""Tests of the reader, against stand-ins for the MEP module."""
+
+import asyncio
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from aiohttp import web
+
+from custom_components.dabblerdk_powermeterreader.meter import MeterReader
+from custom_components.dabblerdk_powermeterreader.meter.meter import (
+    NO_FIELDS,
+    SNAPSHOT_FIELDS,
+    decode_payload,
+)
+from tools.simulator import (
+    Faults,
+    MeterSimulator,
+)
+
+from .common import make_payload, make_snapshot
+
+
+def _answer(*bodies: dict | str):
+    """Get a handler answering with bodies in turn, repeating the last one."""
+    queue = list(bodies)
+
+    async def handler(request: web.Request) -> web.Response:
+        body = queue.pop(0) if len(queue) > 1 else queue[0]
+        if isinstance(body, dict):
+            return web.json_response(body)
+        return web.Response(text=body, content_type="application/json")
+
+    return handler
+
+
+async def test_fetch(simulator: MeterSimulator) -> None:
+    """A reading is fetched, converted and cached."""
+    reader = MeterReader(simulator.urls[0])
+    try:
+        data = await reader.get_meter_data()
+        assert data["Utility_SN"] == "12345678"
+        snapshot = reader.state.snapshot
+        assert snapshot.is_complete
+        assert snapshot.energy_fwd == data["Fwd_Act_Wh"] / 1000
+        assert reader.state.connected
+
+        await reader.get_value(["Fwd_W"])
+        assert simulator.requests == 1
+        assert reader.metrics.cache_hits == 1
+        assert await reader.get_metersn() == "12345678"
+    finally:
+        await reader.async_close()
+
+
+async def test_invalid_json(stand_in) -> None:
+    """A body that is not JSON is logged, counted and shown as disconnected."""
+    reader = MeterReader(await stand_in(_answer("{bad")))
+    try:
+        with pytest.raises(Exception, match="Invalid JSON"):
+            await reader.get_meter_data()
+        (entry,) = reader.get_debug_log()
+        assert entry["verdict"].startswith("invalid JSON")
+        assert entry["payload"] == "{bad"
+        assert reader.metrics.failures == 1
+        assert not reader.state.connected
+        assert reader.state.expires is None
+    finally:
+        await reader.async_close()
+
+
+async def test_empty_and_unexpected_responses(stand_in) -> None:
+    """Empty bodies and other content types fail the fetch."""
+
+    async def html(request: web.Request) -> web.Response:
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    reader = MeterReader(await stand_in(_answer("")))
+    other = MeterReader(await stand_in(html))
+    try:
+        with pytest.raises(Exception, match="empty_response"):
+            await reader.get_meter_data()
+        assert reader.state.connected
+        with pytest.raises(Exception, match="Requesting meter values failed"):
+            await other.get_meter_data()
+        assert not other.state.connected
+    finally:
+        await reader.async_close()
+        await other.async_close()
+
+
+async def test_rejected_reading_keeps_previous(stand_in) -> None:
+    """A spike is rejected, and the previous reading kept."""
+    first = make_payload()
+    spike = make_payload(energy_wh=first["Fwd_Act_Wh"] + 100_000)
+    reader = MeterReader(await stand_in(_answer(first, spike)), cache_time=0)
+    try:
+        await reader.get_meter_data()
+        data = await reader.get_meter_data()
+        assert data["Fwd_Act_Wh"] == first["Fwd_Act_Wh"]
+        assert reader.state.stuck_with_prev_value
+        assert reader.metrics.rejections == {"Fwd_Act_Wh changed too much": 1}
+        assert reader.get_debug_log()[-1]["verdict"] == "Fwd_Act_Wh changed too much"
+    finally:
+        await reader.async_close()
+
+
+async def test_seeded_reading(stand_in) -> None:
+    """A seed from the journal checks the first fetch, but has no serial number."""
+    seed = make_snapshot()
+    spike = make_payload(energy_wh=2_000_000)
+    reader = MeterReader(await stand_in(_answer(spike)))
+    try:
+        reader.seed(seed, datetime.now(tz=UTC) - timedelta(seconds=60))
+        assert reader.state.seeded
+        assert await reader.get_metersn() is None
+        assert reader.state.stuck_with_prev_value
+        assert reader.state.seeded
+    finally:
+        await reader.async_close()
+
+
+async def test_stale_while_revalidate(socket_enabled) -> None:
+    """Expired readings are returned at once, while one fetch runs behind."""
+    simulator = MeterSimulator(faults=Faults(latency=0.2))
+    (url,) = await simulator.start()
+    reader = MeterReader(url, cache_time=0, max_staleness=60)
+    refreshed = asyncio.Event()
+    reader.on_refresh = refreshed.set
+    try:
+        first = await reader.get_meter_data()
+        results = await asyncio.wait_for(
+            asyncio.gather(*(reader.get_meter_data() for _ in range(10))), 0.1
+        )
+        assert all(result is first for result in results)
+        assert reader.metrics.stale_hits == 10
+
+        await asyncio.wait_for(refreshed.wait(), 1)
+        assert simulator.requests == 2
+        snapshot, age = await reader.get_snapshot()
+        assert snapshot is reader.state.snapshot
+        assert 0 <= age < 1
+    finally:
+        await reader.async_close()
+        await simulator.stop()
+
+
+async def test_close_cancels_revalidate(socket_enabled) -> None:
+    """Closing the reader cancels a background fetch still running."""
+    simulator = MeterSimulator(faults=Faults(latency=1))
+    (url,) = await simulator.start()
+    reader = MeterReader(url, cache_time=0, max_staleness=60)
+    tasks: list[asyncio.Task] = []
+
+    def create_task(coro) -> asyncio.Task:
+        tasks.append(asyncio.create_task(coro))
+        return tasks[-1]
+
+    reader.create_task = create_task
+    reader.on_refresh = tasks.clear
+    try:
+        first = await reader.get_meter_data()
+        assert await reader.get_meter_data() is first
+        (task,) = tasks
+
+        await reader.async_close()
+        assert task.cancelled()
+        assert tasks == [task]
+    finally:
+        await reader.async_close()
+        await simulator.stop()
+
+
+async def test_too_stale_is_fetched(simulator: MeterSimulator) -> None:
+    """Beyond max_staleness the fetch is waited for, and failures raised."""
+    reader = MeterReader(simulator.urls[0], cache_time=0, max_staleness=60)
+    try:
+        await reader.get_meter_data()
+        await simulator.async_set_faults(Faults(drop_rate=1))
+        # pylint: disable-next=protected-access
+        reader._state = replace(
+            reader.state, accepted_at=datetime.now(tz=UTC) - timedelta(seconds=61)
+        )
+        with pytest.raises(Exception, match="Requesting meter values failed"):
+            await reader.get_meter_data()
+        assert reader.metrics.stale_hits == 0
+    finally:
+        await reader.async_close()
+
+
+def test_changed_fields() -> None:
+    """Only the differing attributes are changed, nothing for the same meter time."""
+    prev = make_snapshot()
+    assert prev.changed_fields(None) == SNAPSHOT_FIELDS
+    assert prev.changed_fields(prev) == NO_FIELDS
+    assert make_snapshot(Fwd_W=601).changed_fields(prev) == NO_FIELDS
+
+    later = make_snapshot(meter_time="2024-01-01 12:00:10", Freq_mHz=50010)
+    assert later.changed_fields(prev) == {"meter_time", "frequency"}
+
+
+def test_decode_payload() -> None:
+    """Empty bodies are None, others must be JSON."""
+    assert decode_payload(b"  ") is None
+    assert decode_payload(b'{"Fwd_W": 1}') == {"Fwd_W": 1}
+    with pytest.raises(ValueError):
+        decode_payload(b"{bad")
@@ -0,0 +1,64 @@
+"""Tests of the adaptive poll interval."""
+
+from custom_components.dabblerdk_powermeterreader.meter import AdaptiveScheduler
+
+FLAT = (1000, 300, 300, 400)
+JUMP = (3000, 1300, 300, 1400)
+
+
+def test_fixed_interval() -> None:
+    """With all intervals equal, the delay never changes."""
+    scheduler = AdaptiveScheduler(60, 60, 60)
+    assert [scheduler.next_delay(power, False) for power in (FLAT, JUMP, FLAT)] == [
+        60,
+        60,
+        60,
+    ]
+    assert scheduler.next_delay(None, True) == 60
+
+
+def test_fast_while_power_changes() -> None:
+    """A jump in power polls at min_interval, then relaxes towards interval."""
+    scheduler = AdaptiveScheduler(60, 10, 300)
+    assert scheduler.next_delay(FLAT, False) == 60
+    assert scheduler.next_delay(JUMP, False) == 10
+    assert scheduler.next_delay(JUMP, False) == 15
+    assert scheduler.next_delay(JUMP, False) == 22.5
+    assert [scheduler.next_delay(JUMP, False) for _ in range(3)] == [33.75, 50.625, 60]
+
+
+def test_small_changes_are_flat() -> None:
+    """Changes below the threshold and ratio do not speed up polling."""
+    scheduler = AdaptiveScheduler(60, 10, 300)
+    scheduler.next_delay(FLAT, False)
+    assert scheduler.next_delay((1099, 300, 300, 499), False) == 60
+    # 10 % of 5000 W is more than 100 W
+    scheduler = AdaptiveScheduler(60, 10, 300)
+    scheduler.next_delay((5000, 0, 0, 5000), False)
+    assert scheduler.next_delay((5400, 0, 0, 5400), False) == 60
+
+
+def test_backoff_with_jitter() -> None:
+    """Failures double the delay, with jitter, up to max_interval."""
+    scheduler = AdaptiveScheduler(60, 10, 300)
+    delays = [scheduler.next_delay(None, True) for _ in range(5)]
+    assert delays[0] == 60
+    assert 108 <= delays[1] <= 120
+    assert 216 <= delays[2] <= 240
+    assert all(270 <= delay <= 300 for delay in delays[3:])
+    assert scheduler.failures == 5
+
+
+def test_recovery_starts_over() -> None:
+    """The first good reading after failures polls at the interval."""
+    scheduler = AdaptiveScheduler(60, 10, 300)
+    for _ in range(3):
+        scheduler.next_delay(None, True)
+    assert scheduler.next_delay(FLAT, False) == 60
+    assert scheduler.failures == 0
+
+
+def test_intervals_are_ordered() -> None:
+    """min_interval and max_interval are kept around interval."""
+    scheduler = AdaptiveScheduler(60, 120, 30)
+    assert (scheduler.min_interval, scheduler.max_interval) == (60, 60)
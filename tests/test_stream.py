@@ -0,0 +1,125 @@
+"""Tests of streaming readings, against the simulator's /ws endpoint."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dabblerdk_powermeterreader import MeterCoordinator
+from custom_components.dabblerdk_powermeterreader.const import DOMAIN
+from custom_components.dabblerdk_powermeterreader.meter import MeterReader
+from tools.simulator import (
+    Faults,
+    MeterSimulator,
+)
+
+PUSH_INTERVAL = 0.02
+
+
+@pytest.fixture
+async def streaming_simulator(socket_enabled) -> AsyncIterator[MeterSimulator]:
+    """A simulated MEP module pushing readings quickly."""
+    server = MeterSimulator(push_interval=PUSH_INTERVAL)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+async def _wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    """Wait until condition() is true."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_reader_stream(streaming_simulator: MeterSimulator) -> None:
+    """Test that pushed readings are accepted, until the stream is closed."""
+    meter = streaming_simulator.meters[0]
+    reader = MeterReader(streaming_simulator.urls[0])
+    updates = 0
+
+    def on_update() -> None:
+        nonlocal updates
+        updates += 1
+
+    stream = asyncio.create_task(reader.async_stream(on_update))
+    try:
+        await _wait_for(lambda: updates >= 3)
+        assert reader.state.snapshot.utility_sn == meter.serial
+        assert reader.state.connected
+        assert meter.requests == 0
+
+        await streaming_simulator.async_set_faults(Faults(stream_down=True))
+        with pytest.raises(Exception, match="Meter stream closed"):
+            await asyncio.wait_for(stream, 5)
+        with pytest.raises(Exception, match="Meter stream failed"):
+            await reader.async_stream(on_update)
+    finally:
+        stream.cancel()
+        await reader.async_close()
+
+
+async def test_dropped_stream_fails(streaming_simulator: MeterSimulator) -> None:
+    """Test that a stream dropped by the module raises."""
+    reader = MeterReader(streaming_simulator.urls[0])
+    await streaming_simulator.async_set_faults(Faults(drop_rate=1))
+    try:
+        with pytest.raises(Exception, match="Meter stream"):
+            await asyncio.wait_for(reader.async_stream(lambda: None), 5)
+        assert streaming_simulator.meters[0].dropped == 1
+    finally:
+        await reader.async_close()
+
+
+async def test_stream_fallback_and_reconnect(
+    hass: HomeAssistant, streaming_simulator: MeterSimulator
+) -> None:
+    """Test polling while the stream is down, and reconnecting with back-off."""
+    meter = streaming_simulator.meters[0]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"name": "Echelon", "url": streaming_simulator.urls[0]},
+        options={"scan_interval": 300, "journal_interval": 0, "streaming": True},
+    )
+    entry.add_to_hass(hass)
+    with (
+        patch("custom_components.dabblerdk_powermeterreader.CACHE_TIME", 0),
+        patch("custom_components.dabblerdk_powermeterreader.STREAM_RETRY_MIN", 0.05),
+        patch("custom_components.dabblerdk_powermeterreader.STREAM_RETRY_MAX", 0.4),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator: MeterCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+        # Pushed readings reach the entities, and ticks do not poll
+        await _wait_for(lambda: coordinator._stream_connected)
+        power = hass.states.get("sensor.echelon_power").state
+        await _wait_for(lambda: hass.states.get("sensor.echelon_power").state != power)
+        polls = meter.requests
+        await coordinator._async_tick()
+        assert meter.requests == polls
+
+        # Polling takes over while the stream is down
+        await streaming_simulator.async_set_faults(Faults(stream_down=True))
+        await _wait_for(lambda: not coordinator._stream_connected)
+        attempts = meter.streams
+        await coordinator._async_tick()
+        assert meter.requests == polls + 1
+
+        # Retries double from 0.05 s up to 0.4 s: 0.05, 0.1, 0.2, 0.4, 0.4
+        await asyncio.sleep(1.2)
+        assert 3 <= meter.streams - attempts <= 6
+
+        # Once the module is back, the stream reconnects
+        await streaming_simulator.async_set_faults(Faults())
+        await _wait_for(lambda: coordinator._stream_connected)
+        await coordinator._async_tick()
+        assert meter.requests == polls + 1
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
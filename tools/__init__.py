@@ -0,0 +1 @@
+"""Development tools for dabblerdk_powermeterreader."""
@@ -0,0 +1,554 @@
+"""Benchmarks of dabblerdk_powermeterreader, including the entity updates.
+
+Run from the repository root with python -m tools.benchmark, the results
+are printed as JSON. Fetch paths are measured against a simulated MEP
+module, see --help for its latency.
+"""
+
+import argparse
+from array import array
+import asyncio
+from datetime import UTC, datetime
+from functools import partial
+import inspect
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.dabblerdk_powermeterreader import MeterCoordinator
+from custom_components.dabblerdk_powermeterreader.binary_sensor import (
+    SENSORS as BINARY_SENSORS,
+    EchelonBinarySensorType,
+    MeterBinaryEntity,
+)
+from custom_components.dabblerdk_powermeterreader.meter import (
+    AdaptiveScheduler,
+    Fleet,
+    MeterReader,
+    MeterSnapshot,
+    PlausibilityFilter,
+    summarize,
+)
+from custom_components.dabblerdk_powermeterreader.meter.backfill import (
+    HOUR,
+    interpolate_hourly,
+    parse_meter_time,
+)
+from custom_components.dabblerdk_powermeterreader.meter.history import TIMESTAMP
+from custom_components.dabblerdk_powermeterreader.meter.meter import (
+    FIELDS,
+    INFO_FIELDS,
+    decode_payload,
+    json_loads,
+)
+from custom_components.dabblerdk_powermeterreader.sensor import (
+    SENSORS,
+    Deadband,
+    EchelonSensorType,
+    MeterEntity,
+)
+
+from .simulator import Faults, MeterSimulator, SimulatedMeter
+
+YEAR_HOURS = 365 * 24
+# Run in a new interpreter, so nothing is imported beforehand
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import meter
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [name for name in HEAVY if name in sys.modules]]))
+"""
+HEAVY = ("aiohttp", "homeassistant", "zeroconf")
+PERCENTILES = (50, 95)
+
+
+def _summarize_ms(times: list[float]) -> dict:
+    """Summarize call times in milliseconds, as get_statistics does readings."""
+    columns = {
+        TIMESTAMP: array("d", itertools.accumulate(times)),
+        "ms": array("d", (elapsed * 1000 for elapsed in times)),
+    }
+    return summarize(columns, PERCENTILES)["fields"]["ms"]
+
+
+async def bench_fetch(options: argparse.Namespace) -> dict:
+    """Latency of get_meter_data when every call goes to the module."""
+    server = MeterSimulator(faults=Faults(latency=options.latency))
+    (url,) = await server.start()
+    reader = MeterReader(url, cache_time=0)
+    try:
+        await reader.get_meter_data()
+        times = []
+        for _ in range(options.requests):
+            start = time.perf_counter()
+            await reader.get_meter_data()
+            times.append(time.perf_counter() - start)
+    finally:
+        await reader.async_close()
+        await server.stop()
+    return {"calls": len(times), "ms": _summarize_ms(times)}
+
+
+async def bench_stale(options: argparse.Namespace) -> dict:
+    """Latency of get_meter_data returning stale readings while refreshing."""
+    server = MeterSimulator(faults=Faults(latency=options.latency))
+    (url,) = await server.start()
+    reader = MeterReader(url, cache_time=0, max_staleness=3600)
+    refreshed = asyncio.Event()
+    refreshes = 0
+
+    def on_refresh() -> None:
+        nonlocal refreshes
+        refreshes += 1
+        refreshed.set()
+
+    reader.on_refresh = on_refresh
+    try:
+        await reader.get_meter_data()
+        first = server.requests
+        times = []
+        for _ in range(options.requests):
+            start = time.perf_counter()
+            await reader.get_meter_data()
+            times.append(time.perf_counter() - start)
+            # Wait for the background refresh, as entities would between ticks
+            await refreshed.wait()
+            refreshed.clear()
+    finally:
+        await reader.async_close()
+        await server.stop()
+    if refreshes != len(times):
+        raise RuntimeError(
+            f"Stale reads refreshed {refreshes} times in {len(times)} calls"
+        )
+    return {
+        "calls": len(times),
+        "requests_to_module": server.requests - first,
+        "refreshes": refreshes,
+        "ms": _summarize_ms(times),
+    }
+
+
+async def bench_concurrent(options: argparse.Namespace) -> dict:
+    """Throughput of get_meter_data with concurrent callers."""
+    server = MeterSimulator(faults=Faults(latency=options.latency))
+    (url,) = await server.start()
+    reader = MeterReader(url, cache_time=0)
+    calls = 0
+
+    async def caller() -> None:
+        nonlocal calls
+        for _ in range(options.requests // options.concurrency):
+            await reader.get_meter_data()
+            calls += 1
+
+    try:
+        await reader.get_meter_data()
+        first = server.requests
+        start = time.perf_counter()
+        await asyncio.gather(*(caller() for _ in range(options.concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await reader.async_close()
+        await server.stop()
+    return {
+        "callers": options.concurrency,
+        "calls": calls,
+        "requests_to_module": server.requests - first,
+        "calls_per_s": round(calls / elapsed, 1),
+    }
+
+
+async def bench_cache_hit(options: argparse.Namespace) -> dict:
+    """Cost of get_value while the reading is still fresh."""
+    server = MeterSimulator(faults=Faults(latency=options.latency))
+    (url,) = await server.start()
+    reader = MeterReader(url, cache_time=3600)
+    count = 100000
+    try:
+        await reader.get_meter_data()
+        start = time.perf_counter()
+        for _ in range(count):
+            await reader.get_value(["Fwd_W"])
+        elapsed = time.perf_counter() - start
+    finally:
+        await reader.async_close()
+        await server.stop()
+    return {
+        "calls": count,
+        "requests_to_module": server.requests,
+        "per_call_us": round(elapsed / count * 1e6, 3),
+    }
+
+
+async def bench_fleet(options: argparse.Namespace) -> dict:
+    """Polls of growing numbers of meters sharing a Fleet."""
+    results = {}
+    for count in (10, 100, 300):
+        server = MeterSimulator(count, faults=Faults(latency=options.latency))
+        urls = await server.start()
+        fleet = Fleet(options.concurrency)
+        readers = [
+            MeterReader(
+                url,
+                session_provider=fleet.get_session,
+                limiter=fleet.limiter,
+                cache_time=0,
+            )
+            for url in urls
+        ]
+        try:
+            await asyncio.gather(*(reader.get_meter_data() for reader in readers))
+            start = time.perf_counter()
+            await asyncio.gather(*(reader.get_meter_data() for reader in readers))
+            elapsed = time.perf_counter() - start
+
+            phases = [fleet.join(str(index)) for index in range(count)]
+            schedule_time, _ = _timed(
+                lambda phases: [Fleet.next_delay(phase, 10) for phase in phases],
+                phases,
+            )
+        finally:
+            for reader in readers:
+                await reader.async_close()
+            await fleet.async_close()
+            await server.stop()
+        gaps = [b - a for a, b in zip(sorted(phases), sorted(phases)[1:])]
+        results[count] = {
+            "round_ms": round(elapsed * 1000, 3),
+            "peak_in_flight": fleet.limiter.peak_in_flight,
+            "next_delay_us": round(schedule_time / count * 1e6, 3),
+            # 1 when evenly spread over the interval
+            "smallest_gap_ratio": round(min(gaps) * count, 3),
+        }
+    return results
+
+
+def _timed(func, *args, repeat: int = 5) -> tuple[float, object]:
+    """Get the best time of repeat calls, and the result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def synthetic_year(seed: int = 1, outages: int = 50) -> list[tuple[float, float]]:
+    """Hourly energy counter readings for a year, with outages of 1-48 hours."""
+    rand = random.Random(seed)
+    start = datetime(2023, 1, 1, tzinfo=UTC).timestamp()
+    missing = set()
+    for _ in range(outages):
+        first = rand.randrange(YEAR_HOURS)
+        missing.update(range(first, first + rand.randint(1, 48)))
+
+    samples = []
+    counter = 10000.0
+    for hour in range(YEAR_HOURS):
+        counter += rand.uniform(0.1, 3)
+        if hour not in missing:
+            # Read a little after the hour, like a poll would
+            samples.append((start + hour * HOUR + rand.uniform(0, 300), counter))
+    return samples
+
+
+def bench_backfill(options: argparse.Namespace) -> dict:
+    """Interpolate hourly counters over a year of readings."""
+    samples = synthetic_year()
+    meter_times = [
+        datetime.fromtimestamp(timestamp, tz=UTC).strftime("%d-%m-%Y %H:%M:%S")
+        for timestamp, _ in samples
+    ]
+    # Readings are an hour apart, only longer gaps are outages
+    interpolate_time, hourly = _timed(interpolate_hourly, samples, 1.5 * HOUR)
+    parse_time, _ = _timed(lambda: [parse_meter_time(value) for value in meter_times])
+    return {
+        "samples": len(samples),
+        "hours_backfilled": len(hourly),
+        "interpolate_ms": round(interpolate_time * 1000, 3),
+        "parse_meter_time_us": round(parse_time / len(meter_times) * 1e6, 3),
+    }
+
+
+def synthetic_readings(
+    count: int, seed: int = 1, glitch_ratio: float = 0.01
+) -> list[tuple[float, MeterSnapshot]]:
+    """Readings one second apart, with Fwd_Act_Wh spikes and phase mismatches."""
+    rand = random.Random(seed)
+    readings = []
+    energy = 10000.0
+    for second in range(count):
+        phases = [rand.randint(0, 3000) for _ in range(3)]
+        total = sum(phases)
+        energy += total / 3600 / 1000
+        reported = round(energy, 3)
+        glitch = rand.random()
+        if glitch < glitch_ratio / 2:
+            reported += 1000
+        elif glitch < glitch_ratio:
+            total += 50
+        values = [reported, 0.0]
+        values += [power / 230 for power in phases] + [230.0] * 3
+        values += [total, 0] + phases + [0] * 3 + [50.0]
+        readings.append((float(second), MeterSnapshot.from_values(values)))
+    return readings
+
+
+def bench_filters(options: argparse.Namespace) -> dict:
+    """Run a day of 1 Hz readings through the plausibility rules."""
+    readings = synthetic_readings(86400)
+    elapsed, verdicts = _timed(
+        lambda: PlausibilityFilter().evaluate_batch(readings), repeat=3
+    )
+    return {
+        "readings": len(readings),
+        "rejected": sum(1 for verdict in verdicts if not verdict),
+        "per_reading_us": round(elapsed / len(readings) * 1e6, 3),
+    }
+
+
+def bench_import(options: argparse.Namespace) -> dict:
+    """Time to import the meter package in a new interpreter."""
+    script = f"HEAVY = {HEAVY!r}\n{IMPORT_SCRIPT}"
+    package_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "custom_components",
+        "dabblerdk_powermeterreader",
+    )
+    times = []
+    for _ in range(5):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=package_dir,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        elapsed, loaded = json.loads(output)
+        times.append(elapsed)
+    return {"min_ms": round(min(times) * 1000, 3), "heavy_modules_loaded": loaded}
+
+
+def recorded_bodies(path: str | None, count: int = 1000) -> list[bytes]:
+    """Bodies of the payloads recorded by python -m meter --record.
+
+    The payloads are encoded again, as only the decoded ones are recorded.
+    Without path, count payloads of a simulated module are used.
+    """
+    if path is None:
+        meter = SimulatedMeter("12345678", seed=1, faults=Faults(none_rate=0.01))
+        payloads = [meter.payload() for _ in range(count)]
+    else:
+        with open(path, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file if line.strip()]
+        payloads = [
+            record["payload"] for record in records if record["payload"] is not None
+        ]
+    return [json.dumps(payload).encode() for payload in payloads]
+
+
+def _baseline_snapshot(body: bytes) -> MeterSnapshot:
+    """Decode and convert a payload as before orjson, converting every field."""
+    payload = json.loads(body.decode())
+    self = MeterSnapshot.__new__(MeterSnapshot)
+    valid = 0
+    for index, (key, attr, divisor) in enumerate(FIELDS):
+        try:
+            value = int(payload.get(key))
+            if divisor != 1:
+                value /= divisor
+            valid |= 1 << index
+        except (TypeError, ValueError):
+            value = None
+        setattr(self, attr, value)
+    for key, attr in INFO_FIELDS:
+        setattr(self, attr, payload.get(key))
+    self.valid = valid
+    return self
+
+
+def bench_decode(options: argparse.Namespace) -> dict:
+    """CPU time per poll of decoding the payload and converting it."""
+    bodies = recorded_bodies(options.payloads)
+    baseline_time, baseline = _timed(
+        lambda: [_baseline_snapshot(body) for body in bodies]
+    )
+    loads_time, payloads = _timed(lambda: [decode_payload(body) for body in bodies])
+    snapshot_time, snapshots = _timed(
+        lambda: [MeterSnapshot.from_payload(payload) for payload in payloads]
+    )
+    if [snapshot.as_dict() for snapshot in snapshots] != [
+        snapshot.as_dict() for snapshot in baseline
+    ]:
+        raise RuntimeError("Payloads were converted differently than before")
+    count = len(bodies)
+    return {
+        "payloads": count,
+        "mean_bytes": round(statistics.fmean(len(body) for body in bodies)),
+        "decoder": json_loads.__module__,
+        "baseline_us": round(baseline_time / count * 1e6, 3),
+        "loads_us": round(loads_time / count * 1e6, 3),
+        "snapshot_us": round(snapshot_time / count * 1e6, 3),
+        "per_poll_us": round((loads_time + snapshot_time) / count * 1e6, 3),
+    }
+
+
+# Phase and returned flag of each sensor type, as set up by the platform
+SENSOR_LAYOUT = (
+    (EchelonSensorType.ENERGY_FWD, ("",), False),
+    (EchelonSensorType.ENERGY_REV, ("",), True),
+    (EchelonSensorType.VOLTAGE, ("L1", "L2", "L3"), False),
+    (EchelonSensorType.CURRENT, ("L1", "L2", "L3"), False),
+    (EchelonSensorType.POWER, ("",), False),
+    (EchelonSensorType.POWER_PHASE, ("L1", "L2", "L3"), False),
+    (EchelonSensorType.POWER_REV, ("", "L1", "L2", "L3"), True),
+    (EchelonSensorType.FREQUENCY, ("",), False),
+)
+
+
+async def bench_fanout(options: argparse.Namespace) -> dict:
+    """Cost of one refresh and of notifying all 19 entities."""
+    # Power is set below, rather than walking on its own, and the meter's
+    # clock moves 10 seconds per reading, as if polled every 10 seconds
+    server = MeterSimulator(
+        faults=Faults(latency=options.latency),
+        walk_w=0,
+        clock=partial(next, itertools.count(time.time(), 10)),
+    )
+    (url,) = await server.start()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        reader = MeterReader(url, cache_time=0)
+        coordinator = MeterCoordinator(
+            hass, "benchmark", reader, AdaptiveScheduler(300, 300, 300)
+        )
+        await coordinator.async_refresh()
+
+        deadbands = {sensor_type: Deadband() for sensor_type in EchelonSensorType}
+        entities = [
+            MeterEntity(
+                "benchmark",
+                "Echelon",
+                phase,
+                returned,
+                coordinator,
+                SENSORS[sensor_type],
+                coordinator.meter_sn,
+                deadbands,
+            )
+            for sensor_type, phases, returned in SENSOR_LAYOUT
+            for phase in phases
+        ]
+        entities += [
+            MeterBinaryEntity(
+                "benchmark",
+                "Echelon",
+                True,
+                coordinator,
+                BINARY_SENSORS[sensor_type],
+                coordinator.meter_sn,
+            )
+            for sensor_type in EchelonBinarySensorType
+        ]
+        for index, entity in enumerate(entities):
+            domain = "sensor" if isinstance(entity, MeterEntity) else "binary_sensor"
+            entity.hass = hass
+            entity.entity_id = f"{domain}.benchmark_{index}"
+            await entity.async_added_to_hass()
+
+        def fanout() -> float:
+            # Each entity checks the fields the coordinator marked as changed
+            start = time.perf_counter()
+            async_dispatcher_send(hass, coordinator.signal)
+            return time.perf_counter() - start
+
+        # The module repeats its last reading, with the same CurrentDateTime
+        await server.async_set_faults(Faults(latency=options.latency, frozen_time=True))
+        unchanged = []
+        for _ in range(options.requests):
+            await coordinator.async_refresh()
+            unchanged.append(fanout())
+        await server.async_set_faults(Faults(latency=options.latency))
+
+        changed = []
+        refresh = []
+        for count in range(options.requests):
+            # Move all phases, so every power sensor leaves its deadband
+            server.meters[0].power = [300 + 100 * (count % 2)] * 3
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            refresh.append(time.perf_counter() - start)
+            changed.append(fanout())
+
+        await reader.async_close()
+        await hass.async_stop(force=True)
+    await server.stop()
+    return {
+        "entities": len(entities),
+        "refresh": _summarize_ms(refresh),
+        "fanout_unchanged": _summarize_ms(unchanged),
+        "fanout_changed": _summarize_ms(changed),
+    }
+
+
+BENCHMARKS = {
+    "import": bench_import,
+    "fetch": bench_fetch,
+    "stale": bench_stale,
+    "concurrent": bench_concurrent,
+    "cache_hit": bench_cache_hit,
+    "fleet": bench_fleet,
+    "backfill": bench_backfill,
+    "filters": bench_filters,
+    "decode": bench_decode,
+    "fanout": bench_fanout,
+}
+
+
+def main(argv: list[str]) -> int:
+    """Run the benchmarks named in argv, or all."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", choices=[[], *BENCHMARKS])
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="seconds per module response"
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--payloads", help="payloads recorded by python -m meter --record"
+    )
+    parser.add_argument("--output", help="write the JSON results to this file")
+    options = parser.parse_args(argv)
+    # Keep the output to the results
+    logging.basicConfig(level=logging.ERROR)
+
+    results = {}
+    for name in options.names or BENCHMARKS:
+        result = BENCHMARKS[name](options)
+        if inspect.isawaitable(result):
+            result = asyncio.run(result)
+        results[name] = result
+
+    text = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
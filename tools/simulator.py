@@ -0,0 +1,506 @@
+"""Simulated dabbler.dk MEP modules, for load and fault testing.
+
+Each simulated meter listens on its own port and answers /getDashDataWS
+with readings of counters that evolve with a random walk of the power on
+each phase. The same readings are pushed to WebSocket clients of /ws,
+like the stream of the module. Faults are set per meter when starting,
+from a script of timed changes, or while running with a POST of the
+fault fields as JSON to /faults on the meter's port.
+
+Run from the repository root with python -m tools.simulator, or use
+MeterSimulator from tests.
+"""
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime
+import json
+import logging
+import random
+import socket
+import sys
+import time
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+SERIAL_BASE = 12345678
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+MDNS_SERVICE_TYPE = "_http._tcp.local."
+
+METADATA = {
+    "Meter_Manufacturer": "Echelon",
+    "Meter_Model": "83331-3IMAXAA",
+    "Meter_SW_Version": "4.07",
+    "ESP_SW_By": "dabbler.dk",
+    "ESP_SW": "MEP",
+    "ESP_SW_Version": "1.0.0",
+}
+
+
+@dataclass(slots=True)
+class Faults:
+    """Faults of a simulated meter. Rates are the chance per request.
+
+    spike_wh is added to Fwd_Act_Wh of a spiked reading only, like the
+    temporary jumps seen on real meters. none_fields are sent as None.
+    With frozen_time, CurrentDateTime stops at the value it had when
+    frozen. phase_mismatch_w is added to Fwd_W, so the phases no longer
+    add up. Responses are delayed latency plus up to latency_jitter
+    seconds, and a dropped request has its connection closed unanswered.
+    With mdns_down, the .local name of the meter is not advertised. With
+    stream_down, /ws refuses connections and closes the open streams.
+    Pushed readings are delayed and dropped like answers, a dropped one
+    closing the stream's connection.
+    """
+
+    spike_rate: float = 0
+    spike_wh: int = 100000
+    none_rate: float = 0
+    none_fields: tuple[str, ...] = ("Fwd_Act_Wh",)
+    frozen_time: bool = False
+    phase_mismatch_w: int = 0
+    latency: float = 0
+    latency_jitter: float = 0
+    drop_rate: float = 0
+    mdns_down: bool = False
+    stream_down: bool = False
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Faults":
+        """Make faults from JSON fields, the rest left at no fault."""
+        names = {field.name for field in fields(cls)}
+        unknown = set(data) - names
+        if unknown:
+            raise ValueError(f"Unknown faults: {', '.join(sorted(unknown))}")
+        data = dict(data)
+        if "none_fields" in data:
+            data["none_fields"] = tuple(data["none_fields"])
+        return cls(**data)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the fields as JSON."""
+        data = asdict(self)
+        data["none_fields"] = list(self.none_fields)
+        return data
+
+
+class SimulatedMeter:
+    """Counters and power of one meter, advanced on each reading."""
+
+    def __init__(
+        self,
+        serial: str,
+        seed: int | None = None,
+        faults: Faults | None = None,
+        power_range: tuple[float, float] = (0, 3000),
+        walk_w: float = 50,
+        clock=time.time,
+    ) -> None:
+        """Initialize.
+
+        The net power of each phase walks by up to walk_w per reading,
+        within power_range. A negative lower bound lets the meter export,
+        like with solar panels. clock gives POSIX seconds, used for the
+        energy counters and CurrentDateTime.
+        """
+        self.serial = serial
+        self.faults = faults or Faults()
+        self.power_range = power_range
+        self.walk_w = walk_w
+        self.requests = 0
+        self.dropped = 0
+        self.streams = 0
+        self.pushed = 0
+        self._rand = random.Random(seed)
+        self._clock = clock
+        self._last = clock()
+        self._frozen: str | None = None
+        self.energy_fwd_wh = self._rand.uniform(1e6, 5e7)
+        self.energy_rev_wh = self._rand.uniform(0, 1e6) if power_range[0] < 0 else 0.0
+        low, high = power_range
+        self.power = [self._rand.uniform(max(low, 0), high / 3) for _ in range(3)]
+
+    def _advance(self) -> float:
+        """Add the energy since the last reading and walk the power."""
+        now = self._clock()
+        elapsed = max(0.0, now - self._last)
+        self._last = now
+        net = sum(self.power)
+        if net >= 0:
+            self.energy_fwd_wh += net * elapsed / 3600
+        else:
+            self.energy_rev_wh -= net * elapsed / 3600
+        low, high = self.power_range
+        self.power = [
+            min(high, max(low, power + self._rand.uniform(-self.walk_w, self.walk_w)))
+            for power in self.power
+        ]
+        return now
+
+    def payload(self) -> dict[str, Any]:
+        """Get the next getDashDataWS reading, with faults applied."""
+        now = self._advance()
+        rand = self._rand
+        faults = self.faults
+
+        meter_time = datetime.fromtimestamp(now).strftime(TIME_FORMAT)
+        if faults.frozen_time:
+            if self._frozen is None:
+                self._frozen = meter_time
+            meter_time = self._frozen
+        else:
+            self._frozen = None
+
+        payload: dict[str, Any] = {
+            "Utility_SN": self.serial,
+            "CurrentDateTime": meter_time,
+            "Fwd_Act_Wh": int(self.energy_fwd_wh),
+            "Rev_Act_Wh": int(self.energy_rev_wh),
+        }
+        voltages = [round(rand.gauss(230000, 1500)) for _ in range(3)]
+        for phase, (power, voltage) in enumerate(zip(self.power, voltages), 1):
+            payload[f"L{phase}_RMS_A"] = round(abs(power) / voltage * 1e6)
+        for phase, voltage in enumerate(voltages, 1):
+            payload[f"L{phase}_RMS_V"] = voltage
+        net = sum(round(power) for power in self.power)
+        payload["Fwd_W"] = max(net, 0)
+        payload["Rev_W"] = max(-net, 0)
+        for phase, power in enumerate(self.power, 1):
+            payload[f"L{phase}_Fwd_W"] = max(round(power), 0)
+        for phase, power in enumerate(self.power, 1):
+            payload[f"L{phase}_Rev_W"] = max(-round(power), 0)
+        payload["Freq_mHz"] = round(rand.gauss(50000, 20))
+        payload.update(METADATA)
+
+        if faults.spike_rate and rand.random() < faults.spike_rate:
+            payload["Fwd_Act_Wh"] += faults.spike_wh
+        if faults.phase_mismatch_w:
+            payload["Fwd_W"] += faults.phase_mismatch_w
+        if faults.none_rate and rand.random() < faults.none_rate:
+            for key in faults.none_fields:
+                payload[key] = None
+        return payload
+
+    def delay(self) -> float:
+        """Get seconds to wait before answering."""
+        faults = self.faults
+        return faults.latency + self._rand.uniform(0, faults.latency_jitter)
+
+    def drop(self) -> bool:
+        """Decide if the connection is closed without an answer."""
+        return bool(self.faults.drop_rate) and (
+            self._rand.random() < self.faults.drop_rate
+        )
+
+
+class MeterSimulator:
+    """Web server for a number of simulated meters, one port each."""
+
+    def __init__(
+        self,
+        count: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+        faults: Faults | None = None,
+        mdns: bool = False,
+        push_interval: float = 1,
+        **meter_args,
+    ) -> None:
+        """Initialize.
+
+        Meters listen on port, port + 1 and so on, or on free ports if port
+        is 0. With mdns, each meter is advertised as mep-<serial>.local
+        with zeroconf. Streams get a reading when connected and then every
+        push_interval seconds. meter_args are passed on to SimulatedMeter.
+        """
+        self.meters = [
+            SimulatedMeter(
+                str(SERIAL_BASE + index),
+                seed=seed + index,
+                faults=replace(faults) if faults is not None else None,
+                **meter_args,
+            )
+            for index in range(count)
+        ]
+        self.urls: list[str] = []
+        self._host = host
+        self._port = port
+        self._mdns = mdns
+        self._push_interval = push_interval
+        self._streams: set[web.WebSocketResponse] = set()
+        self._by_port: dict[int, SimulatedMeter] = {}
+        self._runner: web.AppRunner | None = None
+        self._zeroconf = None
+        self._mdns_infos: dict[str, Any] = {}
+        self._script_task: asyncio.Task | None = None
+
+    @property
+    def requests(self) -> int:
+        """Requests answered or dropped, over all meters."""
+        return sum(meter.requests for meter in self.meters)
+
+    def _meter(self, request: web.Request) -> SimulatedMeter:
+        """Get the meter listening on the port the request came in on."""
+        return self._by_port[request.transport.get_extra_info("sockname")[1]]
+
+    async def _handle_reading(self, request: web.Request) -> web.StreamResponse:
+        """Answer with the next reading, or drop the connection."""
+        meter = self._meter(request)
+        meter.requests += 1
+        delay = meter.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if meter.drop():
+            meter.dropped += 1
+            request.transport.close()
+            raise asyncio.CancelledError
+        return web.json_response(meter.payload())
+
+    async def _handle_stream(self, request: web.Request) -> web.StreamResponse:
+        """Push readings over a WebSocket until either side closes it."""
+        meter = self._meter(request)
+        meter.streams += 1
+        if meter.faults.stream_down:
+            raise web.HTTPServiceUnavailable
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._streams.add(ws)
+        push = asyncio.create_task(self._push_readings(request, meter, ws))
+        try:
+            # Reading answers the heartbeat pings of the client
+            async for _ in ws:
+                pass
+        finally:
+            push.cancel()
+            self._streams.discard(ws)
+        return ws
+
+    async def _push_readings(
+        self, request: web.Request, meter: SimulatedMeter, ws: web.WebSocketResponse
+    ) -> None:
+        """Send the next reading every push interval, with faults applied."""
+        while True:
+            delay = meter.delay()
+            if delay:
+                await asyncio.sleep(delay)
+            if meter.faults.stream_down:
+                await ws.close()
+                return
+            if meter.drop():
+                meter.dropped += 1
+                request.transport.close()
+                return
+            meter.pushed += 1
+            await ws.send_json(meter.payload())
+            await asyncio.sleep(self._push_interval)
+
+    async def _handle_faults(self, request: web.Request) -> web.Response:
+        """Get the faults of the meter, or replace them with a POST."""
+        meter = self._meter(request)
+        if request.method == "POST":
+            try:
+                faults = Faults.from_dict(await request.json())
+            except (TypeError, ValueError) as err:
+                raise web.HTTPBadRequest(text=str(err)) from err
+            await self.async_set_faults(faults, [self.meters.index(meter)])
+        return web.json_response(meter.faults.as_dict())
+
+    async def start(self) -> list[str]:
+        """Start serving, returning the url of each meter."""
+        app = web.Application()
+        app.router.add_get("/getDashDataWS", self._handle_reading)
+        app.router.add_get("/ws", self._handle_stream)
+        app.router.add_route("*", "/faults", self._handle_faults)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        self.urls = []
+        for index, meter in enumerate(self.meters):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self._host, self._port + index if self._port else 0))
+            port = sock.getsockname()[1]
+            self._by_port[port] = meter
+            await web.SockSite(self._runner, sock).start()
+            self.urls.append(f"http://{self._host}:{port}/")
+
+        if self._mdns:
+            await self._async_update_mdns()
+        return self.urls
+
+    async def stop(self) -> None:
+        """Stop serving, and the script if running."""
+        if self._script_task is not None:
+            self._script_task.cancel()
+            self._script_task = None
+        if self._zeroconf is not None:
+            await self._zeroconf.async_close()
+            self._zeroconf = None
+            self._mdns_infos.clear()
+        for ws in list(self._streams):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self._by_port.clear()
+
+    def mdns_name(self, index: int) -> str:
+        """Get the .local name of a meter."""
+        return f"mep-{self.meters[index].serial}.local"
+
+    async def async_set_faults(
+        self, faults: Faults, meters: list[int] | None = None
+    ) -> None:
+        """Replace the faults of the given meters, or of all."""
+        for index in range(len(self.meters)) if meters is None else meters:
+            self.meters[index].faults = replace(faults)
+        if self._mdns:
+            await self._async_update_mdns()
+
+    async def _async_update_mdns(self) -> None:
+        """Advertise the names of meters without mdns_down, and only those."""
+        # Only needed with mdns, zeroconf comes with Home Assistant
+        from zeroconf import IPVersion  # pylint: disable=import-outside-toplevel
+        from zeroconf.asyncio import (  # pylint: disable=import-outside-toplevel
+            AsyncServiceInfo,
+            AsyncZeroconf,
+        )
+
+        if self._zeroconf is None:
+            interfaces = None if self._host == "0.0.0.0" else [self._host]
+            self._zeroconf = AsyncZeroconf(
+                interfaces=interfaces, ip_version=IPVersion.V4Only
+            )
+        address = self._host
+        if address == "0.0.0.0":
+            address = socket.gethostbyname(socket.gethostname())
+
+        for index, (url, meter) in enumerate(zip(self.urls, self.meters)):
+            name = self.mdns_name(index)
+            info = self._mdns_infos.get(name)
+            if meter.faults.mdns_down and info is not None:
+                await self._zeroconf.async_unregister_service(info)
+                del self._mdns_infos[name]
+            elif not meter.faults.mdns_down and info is None:
+                info = AsyncServiceInfo(
+                    MDNS_SERVICE_TYPE,
+                    f"MEP {meter.serial}.{MDNS_SERVICE_TYPE}",
+                    parsed_addresses=[address],
+                    port=int(url.rsplit(":", 1)[1].strip("/")),
+                    server=f"{name}.",
+                )
+                await self._zeroconf.async_register_service(info)
+                self._mdns_infos[name] = info
+
+    def run_script(self, script: list[dict[str, Any]]) -> asyncio.Task:
+        """Apply timed fault changes in the background.
+
+        Each step has "at", seconds after the start of the script,
+        "faults", the fields of the faults replacing those of the meters,
+        and optionally "meters", the indexes of the meters, otherwise all.
+        """
+        steps = sorted(
+            (
+                float(step["at"]),
+                Faults.from_dict(step.get("faults", {})),
+                step.get("meters"),
+            )
+            for step in script
+        )
+
+        async def run() -> None:
+            start = time.monotonic()
+            for at, faults, meters in steps:
+                await asyncio.sleep(max(0.0, start + at - time.monotonic()))
+                _LOGGER.info("Faults of %s: %s", meters or "all", faults)
+                await self.async_set_faults(faults, meters)
+
+        self._script_task = asyncio.create_task(run())
+        return self._script_task
+
+
+def _faults_from_options(options: argparse.Namespace) -> Faults:
+    """Get the faults given on the command line."""
+    return Faults(
+        spike_rate=options.spike_rate,
+        none_rate=options.none_rate,
+        frozen_time=options.frozen_time,
+        phase_mismatch_w=options.phase_mismatch,
+        latency=options.latency,
+        latency_jitter=options.jitter,
+        drop_rate=options.drop_rate,
+    )
+
+
+async def _async_serve(options: argparse.Namespace, script: list | None) -> None:
+    """Run the simulator until cancelled."""
+    simulator = MeterSimulator(
+        options.meters,
+        host=options.host,
+        port=options.port,
+        seed=options.seed,
+        faults=_faults_from_options(options),
+        mdns=options.mdns,
+        push_interval=options.push_interval,
+        power_range=(-options.export, options.max_power),
+    )
+    urls = await simulator.start()
+    for index, url in enumerate(urls):
+        name = f" {simulator.mdns_name(index)}" if options.mdns else ""
+        print(f"{simulator.meters[index].serial} {url}{name}", flush=True)
+    if script:
+        simulator.run_script(script)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main(argv: list[str]) -> int:
+    """Serve simulated meters until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--meters", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--port", type=int, default=8080, help="port of the first meter, 0 for any"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--mdns", action="store_true", help="advertise mep-<serial>.local names"
+    )
+    parser.add_argument("--max-power", type=float, default=3000, help="W per phase")
+    parser.add_argument(
+        "--export", type=float, default=0, help="most W exported per phase"
+    )
+    parser.add_argument("--spike-rate", type=float, default=0)
+    parser.add_argument("--none-rate", type=float, default=0)
+    parser.add_argument("--frozen-time", action="store_true")
+    parser.add_argument("--phase-mismatch", type=int, default=0, help="W")
+    parser.add_argument("--latency", type=float, default=0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0, help="seconds")
+    parser.add_argument("--drop-rate", type=float, default=0)
+    parser.add_argument(
+        "--push-interval", type=float, default=1, help="seconds between readings on /ws"
+    )
+    parser.add_argument("--script", help="JSON file of timed fault changes")
+    options = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    script = None
+    if options.script:
+        with open(options.script, encoding="utf-8") as file:
+            script = json.load(file)
+    try:
+        asyncio.run(_async_serve(options, script))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))